@@ -0,0 +1,238 @@
+"""Benchmarks for morejson.
+
+Run from the repository root with, for example:
+
+    python benchmarks/benchmark.py --size 10000
+    python benchmarks/benchmark.py --size 10000 --memory
+    python benchmarks/benchmark.py --size 1000 --threads 8
+    python benchmarks/benchmark.py --blobs 16
+    python benchmarks/benchmark.py --size 10000 --compiled
+    python benchmarks/benchmark.py --size 10000 --memo
+    python benchmarks/benchmark.py --size 10000 --deep 500
+"""
+
+import argparse
+import base64
+import concurrent.futures
+import datetime
+import io
+import json
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import morejson  # noqa: E402  pylint: disable=C0413
+
+
+def make_records(size):
+    """Returns a list of records with both plain and extended values."""
+    start = datetime.datetime(2017, 1, 1, 12, 30)
+    tags = frozenset(['alpha', 'beta', 'gamma'])
+    return [
+        {
+            'id': i,
+            'name': 'record-{}'.format(i),
+            'score': i * 0.5,
+            'created': start + datetime.timedelta(minutes=i),
+            'day': (start + datetime.timedelta(days=i % 365)).date(),
+            'duration': datetime.timedelta(seconds=i),
+            'tags': tags,
+            'point': complex(i, -i),
+        }
+        for i in range(size)
+    ]
+
+
+def _report(name, seconds, number):
+    print('{:<28} {:>10.2f} ms'.format(name, 1000 * seconds / number))
+
+
+def bench_speed(records, number):
+    """Times dumps and loads of the given records."""
+    json_str = morejson.dumps(records)
+    _report('dumps', timeit.timeit(
+        lambda: morejson.dumps(records), number=number), number)
+    _report('loads', timeit.timeit(
+        lambda: morejson.loads(json_str), number=number), number)
+
+
+def bench_compiled(records, number):
+    """Times dumps of the given records against an encoder compiled for them."""
+    encode = morejson.compile_encoder(records[:1])
+    _report('dumps', timeit.timeit(
+        lambda: morejson.dumps(records), number=number), number)
+    _report('compiled encoder', timeit.timeit(
+        lambda: encode(records), number=number), number)
+
+
+def bench_memo(records, number):
+    """Times dumps of the given records with and without memoization, where
+    every datetime is repeated, as a timezone-aware one."""
+    tzinfo = datetime.timezone(datetime.timedelta(hours=2))
+    records = [
+        dict(record, created=record['created'].replace(
+            minute=0, tzinfo=tzinfo))
+        for record in records
+    ]
+    for name, kwargs in (('dumps', {}),
+                         ('dumps memo', {'memo': 1024}),
+                         ('dumps shared memo',
+                          {'memo': 1024, 'shared_memo': True})):
+        _report(name, timeit.timeit(
+            lambda: morejson.dumps(records, **kwargs), number=number), number)
+
+
+def make_tree(depth):
+    """Returns a tree nested to the given depth, with a date at its leaf."""
+    tree = {'leaf': datetime.date(2017, 1, 1)}
+    for i in range(depth):
+        tree = {'child': tree, 'items': [i, 'item-{}'.format(i)]}
+    return tree
+
+
+class _NullWriter(object):
+    """A file-like object discarding anything written to it."""
+
+    def write(self, chunk):
+        pass
+
+
+def bench_iterative(records, depth, number):
+    """Times dumps, dump and loads of a deep tree and of the given records,
+    recursively and iteratively, and of a tree too deep for recursion."""
+    for name, obj in (('deep', make_tree(depth)), ('shallow', records)):
+        json_str = morejson.dumps(obj)
+        for mode, kwargs in (('recursive', {}),
+                             ('iterative', {'iterative': True})):
+            label = '{} {} '.format(name, mode)
+            _report(label + 'dumps', timeit.timeit(
+                lambda: morejson.dumps(obj, **kwargs), number=number), number)
+            _report(label + 'dump', timeit.timeit(
+                lambda: morejson.dump(obj, _NullWriter(), **kwargs),
+                number=number), number)
+            _report(label + 'loads', timeit.timeit(
+                lambda: morejson.loads(json_str, **kwargs), number=number),
+                number)
+    tree = make_tree(100 * sys.getrecursionlimit())
+    json_str = morejson.dumps(tree, iterative=True)
+    _report('depth {:,} iterative dumps'.format(
+        100 * sys.getrecursionlimit()), timeit.timeit(
+            lambda: morejson.dumps(tree, iterative=True), number=1), 1)
+    _report('depth {:,} iterative loads'.format(
+        100 * sys.getrecursionlimit()), timeit.timeit(
+            lambda: morejson.loads(json_str, iterative=True), number=1), 1)
+
+
+def _print_profile(name, prof):
+    print('{:<28} peak {:>12,} B  retained {:>12,} B'.format(
+        name, prof.peak, prof.retained))
+    for phase, stats in prof.phases.items():
+        print('  {:<26} peak {:>12,} B  retained {:>12,} B'.format(
+            phase, stats.peak, stats.retained))
+
+
+def bench_memory(records):
+    """Reports peak and retained allocations of dumps, loads and load."""
+    json_str = morejson.dumps(records)
+    print('json string: {:,} characters'.format(len(json_str)))
+    _print_profile('dumps', morejson.profile_memory(morejson.dumps, records))
+    _print_profile('loads', morejson.profile_memory(morejson.loads, json_str))
+    _print_profile('load', morejson.profile_memory(
+        morejson.load, io.StringIO(json_str)))
+
+
+def bench_threads(records, max_threads, number):
+    """Reports dumps/loads throughput on a shared workload from 1 to N threads.
+
+    Each thread runs the given number of calls; on a free-threaded (no-GIL)
+    build of Python, throughput should scale with the number of threads.
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)
+    print('GIL enabled: {}'.format(is_gil_enabled()))
+    json_str = morejson.dumps(records)
+    for name, func, arg in (('dumps', morejson.dumps, records),
+                            ('loads', morejson.loads, json_str)):
+        for n_threads in range(1, max_threads + 1):
+            def _work():
+                for _ in range(number):
+                    func(arg)
+            with concurrent.futures.ThreadPoolExecutor(n_threads) as pool:
+                start = time.perf_counter()
+                futures = [pool.submit(_work) for _ in range(n_threads)]
+                for future in futures:
+                    future.result()
+                seconds = time.perf_counter() - start
+            print('{:<6} threads={:<3} {:>10.1f} calls/s'.format(
+                name, n_threads, n_threads * number / seconds))
+
+
+def bench_blobs(megabytes, number):
+    """Times dumps and loads of a binary blob of the given size, against
+    base64-encoding it by hand around the json module."""
+    blob = os.urandom(megabytes * 2 ** 20)
+    print('blob: {:,} bytes'.format(len(blob)))
+    for encoding in ('base64', 'base85'):
+        json_str = morejson.dumps({'blob': blob}, binary=encoding)
+        _report('dumps ' + encoding, timeit.timeit(
+            lambda: morejson.dumps({'blob': blob}, binary=encoding),
+            number=number), number)
+        _report('loads ' + encoding, timeit.timeit(
+            lambda: morejson.loads(json_str), number=number), number)
+    json_str = json.dumps({'blob': base64.b64encode(blob).decode('ascii')})
+    _report('by hand: dumps base64', timeit.timeit(
+        lambda: json.dumps({'blob': base64.b64encode(blob).decode('ascii')}),
+        number=number), number)
+    _report('by hand: loads base64', timeit.timeit(
+        lambda: base64.b64decode(json.loads(json_str)['blob']),
+        number=number), number)
+
+
+def main(argv=None):
+    """Runs the benchmarks selected on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--size', type=int, default=10000, help='number of records')
+    parser.add_argument(
+        '--number', type=int, default=5, help='repetitions per timing')
+    parser.add_argument(
+        '--memory', action='store_true',
+        help='report memory use per phase instead of timings')
+    parser.add_argument(
+        '--threads', type=int, default=0,
+        help='report throughput scaling from 1 to this many threads')
+    parser.add_argument(
+        '--compiled', action='store_true',
+        help='time dumps against an encoder compiled for the records')
+    parser.add_argument(
+        '--memo', action='store_true',
+        help='time dumps of repetitive records with and without a memo')
+    parser.add_argument(
+        '--deep', type=int, default=0,
+        help='time recursive against iterative mode, on trees this deep')
+    parser.add_argument(
+        '--blobs', type=int, default=0,
+        help='time binary blobs of this many megabytes instead of records')
+    args = parser.parse_args(argv)
+    if args.blobs:
+        bench_blobs(args.blobs, args.number)
+        return
+    records = make_records(args.size)
+    if args.memory:
+        bench_memory(records)
+    elif args.compiled:
+        bench_compiled(records, args.number)
+    elif args.deep:
+        bench_iterative(records, args.deep, args.number)
+    elif args.memo:
+        bench_memo(records, args.number)
+    elif args.threads:
+        bench_threads(records, args.threads, args.number)
+    else:
+        bench_speed(records, args.number)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,38 @@
 """A wrapper for Python's json module supporting Python built-in types."""
 
 from .core import  *  # pylint: disable=W0401
+from .compiler import compile_encoder
+from .profiling import (
+    MemoryProfile,
+    PhaseStats,
+    profile_memory,
+)
 try:
+    del array
+    del base64
+    del collections
+    del contextlib
+    del contextvars
+    del copy
+    del dataclasses
     del datetime
+    del decimal
+    del enum
+    del functools
+    del hashlib
     del inspect
+    del itertools
     del json
+    del operator
+    del os
+    del re
+    del sys
+    del keyword
+    del math
+    del threading
+    del types
+    del typing
+    del uuid
     del core
 except BaseException:
     pass
@@ -0,0 +1,247 @@
+"""Encoders generated for payloads of a fixed shape.
+
+compile_encoder generates the source of a Python function for a given shape,
+with the JSON text of every known field and value type built inline, so no
+value of the expected type goes through the json encoder or the morejson
+dispatch. Any value that doesn't match the shape is encoded the generic way.
+"""
+
+import datetime
+import json
+import uuid
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+from . import core
+
+
+# types with a JSON encoding that can be built by a single format string;
+# a sample of each, and a condition on the value of the name v, if any
+_FIXED_LAYOUTS = {
+    datetime.datetime: (datetime.datetime(2000, 1, 1), 'v.tzinfo is None'),
+    datetime.date: (datetime.date(2000, 1, 1), None),
+    datetime.timedelta: (datetime.timedelta(1), None),
+    uuid.UUID: (uuid.UUID(int=0), None),
+}
+
+# the options that change encoding in ways compiled encoders don't follow
+_UNSUPPORTED_OPTIONS = (
+    'refs', 'columnar', 'pack_numbers', 'tagless', 'canonical', 'iterative')
+
+
+def _shape(spec):
+    """Returns the shape of a schema or sample: a type for a single value,
+    a dict of shapes for an object, or a list of one shape for an array."""
+    if isinstance(spec, type):
+        return spec
+    if type(spec) is dict:
+        for key in spec:
+            if not isinstance(key, str):
+                raise TypeError("Only str keys are supported: {!r}".format(key))
+        return {key: _shape(value) for key, value in spec.items()}
+    if type(spec) is list:
+        return [_shape(spec[0])] if spec else object
+    return type(spec)
+
+
+class _CodeGenerator(object):
+    """Generates the source of the functions encoding a shape."""
+
+    def __init__(self, opts, separators, ensure_ascii):
+        self.opts = opts
+        self.item_separator, self.key_separator = separators
+        self.ensure_ascii = ensure_ascii
+        self.namespace = {
+            '_encode_str': (
+                encode_basestring_ascii if ensure_ascii else encode_basestring),
+            '_int_repr': int.__repr__,
+            '_float_repr': float.__repr__,
+        }
+        self.functions = []
+
+    def _name(self, prefix, value):
+        name = '_{}_{}'.format(prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def _layout(self, type_):
+        """Returns a format string for values of a fixed-layout type, and the
+        attributes filling it in."""
+        sample, _ = _FIXED_LAYOUTS[type_]
+        dict_obj = core._ENCODERS[type_](sample, self.opts)  # pylint: disable=W0212
+        parts, attrs = [], []
+        for key, value in dict_obj.items():
+            key_json = (self._json(key) + self.key_separator).replace('%', '%%')
+            if key == self.opts.tag_key:
+                parts.append(key_json + self._json(value).replace('%', '%%'))
+            else:
+                parts.append(key_json + ('%d' if type(value) is int else '"%s"'))
+                attrs.append(key)
+        return '{' + self.item_separator.join(parts) + '}', attrs
+
+    def _json(self, value):
+        return json.dumps(value, ensure_ascii=self.ensure_ascii)
+
+    def leaf_check(self, type_, var):
+        """Returns a condition on var being of a leaf type, or None for any."""
+        if type_ is object:
+            return None
+        return 'type({}) is {}'.format(var, self._name('T', type_))
+
+    def leaf_expr(self, type_, var):
+        """Returns an expression encoding var, known to be of a leaf type."""
+        if type_ is str:
+            return '_encode_str({})'.format(var)
+        if type_ is int:
+            return '_int_repr({})'.format(var)
+        if type_ is float:
+            return '(_float_repr({0}) if {0} - {0} == 0 else _generic({0}))'.format(
+                var)
+        if type_ is bool:
+            return "('true' if {} else 'false')".format(var)
+        if type_ is type(None):
+            return "'null'"
+        if type_ in _FIXED_LAYOUTS:
+            template, attrs = self._layout(type_)
+            expr = '{} % ({},)'.format(
+                self._name('LAYOUT', template),
+                ', '.join('{}.{}'.format(var, attr) for attr in attrs))
+            condition = _FIXED_LAYOUTS[type_][1]
+            if condition is not None:
+                expr = '({} if {} else _generic({}))'.format(
+                    expr, condition.replace('v.', var + '.'), var)
+            return expr
+        return '_generic({})'.format(var)
+
+    def function(self, shape):
+        """Generates the function encoding a shape and returns its name."""
+        name = '_encode_{}'.format(len(self.functions))
+        lines = ['    def {}(obj):'.format(name)]
+        self.functions.append(lines)
+        if type(shape) is dict:
+            self._dict_body(shape, lines)
+        elif type(shape) is list:
+            lines.append('        if type(obj) is not list:')
+            lines.append('            return _generic(obj)')
+            lines.append("        return '[' + {!r}.join(map({}, obj)) + ']'".format(
+                self.item_separator, self.function(shape[0])))
+        else:
+            check = self.leaf_check(shape, 'obj')
+            if check is not None:
+                lines.append('        if not {}:'.format(check))
+                lines.append('            return _generic(obj)')
+            lines.append('        return {}'.format(self.leaf_expr(shape, 'obj')))
+        return name
+
+    def _dict_body(self, shape, lines):
+        lines.append('        if type(obj) is not dict or len(obj) != {}:'.format(
+            len(shape)))
+        lines.append('            return _generic(obj)')
+        if not shape:
+            lines.append("        return '{}'")
+            return
+        lines.append('        try:')
+        for i, key in enumerate(shape):
+            lines.append('            v{} = obj[{!r}]'.format(i, key))
+        lines.append('        except KeyError:')
+        lines.append('            return _generic(obj)')
+        checks = []
+        exprs = []
+        for i, (key, value_shape) in enumerate(shape.items()):
+            var = 'v{}'.format(i)
+            if type(value_shape) in (dict, list):
+                expr = '{}({})'.format(self.function(value_shape), var)
+            else:
+                check = self.leaf_check(value_shape, var)
+                if check is not None:
+                    checks.append(check)
+                expr = self.leaf_expr(value_shape, var)
+            prefix = self.item_separator if i else '{'
+            exprs.append(repr(prefix + self._json(key) + self.key_separator))
+            exprs.append(expr)
+        exprs.append("'}'")
+        if checks:
+            lines.append('        if not ({}):'.format(' and '.join(checks)))
+            lines.append('            return _generic(obj)')
+        lines.append("        return ''.join(({},))".format(', '.join(exprs)))
+
+    def source(self, shape):
+        root = self.function(shape)
+        lines = ['def _make_encoder(_generic):']
+        for function_lines in self.functions:
+            lines.extend(function_lines)
+        lines.append('    return ' + root)
+        return '\n'.join(lines) + '\n'
+
+
+def compile_encoder(schema, **kwargs):
+    """Generates an encoder specialized for payloads of a fixed shape.
+
+    The shape is given by a schema, a sample payload, or a mix of both: types
+    stand for values of that type, dicts for JSON objects with exactly the
+    same keys, and lists of a single item for arrays of items of its shape.
+    Any value in a sample stands for values of its type, and the first item
+    of a list in a sample stands for all of them.
+
+    Values of the types str, int, float, bool and None, as well as naive
+    datetimes, dates, timedeltas and UUIDs, are encoded inline. Values of any
+    other type, and values that don't match the shape - along with the
+    object or array holding them - are encoded the generic way, so any
+    payload can be encoded. Object members are emitted in the order of the
+    shape.
+
+    Parameters
+    ----------
+    schema : object
+        The schema or sample payload, like [{'id': int, 'created':
+        datetime.datetime}] for a list of records.
+    **kwargs
+        Any of the separators and ensure_ascii arguments of dumps, and any
+        morejson option except refs, columnar, pack_numbers, tagless,
+        canonical and iterative.
+
+    Returns
+    -------
+    function
+        A function encoding a single payload into a JSON string.
+
+    Example
+    -------
+    >>> import datetime
+    >>> import morejson
+    >>> encode = morejson.compile_encoder({'id': int, 'day': datetime.date})
+    >>> encode({'id': 1, 'day': datetime.date(2017, 1, 2)})
+    '{"id": 1, "day": {"__type__": "datetime.date", "year": 2017, "month": 1, "day": 2}}'
+    """
+    separators = kwargs.pop('separators', None)
+    ensure_ascii = kwargs.pop('ensure_ascii', True)
+    opts = core._resolve_options(kwargs)  # pylint: disable=W0212
+    if kwargs:
+        raise TypeError("Unsupported arguments: {}".format(
+            ', '.join(sorted(kwargs))))
+    for name in _UNSUPPORTED_OPTIONS:
+        if getattr(opts, name):
+            raise ValueError(
+                "compile_encoder doesn't support the {} option.".format(name))
+    if separators is None:
+        separators = (',', ':') if opts.compact else (', ', ': ')
+    settings = {
+        name: getattr(opts, name)
+        for name in core._OPTION_NAMES  # pylint: disable=W0212
+    }
+    generator = _CodeGenerator(opts, separators, ensure_ascii)
+    source = generator.source(_shape(schema))
+    namespace = generator.namespace
+    exec(compile(source, '<morejson compiled encoder>', 'exec'), namespace)  # pylint: disable=W0122
+    make_encoder = namespace['_make_encoder']
+
+    def _compiled_encoder(obj):
+        call_opts = core._Options(settings)  # pylint: disable=W0212
+        generic = json.JSONEncoder(
+            separators=separators, ensure_ascii=ensure_ascii,
+            default=core._get_morejson_default_encoder(call_opts),  # pylint: disable=W0212
+        ).encode
+        return core._splice_raw_json(  # pylint: disable=W0212
+            make_encoder(generic)(obj), call_opts)
+
+    _compiled_encoder.__doc__ = "Encodes a payload of the shape:\n\n" + source
+    return _compiled_encoder
@@ -1,26 +1,47 @@
 """Core functionalities for morejson."""
 
+import array
+import base64
 import binascii
+import collections
+import collections.abc
+import contextlib
+import contextvars
+import copy
+import dataclasses
 import datetime
+import decimal
+import enum
+import functools
+import hashlib
 import inspect
+import itertools
 import json
+import keyword
+import math
+import operator
+import os
 import pickle
+import re
+import sys
+import threading
+import types
+import typing
+import uuid
 # noinspection PyUnresolvedReferences
 from json import (  # pylint: disable=W0611
     decoder,
     encoder,
+    JSONDecodeError,
     JSONDecoder,
     JSONEncoder,
     scanner,
     _default_decoder,
     _default_encoder
 )
-try:
-    from json import (  # pylint: disable=W0611
-        JSONDecodeError
-    )
-except ImportError:
-    pass # we're on Python 2/3.4 or below
+
+from . import iterative
+from .pointer import find_pointer
 
 try:
     import pytz
@@ -28,29 +49,313 @@ except ImportError:  # pragma: no cover
     # This installation doesn't have pytz, so we can ignore it
     pytz = None
 
+try:
+    import numpy
+    from numpy.lib import format as numpy_format
+except ImportError:  # pragma: no cover
+    # This installation doesn't have numpy, so ndarrays aren't supported
+    numpy = None
+
+try:
+    import zoneinfo
+except ImportError:  # pragma: no cover
+    # we're on Python 3.8 or below
+    zoneinfo = None
+
 # partly based on a great git gist by abhinav-upadhyay:
 # https://gist.github.com/abhinav-upadhyay/5300137
 
 
+# === configuration ===
+
+# CONFIG holds the process-wide defaults. Settings for a specific thread or
+# task are set with the options() context manager, and settings for a single
+# call can be given to dump(s)/load(s) as keyword arguments. All of these are
+# resolved once per call into an _Options object that is handed to every
+# encoder and decoder, so no per-value lookups of shared state are made.
+
+
+class _Config(dict):
+    """A dict counting its changes in its generation attribute, so that what
+    was resolved from it can be reused until it changes."""
+
+    generation = 0
+
+    def _changed(self):
+        self.generation += 1
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed()
+
+    def __ior__(self, other):
+        dict.update(self, other)
+        self._changed()
+        return self
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        value = dict.setdefault(self, key, default)
+        self._changed()
+        return value
+
+    def pop(self, key, *args):
+        value = dict.pop(self, key, *args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._changed()
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        self._changed()
+
+
+CONFIG = _Config({
+    # restore timezones exactly using pickle; see the timezone section
+    "allow_pickle": False,
+    # encode pytz and zoneinfo zones by name, restoring them without pickle
+    "named_zones": False,
+    # use the most compact separators when none are given
+    "compact": False,
+    # emit repeated extended values once, and refer to them by id afterwards
+    "refs": False,
+    # encode lists of records with identical keys column by column
+    "columnar": False,
+    # decode columnar lists of records as a dict of columns
+    "as_columns": False,
+    # decode objects into a 'namedtuple' or 'slots' class per set of keys
+    "records": None,
+    # decode extended values only when they are first accessed
+    "lazy": False,
+    # the text encoding of binary payloads: 'base64' or 'base85'
+    "binary": 'base64',
+    # decode arrays of datetimes into numpy datetime64 arrays
+    "datetime64": False,
+    # the minimum length of int or float lists to encode as packed buffers
+    "pack_numbers": None,
+    # encode extended values without type tags, for decoding with a schema
+    "tagless": False,
+    # the key holding the type tag of extended values
+    "tag_key": '__type__',
+    # use short type tags, like 'dt' for 'datetime.datetime'
+    "short_tags": False,
+    # produce the same bytes for equal objects, in any process
+    "canonical": False,
+    # the number of encoded immutable extended values to keep for reuse
+    "memo": None,
+    # keep the memo of encoded values across calls, rather than per call
+    "shared_memo": False,
+    # encode and decode with an explicit stack, for data nested to any depth
+    "iterative": False,
+})
+
+_OPTION_NAMES = frozenset(CONFIG)
+
+_CONTEXT_OPTIONS = contextvars.ContextVar('morejson_options', default=None)
+
+
+class _Options(object):
+    """The morejson settings in effect for a single call.
+
+    Besides the settings, the state attribute holds a dict in which codecs
+    keep whatever they need to carry from one value to the next during the
+    call, such as the table of references.
+    """
+
+    __slots__ = tuple(sorted(_OPTION_NAMES)) + (
+        'state', 'tags', 'cached', 'allow_nan')
+
+    def __init__(self, settings):
+        for name in _OPTION_NAMES:
+            setattr(self, name, settings[name])
+        self.state = {}
+        # set for options that can be reused by later calls; see _take_cached
+        self.cached = None
+        # the allow_nan argument of an encoding call, which packing follows
+        self.allow_nan = True
+        # maps the type tags of _EncodedTypes to the ones to encode with
+        self.tags = _SHORT_TAGS if self.short_tags else _LONG_TAGS
+
+
+def _resolve_options(kwargs):
+    """Resolves the morejson settings for a single call, popping any
+    morejson-specific keyword arguments out of kwargs."""
+    settings = dict(CONFIG)
+    context_settings = _CONTEXT_OPTIONS.get()
+    if context_settings:
+        settings.update(context_settings)
+    for name in _OPTION_NAMES.intersection(kwargs):
+        settings[name] = kwargs.pop(name)
+    return _Options(settings)
+
+
+@contextlib.contextmanager
+def options(**kwargs):
+    """Sets morejson options for the current thread or asynchronous task.
+
+    Options set this way override the process-wide defaults in CONFIG, and
+    nested uses override the ones they are nested in. Options can be
+    overridden for a single call by giving them as keyword arguments to dump,
+    dumps, load or loads.
+
+    Parameters
+    ----------
+    allow_pickle : bool
+        Use pickle to restore the exact class of timezones that aren't
+        encoded by name. Don't use with JSON from untrusted sources.
+    named_zones : bool
+        Encode pytz and zoneinfo zones by their IANA name, under type tags of
+        their own, and restore them exactly - without pickle - when decoding.
+        Readers older than this option can't decode such zones, so by default
+        all timezones are encoded as datetime.timezone objects, with a fixed
+        offset. Named zones are always decoded, whatever this option is.
+    compact : bool
+        Use the most compact separators, (',', ':'), when none are given.
+    refs : bool
+        Emit each repeated extended value - the same set, or an equal datetime,
+        for example - only once, and refer to it by id afterwards. On decoding,
+        all references resolve to the same object. References in the input
+        are always resolved, regardless of this option.
+    columnar : bool
+        Encode lists of two or more dicts with identical string keys column
+        by column: the keys once, then one array per column, with columns of
+        naive or UTC datetimes, or of dates, packed as a single array of ISO
+        strings.
+    as_columns : bool
+        Decode column-by-column encoded lists of records into a dict mapping
+        each key to a list of values, instead of into a list of dicts.
+    records : str
+        Decode JSON objects into instances of a class generated once per
+        distinct set of keys, which take far less memory than dicts. Either
+        'namedtuple', for a collections.namedtuple, or 'slots', for a class
+        with __slots__. Objects with keys that aren't valid identifiers are
+        still decoded into dicts. Defaults to None, decoding into dicts.
+    lazy : bool
+        Decode extended values only when they are first accessed. Objects and
+        arrays are decoded into LazyDict and LazyList objects, holding a
+        LazyValue placeholder for each extended value, which is decoded and
+        swapped in place when accessed through its container. Use
+        morejson.force to decode all placeholders at once.
+    binary : str
+        The text encoding of binary payloads, like bytes objects or the raw
+        buffers of numpy arrays: 'base64' (the default) or 'base85', which is
+        more compact but much slower to encode and decode.
+    datetime64 : bool
+        Decode arrays made only of datetimes - all naive, or all with fixed
+        offsets - into numpy datetime64[us] arrays, converted in a single
+        vectorized step; aware datetimes are converted to UTC. Packed
+        datetime columns of columnar records decoded with as_columns are
+        converted from their ISO strings the same way. Requires numpy.
+    pack_numbers : int
+        Encode lists of at least this many ints, or of floats, as a single
+        packed binary buffer rather than number by number, using the narrowest
+        integer type that fits for ints, which must fit in 64 bits. Packed
+        lists are decoded back into lists. array.array objects are always
+        encoded this way, and decoded into array.array objects. Float lists
+        holding NaN or infinities aren't packed when allow_nan is false, so
+        json rejects them as usual. Defaults to None, encoding lists as
+        usual.
+    tagless : bool
+        Encode extended values without their __type__ tags, in the most
+        compact plain JSON form of each type: ISO strings for datetimes,
+        dates and times, microseconds for timedeltas, arrays for sets and
+        complex numbers, and so on. Decode such JSON by giving the schema it
+        follows to load or loads. Can't be combined with refs, columnar or
+        pack_numbers.
+    tag_key : str
+        The key holding the type tag of extended values. Defaults to
+        '__type__', and objects tagged under '__type__' are always decoded,
+        whatever the tag key is.
+    short_tags : bool
+        Encode extended values with short type tags, like 'dt' for
+        'datetime.datetime' and 'td' for 'datetime.timedelta'. Both the short
+        and the long tags are always decoded.
+    canonical : bool
+        Encode equal objects into the exact same bytes, in any process and
+        regardless of hash randomization: set members and object keys are
+        sorted, the most compact separators are used when none are given,
+        and timezones are encoded by their offset at a fixed reference time,
+        never with pickle. Floats are always formatted by repr, which is
+        deterministic.
+    memo : int
+        Keep up to this many encoded immutable extended values - dates,
+        datetimes, times, timedeltas, UUIDs, bytes and frozensets - and reuse
+        them for equal values later in the call, evicting the least recently
+        used ones first. Unless the output is indented, repeated values are
+        emitted as ready JSON text, which isn't encoded anew. Ignored with
+        refs, which emits repeated values only once anyway. Defaults to None,
+        encoding every occurrence.
+    shared_memo : bool
+        Keep memoized values across calls, in memos shared by all threads and
+        bounded by the memo option of the calls using them. Frozensets are
+        only memoized within a call, as their members might change between
+        calls, and calls given a default or cls only share them when their
+        output is indented.
+    iterative : bool
+        Encode and decode with a stack of open arrays and objects, rather
+        than by recursion, so data nested to any depth is handled, at a
+        constant cost per value. Output and decoded values are the same,
+        and default, cls, object_hook and object_pairs_hook are followed
+        as usual, but shallow data is encoded and decoded several times
+        slower than by the C code of the json module, which iterative mode
+        replaces. The walks of the pack_numbers, columnar and datetime64
+        options are still recursive.
+
+    Example
+    -------
+    >>> import morejson
+    >>> with morejson.options(compact=True):
+    ...     morejson.dumps({'set': {1}})
+    '{"set":{"__type__":"set","members":[1]}}'
+    """
+    unknown = set(kwargs) - _OPTION_NAMES
+    if unknown:
+        raise TypeError("Unknown morejson options: {}".format(
+            ', '.join(sorted(unknown))))
+    settings = dict(_CONTEXT_OPTIONS.get() or {})
+    settings.update(kwargs)
+    token = _CONTEXT_OPTIONS.set(settings)
+    try:
+        yield
+    finally:
+        _CONTEXT_OPTIONS.reset(token)
+
+
+def allow_pickle():
+    """Returns whether pickle is allowed in the current context."""
+    return _resolve_options({}).allow_pickle
+
+
 # === date ===
 
-def _date_encoder(obj):
+def _date_encoder(obj, opts):
     return {
-        _MOREJSON_TYPE : _EncodedTypes.DATE,
+        opts.tag_key : opts.tags[_EncodedTypes.DATE],
         'year' : obj.year,
         'month' : obj.month,
         'day' : obj.day
     }
 
-def _date_decoder(dict_obj):
+def _date_decoder(dict_obj, opts):
     return datetime.date(**dict_obj)
 
 
 # === time ===
 
-def _time_encoder(obj):
+def _time_encoder(obj, opts):
     dict_obj = {
-        _MOREJSON_TYPE : _EncodedTypes.TIME,
+        opts.tag_key : opts.tags[_EncodedTypes.TIME],
         'hour' : obj.hour,
         'minute' : obj.minute,
         'second' : obj.second,
@@ -61,15 +366,15 @@ def _time_encoder(obj):
         dict_obj['fold'] = obj.fold
     return dict_obj
 
-def _time_decoder(dict_obj):
+def _time_decoder(dict_obj, opts):
     return datetime.time(**dict_obj)
 
 
 # === datetime ===
 
-def _datetime_encoder(obj):
+def _datetime_encoder(obj, opts):
     rv = {
-        _MOREJSON_TYPE : _EncodedTypes.DATETIME,
+        opts.tag_key : opts.tags[_EncodedTypes.DATETIME],
         'year' : obj.year,
         'month' : obj.month,
         'day' : obj.day,
@@ -79,25 +384,27 @@ def _datetime_encoder(obj):
         'microsecond' : obj.microsecond,
     }
     if obj.tzinfo:
-        rv["tzinfo"] = _timezone_encoder(obj.tzinfo, dt=obj)
+        rv["tzinfo"] = _timezone_encoder(obj.tzinfo, opts, dt=obj)
     return rv
 
 
-def _datetime_decoder(dict_obj):
+def _datetime_decoder(dict_obj, opts):
+    if opts.datetime64:
+        return _datetime_fields(dict_obj)
     return datetime.datetime(**dict_obj)
 
 
 # === timedelta ===
 
-def _timedelta_encoder(obj):
+def _timedelta_encoder(obj, opts):
     return {
-        _MOREJSON_TYPE : _EncodedTypes.TIMEDELTA,
+        opts.tag_key : opts.tags[_EncodedTypes.TIMEDELTA],
         'days' : obj.days,
         'seconds' : obj.seconds,
         'microseconds' : obj.microseconds
     }
 
-def _timedelta_decoder(dict_obj):
+def _timedelta_decoder(dict_obj, opts):
     return datetime.timedelta(**dict_obj)
 
 
@@ -110,78 +417,1319 @@ def _timedelta_decoder(dict_obj):
 #  many purposes, but for example, it causes the unit test to fail because the input and output
 # are different (though equivalent) classes. So if you need the exact TZ class returned in a
 # roundtrip, you can set allow_pickle=True, but be wary of accepting JSON from untrusted sources.
-
-CONFIG = {
-    "allow_pickle": False,
-}
-
-
-def allow_pickle():
-    return CONFIG.get("allow_pickle", False)
-
-
-def _timezone_encoder(obj, dt=None):
+# Zones that have a name - pytz zones and zoneinfo.ZoneInfo - don't need pickle at all; with the
+# named_zones option they are encoded by name and restored exactly through a cached lookup. This
+# is opt-in since readers without the option can't decode them.
+
+def _named_zone(obj):
+    """Returns a (type, zone, zone_state) tuple for timezones that can be
+    restored by name, or None for any other timezone."""
+    if zoneinfo is not None and type(obj) is zoneinfo.ZoneInfo:
+        if obj.key is None:
+            return None  # constructed from a file, so it has no name
+        return _EncodedTypes.ZONEINFO, obj.key, None
+    if pytz is not None:
+        if obj is pytz.UTC:
+            return _EncodedTypes.PYTZ_UTC, None, None
+        if isinstance(obj, pytz._FixedOffset):  # pylint: disable=W0212
+            return _EncodedTypes.PYTZ_FIXEDOFFSET, None, None
+        if isinstance(obj, pytz.tzinfo.BaseTzInfo):
+            # the pickle arguments of pytz zones hold the zone name and, for
+            # zones with DST, the state identifying the exact tzinfo instance
+            args = obj.__reduce__()[1]
+            return _EncodedTypes.PYTZ_TIMEZONE, args[0], list(args[1:]) or None
+    return None
+
+
+# the time at which canonical encodings take the offset of lone timezones
+_CANONICAL_TZ_REFERENCE = datetime.datetime(2000, 1, 1)
+
+
+def _timezone_encoder(obj, opts, dt=None):
     if dt is None:
-        dt = datetime.datetime.now()
+        if opts.canonical:
+            dt = _CANONICAL_TZ_REFERENCE
+        else:
+            dt = datetime.datetime.now()
     rv = {
-        _MOREJSON_TYPE: _EncodedTypes.TIMEZONE,
+        opts.tag_key: opts.tags[_EncodedTypes.TIMEZONE],
         'offset': obj.utcoffset(dt),
         'name': obj.tzname(dt),
     }
-    if allow_pickle():
+    named = _named_zone(obj) if opts.named_zones else None
+    if named is not None:
+        # Zones that can be looked up by name are restored exactly without
+        # pickle; 'offset' and 'name' are kept as a fallback for readers that
+        # can't resolve the zone.
+        objtype, zone, zone_state = named
+        rv[opts.tag_key] = opts.tags[objtype]
+        if zone is not None:
+            rv['zone'] = zone
+        if zone_state is not None:
+            rv['zone_state'] = zone_state
+    elif opts.allow_pickle and not opts.canonical:
         # Hacky, but this allows us to restore the exact class that was used
         rv['__pickle__'] = binascii.b2a_base64(pickle.dumps(obj)).decode("ascii").strip()
     return rv
 
 
-def _timezone_decoder(dict_obj):
+def _timezone_decoder(dict_obj, opts):
     pickle_str = dict_obj.pop("__pickle__", None)
-    if allow_pickle() and pickle_str:
+    if opts.allow_pickle and pickle_str:
         return pickle.loads(binascii.a2b_base64(pickle_str.encode("ascii")))
     return datetime.timezone(**dict_obj)
 
 
+# Each distinct zone is resolved once per process; the number of distinct
+# zones (and DST states of pytz zones) in use is small.
+
+@functools.lru_cache(maxsize=1024)
+def _lookup_zoneinfo(zone):
+    return zoneinfo.ZoneInfo(zone)
+
+
+@functools.lru_cache(maxsize=1024)
+def _lookup_pytz_zone(zone, zone_state):
+    if zone_state:
+        return pytz.tzinfo.unpickler(zone, *zone_state)
+    return pytz.timezone(zone)
+
+
+def _zoneinfo_decoder(dict_obj, opts):
+    zone = dict_obj.pop('zone', None)
+    if zoneinfo is not None and zone is not None:
+        try:
+            return _lookup_zoneinfo(zone)
+        except zoneinfo.ZoneInfoNotFoundError:
+            pass
+    return _timezone_decoder(dict_obj, opts)
+
+
+def _pytz_timezone_decoder(dict_obj, opts):
+    zone = dict_obj.pop('zone', None)
+    zone_state = dict_obj.pop('zone_state', None)
+    if pytz is not None and zone is not None:
+        try:
+            return _lookup_pytz_zone(zone, tuple(zone_state or ()))
+        except pytz.UnknownTimeZoneError:
+            pass
+    return _timezone_decoder(dict_obj, opts)
+
+
+def _pytz_utc_decoder(dict_obj, opts):
+    if pytz is not None:
+        return pytz.UTC
+    return _timezone_decoder(dict_obj, opts)
+
+
+def _pytz_fixedoffset_decoder(dict_obj, opts):
+    if pytz is not None:
+        offset = dict_obj['offset']
+        return pytz.FixedOffset(
+            offset.days * 1440 + offset.seconds // 60)
+    return _timezone_decoder(dict_obj, opts)
+
+
 # === set ===
 
-def _set_encoder(obj):
+# Set members are listed in hash order, which differs between processes. With
+# the canonical option, they are sorted instead: by value if all of them are
+# strings, bytes, or numbers other than NaN, and by their canonical JSON
+# encoding otherwise, as any other types may not be totally ordered.
+
+_NATURALLY_ORDERED = (
+    frozenset([str]), frozenset([bytes]), frozenset([int]),
+    frozenset([float]), frozenset([int, float]))
+
+
+def _canonical_members(obj, opts):
+    if frozenset(map(type, obj)) in _NATURALLY_ORDERED:
+        members = sorted(obj)
+        if not any(member != member for member in members):  # no NaN
+            return members
+    encode = json.JSONEncoder(
+        sort_keys=True, separators=(',', ':'),
+        default=_get_morejson_default_encoder(opts, memo=False)).encode
+    return sorted(obj, key=encode)
+
+
+def _set_members(obj, opts):
+    if opts.canonical:
+        return _canonical_members(obj, opts)
+    return list(obj)
+
+
+def _set_encoder(obj, opts):
     return {
-        _MOREJSON_TYPE : _EncodedTypes.SET,
-        'members' : list(obj)
+        opts.tag_key : opts.tags[_EncodedTypes.SET],
+        'members' : _set_members(obj, opts)
     }
 
-def _set_decoder(dict_obj):
+def _set_decoder(dict_obj, opts):
     return set(dict_obj['members'])
 
 
 # === frozenset ===
 
-def _frozenset_encoder(obj):
+def _frozenset_encoder(obj, opts):
     return {
-        _MOREJSON_TYPE : _EncodedTypes.FROZENSET,
-        'members' : list(obj)
+        opts.tag_key : opts.tags[_EncodedTypes.FROZENSET],
+        'members' : _set_members(obj, opts)
     }
 
-def _frozenset_decoder(dict_obj):
+def _frozenset_decoder(dict_obj, opts):
     return frozenset(dict_obj['members'])
 
 
 # === complex ===
 
-def _complex_encoder(obj):
+def _complex_encoder(obj, opts):
     return {
-        _MOREJSON_TYPE : _EncodedTypes.COMPLEX,
+        opts.tag_key : opts.tags[_EncodedTypes.COMPLEX],
         'real': obj.real,
         'imag' : obj.imag
     }
 
-def _complex_decoder(dict_obj):
+def _complex_decoder(dict_obj, opts):
     return complex(dict_obj['real'], dict_obj['imag'])
 
 
+# === binary payloads ===
+
+_BINARY_CODECS = {
+    # binascii reads an ASCII str in place; base64.b64decode would first
+    # copy it into bytes with str.encode('ascii')
+    'base64': (base64.b64encode, binascii.a2b_base64),
+    'base85': (base64.b85encode, base64.b85decode),
+}
+
+
+def _encode_binary(data, encoding):
+    """Encodes a bytes-like object as text, reading it through the buffer
+    protocol without copying it first."""
+    try:
+        codec = _BINARY_CODECS[encoding]
+    except KeyError:
+        raise ValueError("Unknown binary encoding: {!r}".format(encoding))
+    return codec[0](data).decode('ascii')
+
+
+def _decode_binary(text, encoding):
+    # base85 still makes one ASCII bytes copy of text, inside b85decode
+    return _BINARY_CODECS[encoding][1](text)
+
+
+# === decimal.Decimal ===
+
+def _decimal_encoder(obj, opts):
+    # a string keeps every digit, the exponent and special values exactly
+    return {
+        opts.tag_key : opts.tags[_EncodedTypes.DECIMAL],
+        'value' : str(obj)
+    }
+
+def _decimal_decoder(dict_obj, opts):
+    return decimal.Decimal(dict_obj['value'])
+
+
+# === uuid.UUID ===
+
+def _uuid_encoder(obj, opts):
+    return {
+        opts.tag_key : opts.tags[_EncodedTypes.UUID],
+        'hex' : obj.hex
+    }
+
+def _uuid_decoder(dict_obj, opts):
+    return uuid.UUID(hex=dict_obj['hex'])
+
+
+# === enum.Enum ===
+
+# Members are encoded by the module and qualified name of their class, and
+# their value. On decoding, the class is only looked up among the modules that
+# are already imported, so decoding never imports anything. Members of enums
+# mixing in a JSON type, like IntEnum, are encoded by json as plain values.
+
+def _enum_encoder(obj, opts):
+    cls = type(obj)
+    return {
+        opts.tag_key : opts.tags[_EncodedTypes.ENUM],
+        'module' : cls.__module__,
+        'name' : cls.__qualname__,
+        'value' : obj.value
+    }
+
+
+def _enum_class(module_name, name):
+    obj = sys.modules[module_name]
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    if not (isinstance(obj, type) and issubclass(obj, enum.Enum)):
+        raise TypeError("{}.{} is not an Enum.".format(module_name, name))
+    return obj
+
+
+@functools.lru_cache(maxsize=1024)
+def _enum_members(cls):
+    """Returns a dict mapping the values of an Enum to its members."""
+    res = {}
+    for member in cls.__members__.values():
+        try:
+            res.setdefault(member.value, member)
+        except TypeError:
+            pass  # unhashable values are looked up by the Enum itself
+    return res
+
+
+def _enum_decoder(dict_obj, opts):
+    cls = _enum_class(dict_obj['module'], dict_obj['name'])
+    value = dict_obj['value']
+    if type(value) is list:
+        value = tuple(value)  # tuple values are encoded as arrays
+    try:
+        return _enum_members(cls)[value]
+    except (KeyError, TypeError):
+        return cls(dict_obj['value'])
+
+
+# === bytes, bytearray and memoryview ===
+
+def _bytes_encoder(obj, opts):
+    return {
+        opts.tag_key : opts.tags[_EncodedTypes.BYTES],
+        'encoding' : opts.binary,
+        'data' : _encode_binary(obj, opts.binary)
+    }
+
+def _bytes_decoder(dict_obj, opts):
+    return _decode_binary(dict_obj['data'], dict_obj.get('encoding', 'base64'))
+
+
+def _bytearray_encoder(obj, opts):
+    dict_obj = _bytes_encoder(obj, opts)
+    dict_obj[opts.tag_key] = opts.tags[_EncodedTypes.BYTEARRAY]
+    return dict_obj
+
+def _bytearray_decoder(dict_obj, opts):
+    return bytearray(_bytes_decoder(dict_obj, opts))
+
+
+def _memoryview_encoder(obj, opts):
+    if not obj.c_contiguous:
+        obj = memoryview(obj.tobytes()).cast(obj.format, obj.shape)
+    dict_obj = _bytes_encoder(obj, opts)
+    dict_obj[opts.tag_key] = opts.tags[_EncodedTypes.MEMORYVIEW]
+    dict_obj['format'] = obj.format
+    dict_obj['shape'] = list(obj.shape)
+    return dict_obj
+
+def _memoryview_decoder(dict_obj, opts):
+    # a read-only view over the decoded bytes, in the format it was encoded in
+    res = memoryview(_bytes_decoder(dict_obj, opts))
+    format_ = dict_obj.get('format', 'B')
+    shape = dict_obj.get('shape')
+    if format_ != 'B' or (shape is not None and len(shape) != 1):
+        res = res.cast(format_, shape)
+    return res
+
+
+# === array.array and packed number lists ===
+
+# Buffers are always stored little-endian. Only the typecode is stored, so
+# arrays of C types whose size differs across platforms, like 'l', are decoded
+# into the same-size array of the decoding platform when the sizes differ.
+
+_SIGNED_TYPECODES = 'bhilq'
+_UNSIGNED_TYPECODES = 'BHILQ'
+# the narrowest of these is used for ints, by the bound of their magnitude
+_INT_TYPECODES = (('b', 2 ** 7), ('h', 2 ** 15), ('i', 2 ** 31), ('q', 2 ** 63))
+
+
+class _PackedNumbers(object):
+    """A list of numbers of a single type, to be encoded as a packed buffer."""
+
+    __slots__ = ('array',)
+
+    def __init__(self, array_obj):
+        self.array = array_obj
+
+
+def _as_packed(values, allow_nan=True):
+    """Returns a _PackedNumbers for a list of only ints that fit in 64 bits,
+    or of only floats - all finite, unless allow_nan is true - and None for
+    any other list."""
+    value_types = set(map(type, values))
+    if value_types == {float}:
+        if not allow_nan and not all(map(math.isfinite, values)):
+            return None  # left for json to reject
+        return _PackedNumbers(array.array('d', values))
+    if value_types == {int}:
+        low, high = min(values), max(values)
+        for typecode, bound in _INT_TYPECODES:
+            if -bound <= low and high < bound:
+                return _PackedNumbers(array.array(typecode, values))
+    return None
+
+
+def _to_packed(obj, threshold, markers, allow_nan):
+    """Replaces every long enough list of ints or floats in obj by a
+    _PackedNumbers, returning a new object if anything was replaced."""
+    if isinstance(obj, dict):
+        container, items = dict, obj.items()
+    elif isinstance(obj, (list, tuple)):
+        if len(obj) >= threshold and type(obj) is list:
+            packed = _as_packed(obj, allow_nan)
+            if packed is not None:
+                return packed
+        container, items = None, obj
+    else:
+        return obj
+    if id(obj) in markers:
+        raise ValueError("Circular reference detected")
+    markers.add(id(obj))
+    if container is dict:
+        res = {key: _to_packed(value, threshold, markers, allow_nan)
+               for key, value in items}
+    else:
+        res = [_to_packed(value, threshold, markers, allow_nan)
+               for value in items]
+    markers.remove(id(obj))
+    return res
+
+
+def _encode_array(array_obj, objtype, opts):
+    if sys.byteorder == 'big':  # pragma: no cover
+        array_obj = array.array(array_obj.typecode, array_obj)
+        array_obj.byteswap()
+    return {
+        opts.tag_key : opts.tags[objtype],
+        'typecode' : array_obj.typecode,
+        'itemsize' : array_obj.itemsize,
+        'encoding' : opts.binary,
+        'data' : _encode_binary(array_obj, opts.binary)
+    }
+
+
+def _decode_array(dict_obj):
+    typecode = dict_obj['typecode']
+    itemsize = dict_obj.get('itemsize', array.array(typecode).itemsize)
+    res = array.array(typecode)
+    if res.itemsize != itemsize:
+        for codes in (_SIGNED_TYPECODES, _UNSIGNED_TYPECODES):
+            if typecode in codes:
+                typecode = [code for code in codes
+                            if array.array(code).itemsize == itemsize][0]
+        res = array.array(typecode)
+    res.frombytes(
+        _decode_binary(dict_obj['data'], dict_obj.get('encoding', 'base64')))
+    if sys.byteorder == 'big':  # pragma: no cover
+        res.byteswap()
+    return res
+
+
+def _array_encoder(obj, opts):
+    return _encode_array(obj, _EncodedTypes.ARRAY, opts)
+
+def _array_decoder(dict_obj, opts):
+    return _decode_array(dict_obj)
+
+
+def _packed_numbers_encoder(obj, opts):
+    return _encode_array(obj.array, _EncodedTypes.PACKED_NUMBERS, opts)
+
+def _packed_numbers_decoder(dict_obj, opts):
+    return _decode_array(dict_obj).tolist()
+
+
+# === numpy.ndarray ===
+
+def _ndarray_encoder(obj, opts):
+    if obj.dtype.hasobject:
+        raise TypeError("numpy arrays of Python objects are not supported.")
+    # a no-op for the usual C-contiguous array; note it makes 0-d arrays 1-d
+    data = numpy.ascontiguousarray(obj).reshape(-1).view(numpy.uint8)
+    return {
+        opts.tag_key : opts.tags[_EncodedTypes.NDARRAY],
+        'dtype' : numpy_format.dtype_to_descr(obj.dtype),
+        'shape' : list(obj.shape),
+        'encoding' : opts.binary,
+        'data' : _encode_binary(data, opts.binary)
+    }
+
+def _ndarray_decoder(dict_obj, opts):
+    # the array is a read-only view over the decoded bytes; no copy is made
+    return numpy.frombuffer(
+        _decode_binary(dict_obj['data'], dict_obj.get('encoding', 'base64')),
+        dtype=numpy_format.descr_to_dtype(dict_obj['dtype']),
+    ).reshape(tuple(dict_obj['shape']))
+
+
+# === datetime64 ===
+
+# With the datetime64 option, datetimes are first decoded into _DatetimeFields
+# tuples, as the array holding them is only complete once parsing is done.
+# _finish_datetime64 then converts every array made only of them at once, and
+# any other into datetime objects. Decoders of other extended types get
+# datetime objects, as their fields are materialized - at any depth - before
+# they are called, and custom object hooks get the finished values.
+
+class _DatetimeFields(tuple):
+    """The fields of a datetime: its seven numeric fields, tzinfo and fold."""
+
+    __slots__ = ()
+
+    def to_datetime(self):
+        return datetime.datetime(*self[:7], tzinfo=self[7], fold=self[8])
+
+
+def _datetime_fields(dict_obj):
+    get = dict_obj.get
+    return _DatetimeFields((
+        dict_obj['year'], dict_obj['month'], dict_obj['day'], get('hour', 0),
+        get('minute', 0), get('second', 0), get('microsecond', 0),
+        get('tzinfo'), get('fold', 0)))
+
+
+def _datetime64_array(values):
+    """Returns a datetime64[us] array of the given _DatetimeFields, or None if
+    they aren't all naive or all with fixed offsets."""
+    tzinfos = {value[7] for value in values}
+    if None in tzinfos:
+        if len(tzinfos) > 1:
+            return None
+    elif any(type(tzinfo) is not datetime.timezone for tzinfo in tzinfos):
+        return None
+    # one pass over all fields in C, dropping tzinfo and fold afterwards
+    fields = numpy.fromiter(
+        itertools.chain.from_iterable(values), dtype=object,
+        count=9 * len(values)).reshape(-1, 9)[:, :7].astype(numpy.int64)
+    years, months, days, hours, minutes, seconds, micros = fields.T
+    res = ((years - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+           + (months - 1).astype('timedelta64[M]')).astype('datetime64[D]')
+    res = res + (days - 1).astype('timedelta64[D]')
+    micros = ((hours * 60 + minutes) * 60 + seconds) * 1000000 + micros
+    res = res.astype('datetime64[us]') + micros.astype('timedelta64[us]')
+    if None not in tzinfos:
+        offsets = {
+            tzinfo: tzinfo.utcoffset(None) // datetime.timedelta(microseconds=1)
+            for tzinfo in tzinfos
+        }
+        res -= numpy.array(
+            [offsets[value[7]] for value in values], dtype='timedelta64[us]')
+    return res
+
+
+def _iso_datetime64_array(iso):
+    """Returns a datetime64[us] array of a packed column of ISO strings, or
+    None if it mixes naive and UTC datetimes."""
+    # only UTC datetimes have a '+', in their '+00:00' suffix
+    n_utc = ''.join(iso).count('+')
+    if n_utc == len(iso) and iso:
+        iso = [value[:-6] for value in iso]
+    elif n_utc:
+        return None
+    return numpy.array(iso, dtype='datetime64[us]')
+
+
+_DATETIME64_WALKED = frozenset([dict, list, _DatetimeFields])
+
+
+def _materialized(value):
+    """Converts the _DatetimeFields in a decoded value into datetimes, at any
+    depth, in place."""
+    if type(value) is dict:
+        items = value.items()
+    elif type(value) is list:
+        items = enumerate(value)
+    elif type(value) is _DatetimeFields:
+        return value.to_datetime()
+    else:
+        return value
+    for key, item in items:
+        if type(item) in _DATETIME64_WALKED:
+            value[key] = _materialized(item)
+    return value
+
+
+def _get_materializing_decoder(decoder_func):
+    def _materializing_decoder(dict_obj, opts):
+        return decoder_func(_materialized(dict_obj), opts)
+    return _materializing_decoder
+
+
+def _datetime64_decoders(decoder_map):
+    """Returns the decoder map used with the datetime64 option."""
+    res = {
+        objtype: _get_materializing_decoder(decoder_func)
+        for objtype, decoder_func in decoder_map.items()
+    }
+    # these hand the fields on, to be converted with the arrays holding them
+    for objtype in (_EncodedTypes.DATETIME, _EncodedTypes.REF,
+                    _EncodedTypes.COLUMNAR, _EncodedTypes.COLUMN):
+        res[objtype] = decoder_map[objtype]
+        res[_SHORT_TAGS[objtype]] = decoder_map[objtype]
+    return res
+
+
+def _finish_datetime64(obj):
+    """Converts the _DatetimeFields in a decoded object, in place."""
+    if type(obj) is dict:
+        items = obj.items()
+    elif type(obj) is list:
+        if obj and all(type(value) is _DatetimeFields for value in obj):
+            datetimes = _datetime64_array(obj)
+            if datetimes is not None:
+                return datetimes
+        items = enumerate(obj)
+    elif type(obj) is _DatetimeFields:
+        return obj.to_datetime()
+    else:
+        return obj
+    for key, value in items:
+        if type(value) in _DATETIME64_WALKED:
+            obj[key] = _finish_datetime64(value)
+    return obj
+
+
+# === iterators ===
+
+# Generators and other iterators are encoded as JSON arrays. dumps reads them
+# into a list, which the C encoder of json needs; dump, which encodes with the
+# pure Python encoder of json, streams their items one by one instead, so
+# they are never held in memory as a whole.
+
+class _StreamedArray(list):
+    """An iterator encoded as a JSON array by the pure Python json encoder.
+
+    The encoder only checks the truth of a list and iterates over it, so the
+    list itself stays empty; a single item is read ahead, telling whether
+    the iterator is empty.
+    """
+
+    __slots__ = ('_head', '_iterator')
+
+    def __init__(self, iterator):  # pylint: disable=W0231
+        self._iterator = iterator
+        self._head = []
+        for item in iterator:
+            self._head.append(item)
+            break
+
+    def __len__(self):
+        return len(self._head)
+
+    def __iter__(self):
+        head, self._head = self._head, []
+        for item in head:
+            yield item
+        for item in self._iterator:
+            yield item
+
+
+def _iterator_encoder(obj, opts):
+    if opts.state.get('stream'):
+        return _StreamedArray(obj)
+    return list(obj)
+
+
+# === raw JSON ===
+
+class RawJSON(object):
+    """A pre-encoded JSON fragment, emitted verbatim by dump and dumps.
+
+    The fragment is not validated; it's up to the caller to make sure it is
+    valid JSON.
+
+    Parameters
+    ----------
+    json_fragment : str or bytes
+        A JSON value, like '{"a": [1, 2]}'. bytes are decoded as UTF-8.
+
+    Example
+    -------
+    >>> import morejson
+    >>> morejson.dumps({'cached': morejson.RawJSON('{"a":[1,2]}')})
+    '{"cached": {"a":[1,2]}}'
+    """
+
+    __slots__ = ('json',)
+
+    def __init__(self, json_fragment):
+        if isinstance(json_fragment, (bytes, bytearray)):
+            json_fragment = json_fragment.decode('utf-8')
+        self.json = json_fragment
+
+    def __repr__(self):
+        return 'RawJSON({!r})'.format(self.json)
+
+
+# The json module can't emit anything verbatim, so a RawJSON is encoded as a
+# placeholder string, unique to the call, which is replaced by the fragment in
+# the encoded output. \x00 is always escaped by the json module, as \u0000.
+
+_RAW_PLACEHOLDER = '\x00morejson-raw:{}:{}\x00'
+_RAW_PLACEHOLDER_PATTERN = r'"\\u0000morejson-raw:{}:(\d+)\\u0000"'
+
+
+def _raw_json_encoder(obj, opts):
+    raw = opts.state.get('raw')
+    if raw is None:
+        nonce = binascii.hexlify(os.urandom(8)).decode('ascii')
+        raw = opts.state['raw'] = {
+            'nonce': nonce,
+            'fragments': [],
+            'pattern': re.compile(_RAW_PLACEHOLDER_PATTERN.format(nonce)),
+        }
+    raw['fragments'].append(obj.json)
+    return _RAW_PLACEHOLDER.format(raw['nonce'], len(raw['fragments']) - 1)
+
+
+def _splice_raw_json(json_str, opts):
+    """Replaces RawJSON placeholders in encoded output by their fragments."""
+    raw = opts.state.get('raw')
+    if raw is None:
+        return json_str
+    fragments = raw['fragments']
+    return raw['pattern'].sub(
+        lambda match: fragments[int(match.group(1))], json_str)
+
+
+class _RawJSONWriter(object):
+    """Wraps a file-like object, splicing RawJSON fragments into every chunk
+    written to it. A placeholder is never split across chunks, since json.dump
+    writes each encoded string as part of a single chunk."""
+
+    __slots__ = ('_fp', '_opts')
+
+    def __init__(self, fp, opts):
+        self._fp = fp
+        self._opts = opts
+
+    def write(self, chunk):
+        return self._fp.write(_splice_raw_json(chunk, self._opts))
+
+
+# === references ===
+
+# In references mode, the first occurrence of an extended value is wrapped in
+# a reference holding its id and its encoded value, and any later occurrence
+# is encoded as a reference holding only its id. Values whose encoding is
+# determined by their value are matched by value; anything else, like sets,
+# is matched by identity.
+
+def _datetime_ref_key(obj):
+    # equal aware datetimes can still have different timezones, and equal
+    # timezones can still have different names, so timezones are matched by
+    # identity; seen values are kept alive, so their ids aren't reused
+    return type(obj), obj, id(obj.tzinfo), getattr(obj, 'fold', 0)
+
+_REF_KEYS = {
+    datetime.date: lambda obj: (datetime.date, obj),
+    datetime.datetime: _datetime_ref_key,
+    datetime.time: _datetime_ref_key,
+    datetime.timedelta: lambda obj: (datetime.timedelta, obj),
+    # repr tells 0.0 and -0.0 apart
+    complex: lambda obj: (complex, repr(obj)),
+    # str tells apart equal decimals of different precision, like 1.0 and 1
+    decimal.Decimal: lambda obj: (decimal.Decimal, str(obj)),
+    uuid.UUID: lambda obj: (uuid.UUID, obj),
+    bytes: lambda obj: (bytes, obj),
+}
+
+
+def _get_ref_encoder(default_encoder, opts):
+    seen = {}
+    def _ref_encoder(obj):
+        if type(obj) is RawJSON:  # pylint: disable=C0123
+            return default_encoder(obj)  # fragments are emitted verbatim
+        key_func = _REF_KEYS.get(type(obj))
+        if key_func is not None:
+            key = key_func(obj)
+        elif isinstance(obj, collections.abc.Iterator):
+            return default_encoder(obj)  # encoded as plain arrays
+        else:
+            key = id(obj)
+        entry = seen.get(key)
+        if entry is not None:
+            return {opts.tag_key: opts.tags[_EncodedTypes.REF],
+                    'id': entry[0]}
+        ref_id = len(seen)
+        # keeping obj alive makes sure its id isn't reused during the call
+        seen[key] = (ref_id, obj)
+        return {
+            opts.tag_key: opts.tags[_EncodedTypes.REF],
+            'id': ref_id,
+            'value': default_encoder(obj),
+        }
+    return _ref_encoder
+
+
+def _ref_decoder(dict_obj, opts):
+    refs = opts.state.setdefault('refs', {})
+    if 'value' in dict_obj:
+        value = refs[dict_obj['id']] = dict_obj['value']
+        return value
+    try:
+        return refs[dict_obj['id']]
+    except KeyError:
+        # the reference is left undecoded; decoding a part of a document,
+        # the value it refers to might be outside of that part
+        opts.state['unresolved_refs'] = True
+        raise
+
+
+# === memoization ===
+
+# In memo mode, the encoded forms of immutable extended values are kept in a
+# bounded memo, holding the least recently used values first, and reused for
+# any equal value. Unless the output is indented, the encoded form is the JSON
+# text of the value, emitted like a RawJSON fragment, so that the json module
+# doesn't encode it anew either; otherwise it's the dict the value's encoder
+# returns, which the json module only reads.
+#
+# _MEMO_KEYS maps each memoized type to a function returning the key of a
+# value, or to None for values which are their own keys: those whose equal
+# values are always encoded the same. Frozensets are equal to frozensets of
+# equal but differently encoded members, like 1 and 1.0, so they are matched
+# by identity, and are only memoized within a call, as their members might
+# change between calls. Aware datetimes and times are keyed by the identity of
+# their timezone too, as equal timezones can have different names. Memos keep
+# their values alive, so ids used as keys aren't reused. Complex numbers and
+# decimals aren't memoized, as the keys telling apart 0.0 and -0.0, or 1 and
+# 1.0, cost as much as encoding them.
+# No two types share keys.
+
+def _datetime_memo_key(obj):
+    if obj.tzinfo is None and not obj.fold:
+        return obj
+    return obj, id(obj.tzinfo), obj.fold
+
+_MEMO_KEYS = {
+    datetime.date: None,
+    datetime.datetime: _datetime_memo_key,
+    datetime.time: _datetime_memo_key,
+    datetime.timedelta: None,
+    uuid.UUID: None,
+    bytes: None,
+    frozenset: id,
+}
+
+# the options the encoded form of a value depends on
+_MEMO_OPTIONS = (
+    'allow_pickle', 'binary', 'canonical', 'named_zones', 'short_tags',
+    'tag_key', 'tagless')
+
+# the memos shared across calls, one per combination of options and json
+# encoder arguments the encoded forms depend on
+_SHARED_MEMOS = {}
+_SHARED_MEMO_LOCK = threading.Lock()
+
+
+def clear_memo():
+    """Clears the memos of encoded values shared across calls."""
+    with _SHARED_MEMO_LOCK:
+        _SHARED_MEMOS.clear()
+
+
+def _memoize(memo, key, obj, encoded, maxsize):
+    memo[key] = (obj, encoded)
+    while len(memo) > maxsize:
+        memo.popitem(last=False)
+
+
+def _set_up_memo(opts, kwargs, custom):
+    """Sets up the memo of an encoding call, once its json.dump(s) keyword
+    arguments are set; custom tells whether a default or cls was given."""
+    fragments = kwargs.get('indent') is None
+    if fragments:
+        encoder_kwargs = {
+            name: value for name, value in kwargs.items() if name != 'cls'}
+        opts.state['memo_encode'] = (
+            kwargs.get('cls') or JSONEncoder)(**encoder_kwargs).encode
+    if not opts.shared_memo or (fragments and custom):
+        return
+    memo_id = tuple(getattr(opts, name) for name in _MEMO_OPTIONS)
+    if fragments:
+        memo_id += tuple(kwargs.get(name, value) for name, value in (
+            ('skipkeys', False), ('ensure_ascii', True),
+            ('allow_nan', True), ('sort_keys', False),
+            ('separators', None)))
+    with _SHARED_MEMO_LOCK:
+        opts.state['shared_memo'] = _SHARED_MEMOS.setdefault(
+            memo_id, collections.OrderedDict())
+
+
+def _memo_fragment(obj, key, encoded, opts):
+    """Turns the encoded dict of a repeated value into a fragment of its JSON
+    text, if fragments are used, and returns the new encoded form."""
+    encode = opts.state.get('memo_encode')
+    if encode is None:
+        return encoded
+    if type(encoded) is dict:  # pylint: disable=C0123
+        # nested values are emitted as fragments, spliced in right away
+        encoded = _splice_raw_json(encode(encoded), opts)
+        shared = opts.state.get('shared_memo')
+        if shared is not None and _MEMO_KEYS[type(obj)] is not id:
+            with _SHARED_MEMO_LOCK:
+                _memoize(shared, key, obj, encoded, opts.memo)
+    return _raw_json_encoder(RawJSON(encoded), opts)
+
+
+def _shared_memo_encoded(obj, key, default_encoder, opts):
+    """Returns the encoded form of a value missing from the memo of a call,
+    using the memo shared across calls: a fragment if the value was encoded
+    by an earlier call, or its dict."""
+    shared = opts.state['shared_memo']
+    with _SHARED_MEMO_LOCK:
+        entry = shared.get(key)
+        if entry is not None:
+            shared.move_to_end(key)
+    if entry is not None:
+        return _memo_fragment(obj, key, entry[1], opts)
+    encoded = default_encoder(obj)
+    with _SHARED_MEMO_LOCK:
+        _memoize(shared, key, obj, encoded, opts.memo)
+    return encoded
+
+
+def _get_memo_encoder(default_encoder, opts):
+    # a value is encoded into a dict on its first occurrence, and into a
+    # fragment on its second one, so values occurring once cost little more
+    maxsize = opts.memo
+    state = opts.state
+    memo_keys = _MEMO_KEYS
+    memo = collections.OrderedDict()
+    get = memo.get
+    move_to_end = memo.move_to_end
+    def _memo_encoder(obj):
+        key_func = memo_keys.get(type(obj), False)
+        if key_func is None:
+            key = obj
+        elif key_func is False:
+            return default_encoder(obj)
+        else:
+            key = key_func(obj)
+        entry = get(key)
+        if entry is not None:
+            encoded = entry[1]
+            if type(encoded) is not dict or 'memo_encode' not in state:  # pylint: disable=C0123
+                move_to_end(key)
+                return encoded
+            encoded = _memo_fragment(obj, key, encoded, opts)
+        elif 'shared_memo' in state and key_func is not id:
+            encoded = _shared_memo_encoded(obj, key, default_encoder, opts)
+        else:
+            encoded = default_encoder(obj)
+        memo[key] = (obj, encoded)
+        if len(memo) > maxsize:
+            memo.popitem(last=False)
+        return encoded
+    return _memo_encoder
+
+
+# === columnar ===
+
+class _Columnar(object):
+    """A list of records with identical keys, to be encoded column by column."""
+
+    __slots__ = ('keys', 'columns')
+
+    def __init__(self, keys, columns):
+        self.keys = keys
+        self.columns = columns
+
+
+def _packable_datetime(obj):
+    # only these roundtrip exactly through isoformat and fromisoformat
+    return obj.fold == 0 and (
+        obj.tzinfo is None or obj.tzinfo is datetime.timezone.utc)
+
+# column value type: (__type__, can the value be packed, pack, unpack)
+_COLUMN_PACKERS = {
+    datetime.datetime: (
+        'datetime.datetime',
+        _packable_datetime,
+        datetime.datetime.isoformat,
+        datetime.datetime.fromisoformat,
+    ),
+    datetime.date: (
+        'datetime.date',
+        lambda obj: True,
+        datetime.date.isoformat,
+        datetime.date.fromisoformat,
+    ),
+}
+
+_COLUMN_UNPACKERS = {
+    packer[0]: packer[3] for packer in _COLUMN_PACKERS.values()}
+
+
+def _pack_column(column, opts):
+    packer = _COLUMN_PACKERS.get(type(column[0]))
+    if packer is None:
+        if opts.pack_numbers is not None and len(column) >= opts.pack_numbers:
+            return _as_packed(column, opts.allow_nan) or column
+        return column
+    objtype, can_pack, pack, _ = packer
+    for value in column:
+        if type(value) is not type(column[0]) or not can_pack(value):
+            return column
+    return {
+        opts.tag_key: opts.tags[_EncodedTypes.COLUMN],
+        'type': objtype,
+        'iso': [pack(value) for value in column],
+    }
+
+
+def _as_columnar(records):
+    """Returns a _Columnar for a list of records with identical keys, or None
+    for any other list."""
+    if len(records) < 2 or type(records[0]) is not dict or not records[0]:
+        return None
+    keys = list(records[0])
+    for key in keys:
+        if not isinstance(key, str):
+            return None
+    for record in records:
+        if type(record) is not dict or len(record) != len(keys):
+            return None
+    try:
+        columns = [[record[key] for record in records] for key in keys]
+    except KeyError:
+        return None
+    return _Columnar(keys, columns)
+
+
+def _to_columnar(obj, markers):
+    """Replaces every list of records with identical keys in obj by a
+    _Columnar, returning a new object if anything was replaced."""
+    if isinstance(obj, dict):
+        container, items = dict, obj.items()
+    elif isinstance(obj, (list, tuple)):
+        container, items = None, obj
+    else:
+        return obj
+    if id(obj) in markers:
+        raise ValueError("Circular reference detected")
+    markers.add(id(obj))
+    if container is dict:
+        res = {key: _to_columnar(value, markers) for key, value in items}
+    else:
+        res = [_to_columnar(value, markers) for value in items]
+        columnar = _as_columnar(res)
+        if columnar is not None:
+            res = columnar
+    markers.remove(id(obj))
+    return res
+
+
+def _columnar_encoder(obj, opts):
+    keys, columns = obj.keys, obj.columns
+    if opts.canonical:
+        # keys come in the order of the first record; sort them like the
+        # keys of any other object
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        keys = [keys[i] for i in order]
+        columns = [columns[i] for i in order]
+    return {
+        opts.tag_key: opts.tags[_EncodedTypes.COLUMNAR],
+        'keys': keys,
+        'columns': [_pack_column(column, opts) for column in columns],
+    }
+
+
+def _columnar_decoder(dict_obj, opts):
+    keys = dict_obj['keys']
+    columns = dict_obj['columns']
+    if opts.lazy:
+        if opts.as_columns:
+            return LazyDict(zip(keys, columns))
+        return LazyList([LazyDict(zip(keys, row)) for row in zip(*columns)])
+    if opts.as_columns:
+        return dict(zip(keys, columns))
+    if opts.records:
+        record_class = _record_class(tuple(keys), opts.records)
+        if record_class is not None:
+            return [record_class(*row) for row in zip(*columns)]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def _column_decoder(dict_obj, opts):
+    # columns zipped back into rows hold datetimes, as they would without
+    # columnar encoding
+    if (opts.datetime64 and opts.as_columns
+            and dict_obj['type'] == _EncodedTypes.DATETIME):
+        datetimes = _iso_datetime64_array(dict_obj['iso'])
+        if datetimes is not None:
+            return datetimes
+    unpack = _COLUMN_UNPACKERS[dict_obj['type']]
+    return [unpack(value) for value in dict_obj['iso']]
+
+
+# === records ===
+
+class _SlotsRecord(object):
+    """The base class of the __slots__ record classes."""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def _asdict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __reduce__(self):
+        return _unpickle_record, (self.__slots__, 'slots', tuple(
+            getattr(self, name) for name in self.__slots__))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._asdict() == other._asdict()
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Record({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name))
+            for name in self.__slots__))
+
+
+def _reduce_namedtuple_record(self):
+    return _unpickle_record, (self._fields, 'namedtuple', tuple(self))
+
+
+def _unpickle_record(keys, kind, values):
+    # record classes only live in the cache, so they are pickled by their keys
+    return _record_class(keys, kind)(*values)
+
+
+@functools.lru_cache(maxsize=1024)
+def _record_class(keys, kind):
+    """Returns the record class of the given kind for the given keys, or None
+    if the keys can't be attribute names."""
+    for key in keys:
+        if not key.isidentifier() or keyword.iskeyword(key) or (
+                key.startswith('_')):
+            return None
+    if len(set(keys)) != len(keys):
+        return None
+    if kind == 'namedtuple':
+        record_class = collections.namedtuple('Record', keys)
+        record_class.__reduce__ = _reduce_namedtuple_record
+        return record_class
+    if kind == 'slots':
+        return type('Record', (_SlotsRecord,), {'__slots__': keys})
+    raise ValueError("Unknown records kind: {!r}".format(kind))
+
+
+def _get_records_hook(object_hook, plain, kind, tag_keys):
+    """Returns an object_pairs_hook decoding objects into records. plain tells
+    whether object_hook leaves untagged dicts untouched."""
+    def _records_hook(pairs):
+        keys = tuple([pair[0] for pair in pairs])
+        if plain and tag_keys.isdisjoint(keys):
+            record_class = _record_class(keys, kind)
+            if record_class is not None:
+                return record_class(*[pair[1] for pair in pairs])
+            return dict(pairs)
+        dict_obj = dict(pairs)
+        res = object_hook(dict_obj)
+        if res is dict_obj and tag_keys.isdisjoint(dict_obj):
+            record_class = _record_class(keys, kind)
+            if record_class is not None:
+                return record_class(*[pair[1] for pair in pairs])
+        return res
+    return _records_hook
+
+
+# === lazy decoding ===
+
+_UNDECODED = object()
+
+
+class LazyValue(object):
+    """A placeholder for an extended value which is decoded on first use.
+
+    Containers decoded in lazy mode - LazyDict and LazyList objects - replace
+    a placeholder with its decoded value when it is accessed through them.
+    """
+
+    __slots__ = ('_hook', '_dict_obj', '_type', '_value')
+
+    def __init__(self, hook, dict_obj, objtype=None):
+        self._hook = hook
+        self._dict_obj = dict_obj
+        self._type = objtype
+        self._value = _UNDECODED
+
+    @property
+    def type(self):
+        """The __type__ of the placeholder's value."""
+        if self._value is _UNDECODED:
+            return self._type
+        return type(self._value)
+
+    def force(self):
+        """Decodes the value, if not already decoded, and returns it."""
+        if self._value is _UNDECODED:
+            # decoders may read fields with **, which bypasses __getitem__
+            self._dict_obj._force_all()  # pylint: disable=W0212
+            self._value = self._hook(self._dict_obj)
+            self._dict_obj = None
+        return self._value
+
+    def __eq__(self, other):
+        return self.force() == other
+
+    def __ne__(self, other):
+        return self.force() != other
+
+    def __hash__(self):
+        return hash(self.force())
+
+    def __repr__(self):
+        if self._value is _UNDECODED:
+            return '<LazyValue {}>'.format(self.type)
+        return '<LazyValue {!r}>'.format(self._value)
+
+
+def _resolved(value):
+    """Returns what a lazy container should hold instead of value, or value
+    itself if it should hold it as is."""
+    if type(value) is LazyValue:  # pylint: disable=C0123
+        value = value.force()
+    if type(value) is list:  # pylint: disable=C0123
+        return LazyList(value)
+    return value
+
+
+class LazyDict(dict):
+    """A dict decoded in lazy mode, decoding its values on access."""
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        resolved = _resolved(value)
+        if resolved is not value:
+            dict.__setitem__(self, key, resolved)
+        return resolved
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *args):
+        return _resolved(dict.pop(self, key, *args))
+
+    def _force_all(self):
+        for key in self:
+            self[key]  # pylint: disable=W0104
+
+    def values(self):
+        self._force_all()
+        return dict.values(self)
+
+    def items(self):
+        self._force_all()
+        return dict.items(self)
+
+    def copy(self):
+        return LazyDict(self.items())
+
+
+class LazyList(list):
+    """A list decoded in lazy mode, decoding its members on access."""
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyList(list.__getitem__(self, index))
+        value = list.__getitem__(self, index)
+        resolved = _resolved(value)
+        if resolved is not value:
+            list.__setitem__(self, index, resolved)
+        return resolved
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def pop(self, *args):
+        return _resolved(list.pop(self, *args))
+
+    def copy(self):
+        return LazyList(self)
+
+
+def force(obj):
+    """Decodes all extended values left undecoded by lazy decoding.
+
+    Parameters
+    ----------
+    obj : object
+        An object returned by load or loads in lazy mode.
+
+    Returns
+    -------
+    object
+        The given object, with all of its LazyValue placeholders replaced
+        by their decoded values, in place.
+    """
+    obj = _resolved(obj)
+    if isinstance(obj, LazyDict):
+        for value in obj.values():
+            force(value)
+    elif isinstance(obj, LazyList):
+        for value in obj:
+            force(value)
+    return obj
+
+
+# tags of values that other values may depend on being decoded in order
+_EAGER_TYPES = frozenset(['morejson.ref', 'morejson.columnar',
+                          'morejson.column', 'r', 'cols', 'col'])
+
+
+def _get_lazy_hook(object_hook, plain, tag_keys):
+    """Returns an object_pairs_hook deferring the decoding of tagged objects.
+    plain tells whether object_hook leaves untagged dicts untouched."""
+    def _lazy_hook(pairs):
+        dict_obj = LazyDict(pairs)
+        objtype = _find_tag(dict_obj, tag_keys)
+        if objtype is not None:
+            if objtype in _EAGER_TYPES:
+                return object_hook(dict_obj)
+            return LazyValue(object_hook, dict_obj, objtype)
+        if plain:
+            return dict_obj
+        return object_hook(dict_obj)
+    return _lazy_hook
+
+
 # === morejson endocer and decoder ===
 
 _MOREJSON_TYPE = '__type__'
 
+
+def _tag_keys(opts):
+    """Returns the keys type tags are looked for under when decoding."""
+    return frozenset([opts.tag_key, _MOREJSON_TYPE])
+
+
+def _find_tag(dict_obj, tag_keys):
+    for key in tag_keys:
+        if key in dict_obj:
+            return dict_obj[key]
+    return None
+
+
 class _EncodedTypes(object):
     DATE = 'datetime.date'
     TIME = 'datetime.time'
@@ -191,9 +1739,51 @@ class _EncodedTypes(object):
     PYTZ_TIMEZONE = 'pytz.tzinfo.BaseTzInfo'
     PYTZ_FIXEDOFFSET = 'pytz.FixedOffset'
     PYTZ_UTC = 'pytz.UTC'
+    ZONEINFO = 'zoneinfo.ZoneInfo'
     SET = 'set'
     FROZENSET = 'frozenset'
     COMPLEX = 'complex'
+    REF = 'morejson.ref'
+    COLUMNAR = 'morejson.columnar'
+    COLUMN = 'morejson.column'
+    NDARRAY = 'numpy.ndarray'
+    ARRAY = 'array.array'
+    DECIMAL = 'decimal.Decimal'
+    UUID = 'uuid.UUID'
+    ENUM = 'enum.Enum'
+    BYTES = 'bytes'
+    BYTEARRAY = 'bytearray'
+    MEMORYVIEW = 'memoryview'
+    PACKED_NUMBERS = 'morejson.packed'
+
+# the short_tags vocabulary
+_SHORT_TAGS = {
+    _EncodedTypes.DATE: 'd',
+    _EncodedTypes.TIME: 't',
+    _EncodedTypes.DATETIME: 'dt',
+    _EncodedTypes.TIMEDELTA: 'td',
+    _EncodedTypes.TIMEZONE: 'tz',
+    _EncodedTypes.PYTZ_TIMEZONE: 'pytz',
+    _EncodedTypes.PYTZ_FIXEDOFFSET: 'pytz.fo',
+    _EncodedTypes.PYTZ_UTC: 'pytz.utc',
+    _EncodedTypes.ZONEINFO: 'zi',
+    _EncodedTypes.SET: 's',
+    _EncodedTypes.FROZENSET: 'fs',
+    _EncodedTypes.COMPLEX: 'c',
+    _EncodedTypes.REF: 'r',
+    _EncodedTypes.COLUMNAR: 'cols',
+    _EncodedTypes.COLUMN: 'col',
+    _EncodedTypes.NDARRAY: 'nd',
+    _EncodedTypes.ARRAY: 'a',
+    _EncodedTypes.DECIMAL: 'dec',
+    _EncodedTypes.UUID: 'u',
+    _EncodedTypes.ENUM: 'e',
+    _EncodedTypes.BYTES: 'b',
+    _EncodedTypes.BYTEARRAY: 'ba',
+    _EncodedTypes.MEMORYVIEW: 'mv',
+    _EncodedTypes.PACKED_NUMBERS: 'pn',
+}
+_LONG_TAGS = {tag: tag for tag in _SHORT_TAGS}
 
 _ENCODER_MAP = {
     datetime.date: _date_encoder,
@@ -202,7 +1792,16 @@ _ENCODER_MAP = {
     datetime.timedelta: _timedelta_encoder,
     set: _set_encoder,
     frozenset: _frozenset_encoder,
-    complex: _complex_encoder
+    complex: _complex_encoder,
+    decimal.Decimal: _decimal_encoder,
+    uuid.UUID: _uuid_encoder,
+    bytes: _bytes_encoder,
+    bytearray: _bytearray_encoder,
+    memoryview: _memoryview_encoder,
+    _Columnar: _columnar_encoder,
+    array.array: _array_encoder,
+    _PackedNumbers: _packed_numbers_encoder,
+    RawJSON: _raw_json_encoder
 }
 
 _DECODER_MAP = {
@@ -212,106 +1811,997 @@ _DECODER_MAP = {
     _EncodedTypes.TIMEDELTA: _timedelta_decoder,
     _EncodedTypes.SET: _set_decoder,
     _EncodedTypes.FROZENSET: _frozenset_decoder,
-    _EncodedTypes.COMPLEX: _complex_decoder
+    _EncodedTypes.COMPLEX: _complex_decoder,
+    _EncodedTypes.DECIMAL: _decimal_decoder,
+    _EncodedTypes.UUID: _uuid_decoder,
+    _EncodedTypes.ENUM: _enum_decoder,
+    _EncodedTypes.BYTES: _bytes_decoder,
+    _EncodedTypes.BYTEARRAY: _bytearray_decoder,
+    _EncodedTypes.MEMORYVIEW: _memoryview_decoder,
+    _EncodedTypes.REF: _ref_decoder,
+    _EncodedTypes.COLUMNAR: _columnar_decoder,
+    _EncodedTypes.COLUMN: _column_decoder,
+    _EncodedTypes.ARRAY: _array_decoder,
+    _EncodedTypes.PACKED_NUMBERS: _packed_numbers_decoder
 }
 
-try:
-    _ENCODER_MAP[datetime.timezone] = _timezone_encoder
-    _DECODER_MAP[_EncodedTypes.TIMEZONE] = _timezone_decoder
-except AttributeError:
-    pass  # we're on Python 2.x
+_ENCODER_MAP[datetime.timezone] = _timezone_encoder
+_DECODER_MAP[_EncodedTypes.TIMEZONE] = _timezone_decoder
 
 
 if pytz is not None:  # pragma: no branch
     # pytz uses a different class for each zone, so we need the map key to be the base class
-    # BaseTzInfo. Currently, pytz uses the same encoder/decoder as for 'datetime.timezone' as
-    # well as the same __type__ - so you won't see PYTZ_TIMEZONE in the actual JSON. However if
-    # necessary a different decoder could be used if they need to be split off.
+    # BaseTzInfo. pytz zones are encoded by name (see _named_zone), each flavour under its own
+    # __type__, and fall back to a 'datetime.timezone' with the same offset when the zone can't
+    # be resolved on decoding.
     _ENCODER_MAP[pytz.tzinfo.BaseTzInfo] = _timezone_encoder
-    _DECODER_MAP[_EncodedTypes.PYTZ_TIMEZONE] = _timezone_decoder
 
     # Pytz's UTC and FixedOffset class don't have the same base class as the others.
     _ENCODER_MAP[pytz.UTC.__class__] = _timezone_encoder
-    _DECODER_MAP[_EncodedTypes.PYTZ_UTC] = _timezone_decoder
-
     _ENCODER_MAP[pytz._FixedOffset] = _timezone_encoder
-    _DECODER_MAP[_EncodedTypes.PYTZ_FIXEDOFFSET] = _timezone_decoder
 
-    # With Python 2.7 and pytz installed, we can decode "_EncodedTypes.TIMEZONE" with above types, but can't
-    # encode `datetime.timezone` itself since it doesn't exist.
-    _DECODER_MAP[_EncodedTypes.TIMEZONE] = _timezone_decoder
+# the named-zone decoders fall back to a fixed offset when pytz is missing
+_DECODER_MAP[_EncodedTypes.PYTZ_TIMEZONE] = _pytz_timezone_decoder
+_DECODER_MAP[_EncodedTypes.PYTZ_UTC] = _pytz_utc_decoder
+_DECODER_MAP[_EncodedTypes.PYTZ_FIXEDOFFSET] = _pytz_fixedoffset_decoder
+_DECODER_MAP[_EncodedTypes.ZONEINFO] = _zoneinfo_decoder
 
+if zoneinfo is not None:  # pragma: no branch
+    _ENCODER_MAP[zoneinfo.ZoneInfo] = _timezone_encoder
 
-def _morejson_object_hook(dict_obj):
-    try:
-        if _MOREJSON_TYPE not in dict_obj:
-            return dict_obj
-        objtype = dict_obj.pop(_MOREJSON_TYPE)
+if numpy is not None:  # pragma: no branch
+    _ENCODER_MAP[numpy.ndarray] = _ndarray_encoder
+    _DECODER_MAP[_EncodedTypes.NDARRAY] = _ndarray_decoder
+
+# short tags are always decoded
+for _tag, _short_tag in _SHORT_TAGS.items():
+    if _tag in _DECODER_MAP:
+        _DECODER_MAP[_short_tag] = _DECODER_MAP[_tag]
+
+
+# === tagless encoding ===
+
+# With the tagless option, these encoders replace the tagged ones. Values of
+# other types keep their tagged encoding, except for registered classes, whose
+# instances are encoded as plain objects. See the schemas section for the
+# decoding side.
+
+def _tagless_isoformat_encoder(obj, opts):
+    return obj.isoformat()
+
+def _tagless_timedelta_encoder(obj, opts):
+    return obj // datetime.timedelta(microseconds=1)
+
+def _tagless_members_encoder(obj, opts):
+    return _set_members(obj, opts)
+
+def _tagless_complex_encoder(obj, opts):
+    return [obj.real, obj.imag]
+
+def _tagless_decimal_encoder(obj, opts):
+    return str(obj)
+
+def _tagless_uuid_encoder(obj, opts):
+    return obj.hex
+
+def _tagless_bytes_encoder(obj, opts):
+    return _encode_binary(obj, opts.binary)
+
+def _tagless_array_encoder(obj, opts):
+    return obj.tolist()
+
+def _tagless_enum_encoder(obj, opts):
+    return obj.value
+
+_TAGLESS_ENCODER_MAP = {
+    datetime.date: _tagless_isoformat_encoder,
+    datetime.time: _tagless_isoformat_encoder,
+    datetime.datetime: _tagless_isoformat_encoder,
+    datetime.timedelta: _tagless_timedelta_encoder,
+    set: _tagless_members_encoder,
+    frozenset: _tagless_members_encoder,
+    complex: _tagless_complex_encoder,
+    decimal.Decimal: _tagless_decimal_encoder,
+    uuid.UUID: _tagless_uuid_encoder,
+    bytes: _tagless_bytes_encoder,
+    bytearray: _tagless_bytes_encoder,
+    array.array: _tagless_array_encoder,
+}
+
+
+# === schemas ===
+
+# A schema given to load or loads is first normalized into a hashable shape:
+# ('any',), ('leaf', type), ('object', class or None, ((key, shape), ...)),
+# ('optional', shape), ('items', (shape, ...)) for fixed-length tuples,
+# ('recursive', class) for a class within its own shape, or (container, shape)
+# for list, set, frozenset, dict and variable-length tuple values. A converter
+# function is then built once per shape, and applied to the decoded object.
+# Values which are already of the expected type, like tagged values, and None,
+# are left as they are.
+
+_ANY_SHAPE = ('any',)
+
+
+def _tagless_decimal_decoder(value, opts):
+    return decimal.Decimal(value)
+
+def _tagless_uuid_decoder(value, opts):
+    return uuid.UUID(hex=value)
+
+def _tagless_bytes_decoder(value, opts):
+    return _decode_binary(value, opts.binary)
+
+def _tagless_bytearray_decoder(value, opts):
+    return bytearray(_decode_binary(value, opts.binary))
+
+def _tagless_array_decoder(value, opts):
+    # the typecode isn't kept, so values are read back as floats or ints
+    typecode = 'd' if any(type(item) is float for item in value) else 'q'
+    return array.array(typecode, value)
+
+_TAGLESS_DECODER_MAP = {
+    datetime.date: lambda value, opts: datetime.date.fromisoformat(value),
+    datetime.time: lambda value, opts: datetime.time.fromisoformat(value),
+    datetime.datetime: (
+        lambda value, opts: datetime.datetime.fromisoformat(value)),
+    datetime.timedelta: (
+        lambda value, opts: datetime.timedelta(microseconds=value)),
+    complex: lambda value, opts: complex(*value),
+    decimal.Decimal: _tagless_decimal_decoder,
+    uuid.UUID: _tagless_uuid_decoder,
+    bytes: _tagless_bytes_decoder,
+    bytearray: _tagless_bytearray_decoder,
+    array.array: _tagless_array_decoder,
+}
+
+_SCHEMA_CONTAINERS = {
+    list: 'list', set: 'set', frozenset: 'frozenset', dict: 'dict'}
+
+
+# the origins of typing.Union[X, Y] and - on Python 3.10 and above - X | Y
+_UNION_ORIGINS = frozenset([typing.Union, getattr(types, 'UnionType', None)])
+
+
+def _schema_shape(schema, expanding=()):
+    """Returns the shape of a schema.
+
+    expanding holds the dataclasses and TypedDicts whose shapes are being
+    built; a class met again within its own shape gets a ('recursive', class)
+    shape, resolved only when a value of it is converted.
+    """
+    if type(schema) is dict:
+        return ('object', None, tuple(
+            (key, _schema_shape(value, expanding))
+            for key, value in schema.items()))
+    if type(schema) is list:
+        return ('list', _schema_shape(schema[0], expanding)
+                if schema else _ANY_SHAPE)
+    if isinstance(schema, type) and dataclasses.is_dataclass(schema):
+        if schema in expanding:
+            return ('recursive', schema)
+        expanding += (schema,)
+        hints = typing.get_type_hints(schema)
+        return ('object', schema, tuple(
+            (field.name, _schema_shape(hints[field.name], expanding))
+            for field in dataclasses.fields(schema) if field.init))
+    if isinstance(schema, type) and issubclass(schema, dict) and getattr(
+            schema, '__annotations__', None):  # a TypedDict
+        if schema in expanding:
+            return ('recursive', schema)
+        expanding += (schema,)
+        return ('object', None, tuple(
+            (key, _schema_shape(value, expanding))
+            for key, value in typing.get_type_hints(schema).items()))
+    origin = typing.get_origin(schema)
+    args = typing.get_args(schema)
+    if origin in _UNION_ORIGINS:
+        args = [arg for arg in args if arg is not type(None)]
+        if len(args) == 1:
+            return ('optional', _schema_shape(args[0], expanding))
+        return _ANY_SHAPE
+    if origin is tuple or schema is tuple:
+        if not args or (len(args) == 2 and args[1] is Ellipsis):
+            return ('tuple', _schema_shape(args[0], expanding)
+                    if args else _ANY_SHAPE)
+        if args == ((),):  # typing.Tuple[()]
+            args = ()
+        return ('items', tuple(_schema_shape(arg, expanding) for arg in args))
+    if origin in _SCHEMA_CONTAINERS:
+        return (_SCHEMA_CONTAINERS[origin],
+                _schema_shape(args[-1], expanding) if args else _ANY_SHAPE)
+    if schema in _SCHEMA_CONTAINERS:
+        return (_SCHEMA_CONTAINERS[schema], _ANY_SHAPE)
+    if schema in _TAGLESS_DECODER_MAP or (
+            isinstance(schema, type) and issubclass(schema, enum.Enum)):
+        return ('leaf', schema)
+    return _ANY_SHAPE
+
+
+def _leaf_converter(objtype):
+    if issubclass(objtype, enum.Enum):
+        members = _enum_members(objtype)
+        def _decode(value, opts):
+            try:
+                return members[value]
+            except (KeyError, TypeError):
+                return objtype(value)
+    else:
+        _decode = _TAGLESS_DECODER_MAP[objtype]
+    def _convert(value, opts):
+        if value is None or type(value) is objtype:
+            return value
+        return _decode(value, opts)
+    return _convert
+
+
+def _object_converter(cls, fields):
+    converters = [
+        (key, _schema_converter(shape))
+        for key, shape in fields if shape is not _ANY_SHAPE]
+    keys = frozenset(key for key, _ in fields)
+    def _convert(value, opts):
+        if type(value) is not dict:
+            return value
+        for key, convert in converters:
+            if key in value:
+                value[key] = convert(value[key], opts)
+        if cls is not None:
+            if not keys.issuperset(value):
+                raise ValueError("Unexpected keys for {}: {}.".format(
+                    cls.__qualname__, ', '.join(
+                        sorted(repr(key) for key in set(value) - keys))))
+            return cls(**value)
+        return value
+    return _convert
+
+
+def _container_converter(kind, shape):
+    convert = _schema_converter(shape)
+    def _convert(value, opts):
+        if kind == 'dict':
+            if type(value) is not dict:
+                return value
+            return {key: convert(item, opts) for key, item in value.items()}
+        if type(value) is not list:
+            return value
+        items = [convert(item, opts) for item in value]
+        if kind == 'set':
+            return set(items)
+        if kind == 'frozenset':
+            return frozenset(items)
+        if kind == 'tuple':
+            return tuple(items)
+        return items
+    return _convert
+
+
+def _items_converter(shapes):
+    converters = [_schema_converter(shape) for shape in shapes]
+    def _convert(value, opts):
+        if type(value) is not list:
+            return value
+        if len(value) != len(converters):
+            raise ValueError(
+                "Expected an array of {} items, got {} items.".format(
+                    len(converters), len(value)))
+        return tuple(
+            convert(item, opts) for convert, item in zip(converters, value))
+    return _convert
+
+
+def _recursive_converter(cls):
+    converter = []
+    def _convert(value, opts):
+        if not converter:
+            converter.append(_schema_converter(_schema_shape(cls)))
+        return converter[0](value, opts)
+    return _convert
+
+
+@functools.lru_cache(maxsize=1024)
+def _schema_converter(shape):
+    """Returns a function converting a decoded value of the given shape."""
+    kind = shape[0]
+    if kind == 'any':
+        return lambda value, opts: value
+    if kind == 'leaf':
+        return _leaf_converter(shape[1])
+    if kind == 'object':
+        return _object_converter(shape[1], shape[2])
+    if kind == 'optional':
+        return _schema_converter(shape[1])
+    if kind == 'items':
+        return _items_converter(shape[1])
+    if kind == 'recursive':
+        return _recursive_converter(shape[1])
+    return _container_converter(kind, shape[1])
+
+
+# === dispatch snapshots ===
+
+# _ENCODER_MAP and _DECODER_MAP are only mutated while holding _DISPATCH_LOCK,
+# after which _publish_dispatch() replaces the read-only snapshots below. Each
+# call picks up the current snapshots once, so encoding and decoding never read
+# a map while it is being mutated, keeping them safe to run concurrently from
+# many threads, including on free-threaded (no-GIL) builds of Python.
+
+_DISPATCH_LOCK = threading.Lock()
+
+
+def _publish_dispatch():
+    global _ENCODERS, _TAGLESS_ENCODERS, _DECODERS  # pylint: disable=W0601
+    _ENCODERS = types.MappingProxyType(dict(_ENCODER_MAP))
+    tagless_encoders = dict(_ENCODER_MAP)
+    tagless_encoders.update(_TAGLESS_ENCODER_MAP)
+    _TAGLESS_ENCODERS = types.MappingProxyType(tagless_encoders)
+    _DECODERS = types.MappingProxyType(dict(_DECODER_MAP))
+
+
+with _DISPATCH_LOCK:
+    _publish_dispatch()
+
+
+# === registered classes ===
+
+# Instances of arbitrary classes are never encoded or decoded unless their
+# class was registered, so decoding untrusted JSON can only construct classes
+# the application chose. The field accessors of each class are built once, on
+# registration.
+
+_REGISTERED_CLASSES = {}  # tag: class
+
+
+def _class_fields(cls):
+    """Returns the fields of a dataclass or a class with __slots__."""
+    if dataclasses.is_dataclass(cls):
+        return [field.name for field in dataclasses.fields(cls) if field.init]
+    fields = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = [slots]
+        for name in slots:
+            if name in ('__dict__', '__weakref__'):
+                continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_{}{}'.format(klass.__name__.lstrip('_'), name)
+            fields.append(name)
+    if not fields:
+        raise TypeError(
+            "{} is neither a dataclass nor a class with __slots__; "
+            "give its fields explicitly.".format(cls))
+    return fields
+
+
+def _keyword_fields(cls):
+    """Returns the fields of a dataclass that __init__ accepts only by
+    keyword."""
+    if not dataclasses.is_dataclass(cls):
+        return frozenset()
+    return frozenset(
+        field.name for field in dataclasses.fields(cls)
+        if field.init and getattr(field, 'kw_only', False) is True)
+
+
+def _get_class_codecs(cls, fields, tag, keywords=frozenset()):
+    getter = operator.attrgetter(*fields)
+    item_getter = operator.itemgetter(*fields)
+    single = len(fields) == 1
+    field_set = frozenset(fields)
+    positional = [name for name in fields if name not in keywords]
+
+    def _class_encoder(obj, opts):
+        if opts.tag_key in field_set:
+            raise ValueError(
+                "The tag key {!r} is a field of {}.".format(opts.tag_key, cls))
+        values = getter(obj)
+        dict_obj = {} if opts.tagless else {opts.tag_key : tag}
+        dict_obj.update(zip(fields, (values,) if single else values))
+        return dict_obj
+
+    def _class_decoder(dict_obj, opts):
+        if keywords:
+            return cls(
+                *[dict_obj[name] for name in positional],
+                **{name: dict_obj[name] for name in keywords})
+        if single:
+            return cls(item_getter(dict_obj))
+        return cls(*item_getter(dict_obj))
+
+    return _class_encoder, _class_decoder
+
+
+def register_class(cls, fields=None, tag=None):
+    """Registers a class for morejson to encode and decode its instances.
+
+    Instances are encoded as JSON objects holding their fields, and decoded
+    by passing the fields to the class positionally, in order, except for
+    keyword-only fields of dataclasses, which are passed by keyword. Only
+    registered classes are ever constructed on decoding, and instances can't
+    be encoded with a tag_key option naming one of their fields.
+
+    Parameters
+    ----------
+    cls : type
+        A dataclass, whose fields accepted by __init__ are used, or a class
+        with __slots__, whose slots are used and must be accepted by its
+        __init__ positionally, in order.
+    fields : list of str, optional
+        The names of the attributes to encode, in the order __init__ accepts
+        them. Required for classes that are neither dataclasses nor have
+        __slots__.
+    tag : str, optional
+        The __type__ tag of encoded instances. Defaults to the module and
+        qualified name of the class, like 'myapp.models.Point'.
+
+    Raises
+    ------
+    ValueError
+        If the tag is already used by morejson or by another class.
+
+    Example
+    -------
+    >>> import dataclasses
+    >>> import morejson
+    >>> @dataclasses.dataclass
+    ... class Point:
+    ...     x: int
+    ...     y: int
+    >>> morejson.register_class(Point, tag='Point')
+    >>> morejson.dumps(Point(1, 2))
+    '{"__type__": "Point", "x": 1, "y": 2}'
+    """
+    fields = list(_class_fields(cls) if fields is None else fields)
+    if not fields or _MOREJSON_TYPE in fields:
+        raise ValueError("Invalid fields for {}: {!r}".format(cls, fields))
+    if tag is None:
+        tag = '{}.{}'.format(cls.__module__, cls.__qualname__)
+    encoder_func, decoder_func = _get_class_codecs(
+        cls, fields, tag, _keyword_fields(cls) & frozenset(fields))
+    with _DISPATCH_LOCK:
+        if tag in _DECODER_MAP and _REGISTERED_CLASSES.get(tag) is not cls:
+            raise ValueError("The tag {!r} is already in use.".format(tag))
+        _REGISTERED_CLASSES[tag] = cls
+        _ENCODER_MAP[cls] = encoder_func
+        _DECODER_MAP[tag] = decoder_func
+        _publish_dispatch()
+
+
+def _get_morejson_object_hook(opts):
+    decoder_map = _DECODERS
+    if opts.datetime64:
+        decoder_map = _datetime64_decoders(decoder_map)
+    tag_key = opts.tag_key
+    other_tag_key = _MOREJSON_TYPE if tag_key != _MOREJSON_TYPE else None
+    def _morejson_object_hook(dict_obj):
         try:
-            return _DECODER_MAP[objtype](dict_obj)
-        except BaseException:
-            dict_obj[_MOREJSON_TYPE] = objtype
+            key = tag_key
+            if key not in dict_obj:
+                key = other_tag_key
+                if key is None or key not in dict_obj:
+                    return dict_obj
+            # dicts reaching here were just built by the parser of this call
+            # and are not shared, so they can be consumed in place
+            objtype = dict_obj.pop(key)
+            try:
+                return decoder_map[objtype](dict_obj, opts)
+            except BaseException:
+                dict_obj[key] = objtype
+                return dict_obj
+        except TypeError:
             return dict_obj
-    except TypeError:
-        return dict_obj
+    return _morejson_object_hook
 
 
-def _get_wrapped_morejson_hook(custom_hook):
+def _get_wrapped_morejson_hook(custom_hook, opts):
+    morejson_hook = _get_morejson_object_hook(opts)
+    tag_keys = _tag_keys(opts)
+    finish_datetime64 = opts.datetime64
     def _wrapped_morejson_hook(dict_obj):
+        if finish_datetime64:
+            _finish_datetime64(dict_obj)
         first_res = custom_hook(dict_obj)
-        return _morejson_object_hook(first_res)
+        if first_res is not dict_obj and isinstance(first_res, dict):
+            if tag_keys.isdisjoint(first_res):
+                return first_res
+            # a dict the custom hook returned might be shared, so its tag is
+            # popped from a copy, of the same type
+            first_res = copy.copy(first_res)
+        return morejson_hook(first_res)
     return _wrapped_morejson_hook
 
 
-def _morejson_default_encoder(obj): # pylint: disable=E0202
-    try:
-        enc_key = type(obj)
-        if pytz is not None and isinstance(obj, pytz.tzinfo.BaseTzInfo):
-            enc_key = pytz.tzinfo.BaseTzInfo
-        return _ENCODER_MAP[enc_key](obj)
-    except KeyError:
-        raise TypeError("Type {} is not JSON encodable.".format(type(obj)))
-
-
-def _get_wrapped_morejson_default_encoder(custom_default):
+def _get_dispatching_encoder(encoder_map, enum_encoder, opts):
+    def _morejson_default_encoder(obj): # pylint: disable=E0202
+        try:
+            enc_key = type(obj)
+            if pytz is not None and isinstance(obj, pytz.tzinfo.BaseTzInfo):
+                enc_key = pytz.tzinfo.BaseTzInfo
+            encoder_func = encoder_map[enc_key]
+        except KeyError:
+            # each Enum is its own class, so they are matched by base class,
+            # and so are iterators
+            if isinstance(obj, enum.Enum):
+                encoder_func = enum_encoder
+            elif isinstance(obj, collections.abc.Iterator):
+                encoder_func = _iterator_encoder
+            else:
+                raise TypeError(
+                    "Type {} is not JSON encodable.".format(type(obj)))
+        return encoder_func(obj, opts)
+    return _morejson_default_encoder
+
+
+def _tagged_values(value, default):
+    """Encodes the extended values in an encoded value with default."""
+    if type(value) is dict:
+        return {
+            key: _tagged_values(item, default) for key, item in value.items()}
+    if type(value) in (list, tuple):
+        return [_tagged_values(item, default) for item in value]
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return _tagged_values(default(value), default)
+
+
+def _get_tagless_encoder(opts):
+    tagless_default = _get_dispatching_encoder(
+        _TAGLESS_ENCODERS, _tagless_enum_encoder, opts)
+    tagged_default = _get_dispatching_encoder(_ENCODERS, _enum_encoder, opts)
+    tag_key = opts.tag_key
+    def _tagless_encoder(obj):
+        res = tagless_default(obj)
+        if type(res) is dict and tag_key in res:
+            # types without a tagless form keep their tagged form, which
+            # is only decoded with the values in it tagged as well
+            return _tagged_values(res, tagged_default)
+        return res
+    return _tagless_encoder
+
+
+def _get_morejson_default_encoder(opts, memo=True):
+    if opts.tagless:
+        default_encoder = _get_tagless_encoder(opts)
+    else:
+        default_encoder = _get_dispatching_encoder(
+            _ENCODERS, _enum_encoder, opts)
+    if memo and opts.memo and not opts.refs:
+        default_encoder = _get_memo_encoder(default_encoder, opts)
+    if opts.refs:
+        return _get_ref_encoder(default_encoder, opts)
+    return default_encoder
+
+
+def _get_wrapped_morejson_default_encoder(custom_default, opts):
+    morejson_default = _get_morejson_default_encoder(opts)
     def _wrapped_morejson_default_encoder(obj):
         try:
             return custom_default(obj)
         except TypeError:
-            return _morejson_default_encoder(obj)
+            return morejson_default(obj)
     return _wrapped_morejson_default_encoder
 
 
 # === wrapping the json api ===
 
-def dump(obj, fp, **kwargs): # pylint: disable=C0103, C0111
-    default_to_put = _morejson_default_encoder
+# Calls given no keyword arguments, outside of any options() context, are the
+# most common ones, and resolve to the same options every time until CONFIG or
+# the registered classes change. The options of such a call are kept for the
+# next call of its kind, along with the json keyword arguments set for it and
+# a json encoder or decoder made with them, unless the call left state in them
+# - like a table of references - or decoded lazily, leaving placeholders that
+# still use them. Options with refs or memo are never kept, as their encoders
+# hold the seen values in their closures. Options are taken out of the cache
+# while in use, so concurrent and nested calls never share them.
+
+_CACHED_CALLS = {}  # kind: options, whose cached attribute holds a tuple of
+# (CONFIG generation, dispatch snapshot, kind, json kwargs, json codec)
+
+
+def _take_cached(kind, dispatch):
+    """Returns the options cached for calls of the given kind, taking them out
+    of the cache, or None if there are none that are still valid."""
+    if _CONTEXT_OPTIONS.get():
+        return None
+    opts = _CACHED_CALLS.pop(kind, None)
+    if opts is None:
+        return None
+    cached = opts.cached
+    if cached[0] != CONFIG.generation or cached[1] is not dispatch:
+        return None
+    return opts
+
+
+def _release_cached(opts):
+    """Keeps the options of a finished call for reuse by the next call of its
+    kind, if they can be."""
+    if (opts.cached is not None and not opts.state and not opts.lazy
+            and not opts.refs and not opts.memo):
+        _CACHED_CALLS[opts.cached[2]] = opts
+
+
+def _cached_kwargs(kind, kwargs, dispatch, resolve):
+    """Resolves the options of a call given no keyword arguments with the
+    given resolve function, reusing cached options when possible."""
+    opts = _take_cached(kind, dispatch)
+    if opts is not None:
+        kwargs.update(opts.cached[3])
+        return opts
+    generation = CONFIG.generation
+    opts = resolve(kwargs)
+    if not _CONTEXT_OPTIONS.get():
+        codec = (JSONEncoder if kind == 'encoding' else JSONDecoder)(**kwargs)
+        opts.cached = (generation, dispatch, kind, dict(kwargs), codec)
+    return opts
+
+
+def _encoding_kwargs(kwargs):
+    """Resolves the options of an encoding call and sets its json.dump(s)
+    keyword arguments accordingly."""
+    if not kwargs:
+        return _cached_kwargs(
+            'encoding', kwargs, _ENCODERS, _resolve_encoding_kwargs)
+    return _resolve_encoding_kwargs(kwargs)
+
+
+def _resolve_encoding_kwargs(kwargs):
+    opts = _resolve_options(kwargs)
+    opts.allow_nan = kwargs.get('allow_nan', True)
+    if opts.tagless and (opts.refs or opts.columnar or opts.pack_numbers):
+        raise ValueError("The tagless option can't be combined with refs, "
+                         "columnar or pack_numbers.")
+    custom = 'default' in kwargs or kwargs.get('cls') is not None
     if 'default' in kwargs:
-        default_to_put = _get_wrapped_morejson_default_encoder(
-            kwargs.pop('default'))
-    json.dump(obj, fp, default=default_to_put, **kwargs)
+        kwargs['default'] = _get_wrapped_morejson_default_encoder(
+            kwargs.pop('default'), opts)
+    else:
+        kwargs['default'] = _get_morejson_default_encoder(opts)
+    if (opts.compact or opts.canonical) and kwargs.get('separators') is None:
+        kwargs['separators'] = (',', ':')
+    if opts.canonical:
+        kwargs['sort_keys'] = True
+    if opts.memo and not opts.refs:
+        _set_up_memo(opts, kwargs, custom)
+    return opts
+
+
+def _decoding_kwargs(kwargs, schema=None):
+    """Resolves the options of a decoding call and sets its json.load(s)
+    keyword arguments accordingly."""
+    if not kwargs and schema is None:
+        return _cached_kwargs(
+            'decoding', kwargs, _DECODERS, _resolve_decoding_kwargs)
+    return _resolve_decoding_kwargs(kwargs, schema)
+
+
+def _resolve_decoding_kwargs(kwargs, schema=None):
+    opts = _resolve_options(kwargs)
+    if schema is not None and (opts.lazy or opts.records):
+        raise ValueError(
+            "A schema can't be combined with the lazy or records options.")
+    plain = 'object_hook' not in kwargs
+    if plain:
+        kwargs['object_hook'] = _get_morejson_object_hook(opts)
+    else:
+        kwargs['object_hook'] = _get_wrapped_morejson_hook(
+            kwargs.pop('object_hook'), opts)
+    if opts.datetime64:
+        if numpy is None:
+            raise ImportError("The datetime64 option requires numpy.")
+        if opts.lazy or opts.records:
+            raise ValueError(
+                "The datetime64 option can't be combined with lazy or records.")
+    if kwargs.get('object_pairs_hook') is not None:
+        return opts
+    if opts.lazy:
+        if opts.records:
+            raise ValueError("The lazy and records options can't be combined.")
+        kwargs['object_pairs_hook'] = _get_lazy_hook(
+            kwargs['object_hook'], plain, _tag_keys(opts))
+    elif opts.records:
+        _record_class((), opts.records)  # fail early on an unknown kind
+        kwargs['object_pairs_hook'] = _get_records_hook(
+            kwargs['object_hook'], plain, opts.records, _tag_keys(opts))
+    return opts
+
+
+def _finish_decoding(obj, opts, schema=None):
+    """Post-processes the object a decoding call returns."""
+    if schema is not None:
+        obj = _schema_converter(_schema_shape(schema))(obj, opts)
+    if opts.lazy:
+        return _resolved(obj)
+    if opts.datetime64:
+        return _finish_datetime64(obj)
+    return obj
+
+
+def _prepare(obj, opts):
+    """Rewrites obj for the opt-in encodings that change plain JSON containers,
+    which the default encoder never gets to see."""
+    if opts.pack_numbers is not None:
+        obj = _to_packed(obj, opts.pack_numbers, set(), opts.allow_nan)
+    if opts.columnar:
+        obj = _to_columnar(obj, set())
+    return obj
+
+
+# the number of chunks iterative encoding joins into each write
+_ITERATIVE_BATCH = 1024
+
+
+def _iterative_chunks(obj, json_encoder):
+    """Yields the JSON encoding of obj, encoded without recursion, in batches
+    of _ITERATIVE_BATCH chunks."""
+    batch = []
+    for chunk in iterative.iterencode(obj, json_encoder):
+        batch.append(chunk)
+        if len(batch) == _ITERATIVE_BATCH:
+            yield ''.join(batch)
+            batch = []
+    yield ''.join(batch)
+
+
+def dump(obj, fp, **kwargs): # pylint: disable=C0103, C0111
+    opts = _encoding_kwargs(kwargs)
+    opts.state['stream'] = True
+    obj = _prepare(obj, opts)
+    fp = _RawJSONWriter(fp, opts)
+    if not opts.iterative:
+        json.dump(obj, fp, **kwargs)
+        return
+    json_encoder = (kwargs.pop('cls', None) or JSONEncoder)(**kwargs)
+    for chunk in _iterative_chunks(obj, json_encoder):
+        fp.write(chunk)
+
+
+def _cached_dumps(obj, opts):
+    obj = _prepare(obj, opts)
+    json_encoder = opts.cached[4]
+    if opts.iterative:
+        json_str = ''.join(iterative.iterencode(obj, json_encoder))
+    else:
+        json_str = json_encoder.encode(obj)
+    json_str = _splice_raw_json(json_str, opts)
+    _release_cached(opts)
+    return json_str
 
 
 def dumps(obj, **kwargs): # pylint: disable=C0103, C0111
-    default_to_put = _morejson_default_encoder
-    if 'default' in kwargs:
-        default_to_put = _get_wrapped_morejson_default_encoder(
-            kwargs.pop('default'))
-    return json.dumps(obj, default=default_to_put, **kwargs)
+    if not kwargs:
+        opts = _take_cached('encoding', _ENCODERS)
+        if opts is not None:
+            return _cached_dumps(obj, opts)
+    opts = _encoding_kwargs(kwargs)
+    obj = _prepare(obj, opts)
+    if opts.iterative:
+        json_encoder = (kwargs.pop('cls', None) or JSONEncoder)(**kwargs)
+        json_str = ''.join(iterative.iterencode(obj, json_encoder))
+    else:
+        json_str = json.dumps(obj, **kwargs)
+    json_str = _splice_raw_json(json_str, opts)
+    _release_cached(opts)
+    return json_str
+
+
+def _loads(s, kwargs, opts):
+    """Decodes s with json.loads, or without recursion in iterative mode."""
+    if not opts.iterative:
+        return json.loads(s, **kwargs)
+    if isinstance(s, (bytes, bytearray)):
+        s = s.decode(json.detect_encoding(s), 'surrogatepass')
+    elif not isinstance(s, str):
+        raise TypeError(
+            "the JSON object must be str, bytes or bytearray, not {}".format(
+                s.__class__.__name__))
+    if s.startswith('\ufeff'):
+        raise JSONDecodeError(
+            "Unexpected UTF-8 BOM (decode using utf-8-sig)", s, 0)
+    json_decoder = (kwargs.pop('cls', None) or JSONDecoder)(**kwargs)
+    return iterative.decode(s, json_decoder)
+
+
+def _loads_pointer(s, pointer, kwargs, opts):
+    """Decodes only the value the given JSON Pointer points to in s."""
+    if isinstance(s, (bytes, bytearray)):
+        s = s.decode(json.detect_encoding(s), 'surrogatepass')
+    start, end = find_pointer(s, pointer)
+    obj = _loads(s[start:end], kwargs, opts)
+    if opts.state.get('unresolved_refs'):
+        raise ValueError(
+            "The value {!r} points to refers to shared values outside of it; "
+            "decode the whole document instead.".format(pointer))
+    return obj
 
 
 def load(fp, **kwargs): # pylint: disable=C0103, C0111
-    hook_to_put = _morejson_object_hook
-    if 'object_hook' in kwargs:
-        hook_to_put = _get_wrapped_morejson_hook(kwargs.pop('object_hook'))
-    return json.load(fp, object_hook=hook_to_put, **kwargs)
+    pointer = kwargs.pop('pointer', None)
+    schema = kwargs.pop('schema', None)
+    opts = _decoding_kwargs(kwargs, schema)
+    if pointer is not None:
+        return _finish_decoding(
+            _loads_pointer(fp.read(), pointer, kwargs, opts), opts, schema)
+    if opts.iterative:
+        obj = _finish_decoding(_loads(fp.read(), kwargs, opts), opts, schema)
+    else:
+        obj = _finish_decoding(json.load(fp, **kwargs), opts, schema)
+    _release_cached(opts)
+    return obj
+
+
+def _cached_loads(s, opts):
+    # json.loads handles bytes and rejects a BOM before decoding
+    if opts.iterative or type(s) is not str or s.startswith('\ufeff'):
+        obj = _loads(s, dict(opts.cached[3]), opts)
+    else:
+        obj = opts.cached[4].decode(s)
+    if opts.datetime64:
+        obj = _finish_datetime64(obj)
+    _release_cached(opts)
+    return obj
 
 
 def loads(s, **kwargs): # pylint: disable=C0103, C0111
-    hook_to_put = _morejson_object_hook
-    if 'object_hook' in kwargs:
-        hook_to_put = _get_wrapped_morejson_hook(kwargs.pop('object_hook'))
-    return json.loads(s, object_hook=hook_to_put, **kwargs)
+    if not kwargs:
+        opts = _take_cached('decoding', _DECODERS)
+        if opts is not None:
+            return _cached_loads(s, opts)
+    pointer = kwargs.pop('pointer', None)
+    schema = kwargs.pop('schema', None)
+    opts = _decoding_kwargs(kwargs, schema)
+    if pointer is not None:
+        return _finish_decoding(
+            _loads_pointer(s, pointer, kwargs, opts), opts, schema)
+    obj = _finish_decoding(_loads(s, kwargs, opts), opts, schema)
+    _release_cached(opts)
+    return obj
+
+
+def load_path(path, pointer=None, **kwargs):
+    """Deserializes a JSON file, or a part of it, into a Python object.
+
+    When a JSON Pointer is given, values the pointer doesn't lead into are
+    skipped without building any objects for them, and morejson decoding is
+    only applied to the value it points to.
+
+    Parameters
+    ----------
+    path : str
+        The path of the JSON file.
+    pointer : str, optional
+        A JSON Pointer (RFC 6901), like '/meta/generated_at', pointing to the
+        value to decode. If not given, the whole file is decoded.
+    **kwargs
+        Any other keyword argument accepted by loads.
+
+    Returns
+    -------
+    object
+        The decoded value.
+
+    Raises
+    ------
+    KeyError
+        If the pointer refers to a missing object member.
+    IndexError
+        If the pointer refers to a missing array item.
+    ValueError
+        If the value pointed to holds references - see the refs option - to
+        values outside of it.
+    """
+    with open(path, 'rb') as fileobj:
+        return loads(fileobj.read(), pointer=pointer, **kwargs)
+
+
+# fingerprint descends into arrays and objects holding other arrays or objects,
+# and encodes everything else with the C encoder of json, in batches of up to
+# _STREAM_BATCH items; arrays and objects of up to _STREAM_SMALL items holding
+# no others are encoded as single items. Memory use is bounded by the size of
+# a batch, rather than by the size of the whole encoding.
+_STREAM_BATCH = 1024
+_STREAM_SMALL = 64
+
+
+def _is_flat(value):
+    if type(value) is list:
+        items = value
+    elif type(value) is dict:
+        items = value.values()
+    else:
+        return True
+    if len(items) > _STREAM_SMALL:
+        return False
+    for item in items:
+        if type(item) is list or type(item) is dict:
+            return False
+    return True
+
+
+def _stream_chunks(obj, encode, separators, markers):
+    """Yields the chunks of the JSON encoding of obj with sorted keys."""
+    if type(obj) is list:
+        container, items = list, obj
+    elif type(obj) is dict and all(type(key) is str for key in obj):
+        container, items = dict, sorted(obj.items())
+    else:
+        container = None
+    if container is None or _is_flat(obj):
+        yield encode(obj)
+        return
+    if id(obj) in markers:
+        raise ValueError("Circular reference detected")
+    markers.add(id(obj))
+    item_separator, key_separator = separators
+    yield '[' if container is list else '{'
+    batch = []
+    first = True
+    for item in items:
+        value = item if container is list else item[1]
+        if _is_flat(value):
+            batch.append(item)
+            if len(batch) < _STREAM_BATCH:
+                continue
+        if batch:
+            # the batch is encoded as a container, without its brackets
+            yield ('' if first else item_separator) + encode(
+                container(batch))[1:-1]
+            first = False
+            if batch[-1] is item:
+                batch = []
+                continue
+            batch = []
+        if not first:
+            yield item_separator
+        first = False
+        if container is dict:
+            yield encode(item[0]) + key_separator
+        for chunk in _stream_chunks(value, encode, separators, markers):
+            yield chunk
+    if batch:
+        yield ('' if first else item_separator) + encode(container(batch))[1:-1]
+    yield ']' if container is list else '}'
+    markers.remove(id(obj))
+
+
+def fingerprint(obj, algo='sha256', **kwargs):
+    """Returns a digest of the canonical JSON encoding of an object.
+
+    The encoding is fed into the hash chunk by chunk, so the JSON string is
+    never held in memory as a whole. Equal objects get equal digests in any
+    process, as the canonical option is always used.
+
+    Parameters
+    ----------
+    obj : object
+        The object to fingerprint.
+    algo : str, optional
+        The name of any hash algorithm supported by hashlib.new. Defaults to
+        'sha256'.
+    **kwargs
+        Any other keyword argument accepted by dumps.
+
+    Returns
+    -------
+    str
+        The hex digest of the encoding, equal to that of
+        morejson.dumps(obj, canonical=True, **kwargs) encoded as UTF-8.
+    """
+    hash_obj = hashlib.new(algo)
+    kwargs['canonical'] = True
+    opts = _encoding_kwargs(kwargs)
+    json_encoder = (kwargs.pop('cls', None) or JSONEncoder)(**kwargs)
+    obj = _prepare(obj, opts)
+    if opts.iterative or json_encoder.indent is not None:
+        # batches encoded on their own aren't indented by their depth
+        chunks = _iterative_chunks(obj, json_encoder)
+    else:
+        chunks = _stream_chunks(
+            obj, json_encoder.encode,
+            (json_encoder.item_separator, json_encoder.key_separator), set())
+    for chunk in chunks:
+        hash_obj.update(_splice_raw_json(chunk, opts).encode('utf-8'))
+    return hash_obj.hexdigest()
 
 
 _FUNC_MAP = {
@@ -323,7 +2813,4 @@ _FUNC_MAP = {
 
 for _func in _FUNC_MAP:
     _func.__doc__ = _FUNC_MAP[_func].__doc__
-    try:
-        _func.__signature__ = inspect.signature(_FUNC_MAP[_func])
-    except AttributeError:
-        pass  # we're on python 2/3.3 or lower
+    _func.__signature__ = inspect.signature(_FUNC_MAP[_func])
@@ -0,0 +1,295 @@
+"""Encoding and decoding JSON with an explicit stack rather than recursion.
+
+Both the C and the pure Python encoders and decoders of the json module
+recurse once per level of nesting, so they fail on documents nested deeper
+than the recursion limit, and the pure Python encoder passes every chunk up
+through a generator per level. The encoder and decoder here keep the open
+arrays and objects on a stack of their own instead, so they handle any depth,
+at a constant cost per value. Their output, and the values they return, are
+the same as those of the json module given the same arguments.
+"""
+
+from json.decoder import JSONDecodeError, WHITESPACE, scanstring
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+
+_INFINITY = float('inf')
+
+
+def _floatstr(obj, allow_nan):
+    if obj != obj:  # pylint: disable=R0124
+        text = 'NaN'
+    elif obj == _INFINITY:
+        text = 'Infinity'
+    elif obj == -_INFINITY:
+        text = '-Infinity'
+    else:
+        return float.__repr__(obj)
+    if not allow_nan:
+        raise ValueError(
+            "Out of range float values are not JSON compliant: {!r}".format(
+                obj))
+    return text
+
+
+def _key_str(key, encoder):
+    """Returns the JSON object key for a dict key, or None to skip it."""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, float):
+        return _floatstr(key, encoder.allow_nan)
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if encoder.skipkeys:
+        return None
+    raise TypeError("keys must be str, int, float, bool or None, not {}".format(
+        key.__class__.__name__))
+
+
+def _mark(markers, value):
+    """Marks a value as being encoded, returning its marker id, if any."""
+    if markers is None:
+        return None
+    marker_id = id(value)
+    if marker_id in markers:
+        raise ValueError("Circular reference detected")
+    markers[marker_id] = value
+    return marker_id
+
+
+def iterencode(obj, encoder):
+    """Encodes an object into JSON, yielding the encoding chunk by chunk.
+
+    Parameters
+    ----------
+    obj : object
+        The object to encode.
+    encoder : json.JSONEncoder
+        The encoder whose settings - like its separators, indent and default
+        method - are followed.
+
+    Yields
+    ------
+    str
+        The chunks of the JSON encoding of obj.
+    """
+    markers = {} if encoder.check_circular else None
+    encode_str = (
+        encode_basestring_ascii if encoder.ensure_ascii else encode_basestring)
+    indent = encoder.indent
+    if indent is not None and not isinstance(indent, str):
+        indent = ' ' * indent
+    item_separator = encoder.item_separator
+    key_separator = encoder.key_separator
+    allow_nan = encoder.allow_nan
+    # each frame holds the iterator over the items of an array or object
+    # being encoded, whether it's an object, the text opening it - until its
+    # first item is emitted - the text between its items, the text closing
+    # it, and its marker id; values returned by the default method get
+    # frames of their own, with a single item and no text around it, which
+    # keep their marker until they are encoded
+    stack = []
+    depth = 0
+    value = obj
+    while True:
+        value_type = type(value)
+        if value_type is str:
+            yield encode_str(value)
+        elif value_type is int:
+            yield int.__repr__(value)
+        elif value_type is float:
+            yield _floatstr(value, allow_nan)
+        elif isinstance(value, str):
+            yield encode_str(value)
+        elif value is None:
+            yield 'null'
+        elif value is True:
+            yield 'true'
+        elif value is False:
+            yield 'false'
+        elif isinstance(value, int):
+            yield int.__repr__(value)
+        elif isinstance(value, float):
+            yield _floatstr(value, allow_nan)
+        elif isinstance(value, (list, tuple, dict)):
+            is_dict = isinstance(value, dict)
+            opener, closer = ('{', '}') if is_dict else ('[', ']')
+            if not value:
+                yield opener + closer
+            else:
+                marker_id = _mark(markers, value)
+                if is_dict:
+                    items = value.items()
+                    if encoder.sort_keys:
+                        items = sorted(items)
+                else:
+                    items = value
+                separator = item_separator
+                if indent is not None:
+                    depth += 1
+                    newline_indent = '\n' + indent * depth
+                    opener += newline_indent
+                    separator += newline_indent
+                    closer = '\n' + indent * (depth - 1) + closer
+                stack.append(
+                    [iter(items), is_dict, opener, separator, closer,
+                     marker_id])
+        else:
+            marker_id = _mark(markers, value)
+            stack.append(
+                [iter((encoder.default(value),)), False, '', '', '',
+                 marker_id])
+        # moves on to the next value, closing every exhausted frame
+        while stack:
+            frame = stack[-1]
+            items, is_dict, opener = frame[0], frame[1], frame[2]
+            prefix = frame[3] if opener is None else opener
+            for item in items:
+                if is_dict:
+                    key, value = item
+                    key = _key_str(key, encoder)
+                    if key is None:
+                        continue
+                    prefix += encode_str(key) + key_separator
+                else:
+                    value = item
+                break
+            else:
+                stack.pop()
+                if frame[5] is not None:
+                    del markers[frame[5]]
+                if frame[4]:
+                    if indent is not None:
+                        depth -= 1
+                    # an object whose keys were all skipped is still opened
+                    yield frame[4] if opener is None else opener + frame[4]
+                continue
+            frame[2] = None
+            if prefix:
+                yield prefix
+            break
+        else:
+            return
+
+
+_WHITESPACE_CHARS = ' \t\n\r'
+
+
+def _skip_whitespace(doc, idx, match=WHITESPACE.match):
+    if doc[idx:idx + 1] in _WHITESPACE_CHARS:
+        return match(doc, idx).end()
+    return idx
+
+
+def _key(doc, idx, decoder, keys, match=WHITESPACE.match):
+    """Scans an object key and its ':' delimiter, starting at idx, and
+    returns the key and the index of its value."""
+    if doc[idx:idx + 1] != '"':
+        raise JSONDecodeError(
+            "Expecting property name enclosed in double quotes", doc, idx)
+    key, idx = scanstring(doc, idx + 1, decoder.strict)
+    key = keys.setdefault(key, key)
+    if doc[idx:idx + 1] != ':':
+        idx = _skip_whitespace(doc, idx)
+        if doc[idx:idx + 1] != ':':
+            raise JSONDecodeError("Expecting ':' delimiter", doc, idx)
+    idx += 1
+    if doc[idx:idx + 1] in _WHITESPACE_CHARS:
+        idx = match(doc, idx).end()
+    return key, idx
+
+
+def _object(pairs, object_hook, object_pairs_hook):
+    if object_pairs_hook is not None:
+        return object_pairs_hook(pairs)
+    obj = dict(pairs)
+    if object_hook is not None:
+        return object_hook(obj)
+    return obj
+
+
+def decode(doc, decoder):
+    """Decodes a JSON document.
+
+    Parameters
+    ----------
+    doc : str
+        A JSON document.
+    decoder : json.JSONDecoder
+        The decoder whose settings - like its object_hook and parse_float -
+        are followed.
+
+    Returns
+    -------
+    object
+        The decoded document.
+    """
+    keys = {}
+    # strings, numbers and constants are scanned by the scanner of the
+    # decoder, which is only ever given values that aren't arrays or objects
+    scan_once = decoder.scan_once
+    match = WHITESPACE.match
+    object_hook = decoder.object_hook
+    object_pairs_hook = decoder.object_pairs_hook
+    # each frame holds the items of an array, or the key-value pairs of an
+    # object along with the key of the value being decoded
+    stack = []
+    idx = _skip_whitespace(doc, 0)
+    while True:
+        char = doc[idx:idx + 1]
+        if char == '[':
+            idx = _skip_whitespace(doc, idx + 1)
+            if doc[idx:idx + 1] != ']':
+                stack.append([[], None])
+                continue
+            value, idx = [], idx + 1
+        elif char == '{':
+            idx = _skip_whitespace(doc, idx + 1)
+            if doc[idx:idx + 1] != '}':
+                key, idx = _key(doc, idx, decoder, keys)
+                stack.append([[], key])
+                continue
+            value, idx = _object([], object_hook, object_pairs_hook), idx + 1
+        else:
+            try:
+                value, idx = scan_once(doc, idx)
+            except StopIteration as err:
+                raise JSONDecodeError("Expecting value", doc, err.value) from None
+        # adds the value to the innermost open container, closing it and
+        # any container it completes
+        while stack:
+            frame = stack[-1]
+            items, key = frame
+            items.append(value if key is None else (key, value))
+            char = doc[idx:idx + 1]
+            if char in _WHITESPACE_CHARS:
+                idx = match(doc, idx).end()
+                char = doc[idx:idx + 1]
+            if char == ',':
+                idx += 1
+                if doc[idx:idx + 1] in _WHITESPACE_CHARS:
+                    idx = match(doc, idx).end()
+                if key is not None:
+                    frame[1], idx = _key(doc, idx, decoder, keys)
+                break
+            if char == (']' if key is None else '}'):
+                stack.pop()
+                idx += 1
+                if key is None:
+                    value = items
+                else:
+                    value = _object(items, object_hook, object_pairs_hook)
+                continue
+            raise JSONDecodeError("Expecting ',' delimiter", doc, idx)
+        else:
+            break
+    idx = _skip_whitespace(doc, idx)
+    if idx != len(doc):
+        raise JSONDecodeError("Extra data", doc, idx)
+    return value
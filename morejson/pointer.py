@@ -0,0 +1,141 @@
+"""Locating values by JSON Pointer (RFC 6901) without decoding the rest.
+
+The scanner here only finds where values start and end. Values a pointer
+doesn't lead into are skipped by the C scanner of the json module, with every
+object discarded as soon as it is scanned, so no objects are built for them.
+"""
+
+import re
+from json.decoder import JSONDecoder, JSONDecodeError, scanstring
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# the rest of a string, from just after its opening quote
+_STRING_END = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+# discards objects as they are scanned; arrays only hold None per item
+_SKIPPER = JSONDecoder(object_pairs_hook=lambda pairs: None)
+
+
+def parse_pointer(pointer):
+    """Splits a JSON Pointer into its unescaped reference tokens.
+
+    Parameters
+    ----------
+    pointer : str
+        A JSON Pointer, like '/meta/generated_at'. The empty string points
+        to the whole document.
+
+    Returns
+    -------
+    list
+        The reference tokens of the pointer.
+    """
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise ValueError(
+            "A JSON Pointer must be empty or start with '/': {!r}".format(
+                pointer))
+    return [
+        token.replace('~1', '/').replace('~0', '~')
+        for token in pointer[1:].split('/')
+    ]
+
+
+def _skip_whitespace(doc, idx):
+    return _WHITESPACE.match(doc, idx).end()
+
+
+def _string_end(doc, idx):
+    """Returns the index just past the string whose opening quote is at idx."""
+    match = _STRING_END.match(doc, idx + 1)
+    if match is None:
+        raise JSONDecodeError("Unterminated string starting at", doc, idx)
+    return match.end()
+
+
+def _value_end(doc, idx):
+    """Returns the index just past the value starting at idx."""
+    if doc.startswith('"', idx):
+        return _string_end(doc, idx)
+    return _SKIPPER.raw_decode(doc, idx)[1]
+
+
+def _expect(doc, idx, char, message):
+    if not doc.startswith(char, idx):
+        raise JSONDecodeError(message, doc, idx)
+    return _skip_whitespace(doc, idx + 1)
+
+
+def _member_start(doc, idx, token):
+    """Returns where the value of the given member of the object starting at
+    idx starts. Members after it are never scanned, so unlike with json.loads,
+    the first of duplicate keys wins."""
+    idx = _skip_whitespace(doc, idx + 1)
+    if doc.startswith('}', idx):
+        raise KeyError(token)
+    while True:
+        if not doc.startswith('"', idx):
+            raise JSONDecodeError(
+                "Expecting property name enclosed in double quotes", doc, idx)
+        key, idx = scanstring(doc, idx + 1)
+        idx = _skip_whitespace(doc, idx)
+        idx = _expect(doc, idx, ':', "Expecting ':' delimiter")
+        if key == token:
+            return idx
+        idx = _skip_whitespace(doc, _value_end(doc, idx))
+        if doc.startswith('}', idx):
+            raise KeyError(token)
+        idx = _expect(doc, idx, ',', "Expecting ',' delimiter")
+
+
+def _item_start(doc, idx, token):
+    """Returns where the given item of the array starting at idx starts."""
+    if not token.isdigit() or (token.startswith('0') and token != '0'):
+        raise IndexError("Invalid array index: {!r}".format(token))
+    index = int(token)
+    idx = _skip_whitespace(doc, idx + 1)
+    if doc.startswith(']', idx):
+        raise IndexError("Array index out of range: {}".format(index))
+    for _ in range(index):
+        idx = _skip_whitespace(doc, _value_end(doc, idx))
+        if not doc.startswith(',', idx):
+            raise IndexError("Array index out of range: {}".format(index))
+        idx = _skip_whitespace(doc, idx + 1)
+    return idx
+
+
+def find_pointer(doc, pointer):
+    """Locates the value a JSON Pointer points to in a JSON document.
+
+    Parameters
+    ----------
+    doc : str
+        A JSON document.
+    pointer : str
+        A JSON Pointer, like '/meta/generated_at'.
+
+    Returns
+    -------
+    tuple
+        The (start, end) indices of the value in the document.
+
+    Raises
+    ------
+    KeyError
+        If the pointer refers to a missing object member, or into a value
+        which is neither an object nor an array.
+    IndexError
+        If the pointer refers to a missing array item.
+    """
+    idx = _skip_whitespace(doc, 0)
+    for token in parse_pointer(pointer):
+        if doc.startswith('{', idx):
+            idx = _member_start(doc, idx, token)
+        elif doc.startswith('[', idx):
+            idx = _item_start(doc, idx, token)
+        else:
+            raise KeyError(token)
+    return idx, _value_end(doc, idx)
@@ -0,0 +1,162 @@
+"""Memory profiling helpers for morejson, based on tracemalloc."""
+
+import collections
+import tracemalloc
+
+from . import core
+
+
+MemoryProfile = collections.namedtuple(
+    'MemoryProfile', ['result', 'peak', 'retained', 'phases'])
+MemoryProfile.__doc__ = """The memory footprint of a single profiled call.
+
+Attributes
+----------
+result : object
+    The value returned by the profiled callable.
+peak : int
+    The peak number of bytes allocated during the call, above the number of
+    bytes allocated when it started.
+retained : int
+    The number of bytes still allocated when the call returned, above the
+    number of bytes allocated when it started.
+phases : collections.OrderedDict
+    Maps phase names to PhaseStats objects. Calls to morejson.load and
+    morejson.loads are broken into the 'read' (load only), 'parse', 'hook' and
+    'construct' phases; any other callable is reported as a single 'call'
+    phase.
+"""
+
+PhaseStats = collections.namedtuple('PhaseStats', ['peak', 'retained'])
+PhaseStats.__doc__ = """The peak and retained bytes of a single phase."""
+
+
+def _measure(func, *args, **kwargs):
+    """Runs the given callable under tracemalloc.
+
+    Returns
+    -------
+    tuple
+        A (result, PhaseStats) tuple.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        try:
+            tracemalloc.reset_peak()
+        except AttributeError:  # pragma: no cover
+            pass  # we're on Python 3.8 or below; peak is since start()
+        result = func(*args, **kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return result, PhaseStats(
+        peak=max(peak - base, 0), retained=max(current - base, 0))
+
+
+def _apply_hook(obj, hook):
+    """Applies an object hook bottom-up to an already parsed JSON tree."""
+    if isinstance(obj, list):
+        return [_apply_hook(member, hook) for member in obj]
+    if isinstance(obj, dict):
+        return hook({
+            key: _apply_hook(value, hook) for key, value in obj.items()})
+    return obj
+
+
+def _parse(json_str, pointer, kwargs, opts):
+    # decodes as loads does, given the keyword arguments it hands to json
+    kwargs = dict(kwargs)
+    if pointer is not None:
+        return core._loads_pointer(  # pylint: disable=W0212
+            json_str, pointer, kwargs, opts)
+    return core._loads(json_str, kwargs, opts)  # pylint: disable=W0212
+
+
+def _construct(json_str, pointer, schema, kwargs, opts):
+    return core._finish_decoding(  # pylint: disable=W0212
+        _parse(json_str, pointer, kwargs, opts), opts, schema)
+
+
+def _loads_phases(json_str, kwargs, phases):
+    kwargs = dict(kwargs)
+    pointer = kwargs.pop('pointer', None)
+    schema = kwargs.pop('schema', None)
+    opts = core._decoding_kwargs(kwargs, schema)  # pylint: disable=W0212
+    hook = kwargs.pop('object_hook')
+    # parse: the plain JSON tree, including the tagged dicts the hook receives
+    parsed, phases['parse'] = _measure(
+        _parse, json_str, pointer, kwargs, opts)
+    # hook: turning an existing tree of tagged dicts into the final objects
+    _, phases['hook'] = _measure(_apply_hook, parsed, hook)
+    del parsed
+    # construct: the end-to-end cost of materializing the final objects
+    kwargs['object_hook'] = hook
+    result, phases['construct'] = _measure(
+        _construct, json_str, pointer, schema, kwargs, opts)
+    return result
+
+
+def profile_memory(func, *args, **kwargs):
+    """Profiles the memory allocated by calling func(*args, **kwargs).
+
+    When func is morejson.load or morejson.loads the call is broken into
+    phases - reading the input, parsing it into plain (tagged) JSON objects,
+    running the morejson object hook over those and constructing the final
+    objects - and each phase is measured on its own. Since phases are measured
+    separately, the input is parsed more than once in this case.
+
+    Parameters
+    ----------
+    func : callable
+        The callable to profile.
+    *args, **kwargs
+        Positional and keyword arguments to call func with.
+
+    Returns
+    -------
+    MemoryProfile
+        The result of the call, together with its peak and retained
+        allocations, overall and per phase.
+
+    Example
+    -------
+    >>> import morejson
+    >>> prof = morejson.profile_memory(morejson.loads, '{"a": [1, 2]}')
+    >>> prof.result
+    {'a': [1, 2]}
+    >>> list(prof.phases)
+    ['parse', 'hook', 'construct']
+    """
+    phases = collections.OrderedDict()
+    if func is core.load:
+        fp = args[0]
+        json_str, phases['read'] = _measure(fp.read)
+        result = _loads_phases(json_str, kwargs, phases)
+        construct = phases['construct']
+        return MemoryProfile(
+            result=result,
+            peak=max(phases['read'].peak,
+                     phases['read'].retained + construct.peak),
+            retained=construct.retained,
+            phases=phases,
+        )
+    if func is core.loads:
+        result = _loads_phases(args[0], kwargs, phases)
+        construct = phases['construct']
+        return MemoryProfile(
+            result=result,
+            peak=construct.peak,
+            retained=construct.retained,
+            phases=phases,
+        )
+    result, phases['call'] = _measure(func, *args, **kwargs)
+    return MemoryProfile(
+        result=result,
+        peak=phases['call'].peak,
+        retained=phases['call'].retained,
+        phases=phases,
+    )
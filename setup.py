@@ -26,10 +26,10 @@ setup(
     author_email="shay.palachy@gmail.com",
     url='https://github.com/shaypal5/morejson',
     packages=['morejson'],
+    python_requires='>=3.8',
     install_requires=[],
     setup_requires=[],
-    tests_require=['nose', 'coverage', 'pytz', 'tzlocal'],
-    test_suite='nose.collector',
+    tests_require=['pytest', 'pytest-cov', 'pytz', 'tzlocal'],
     platforms=['any'],
     classifiers=[
         # Trove classifiers
@@ -37,14 +37,13 @@ setup(
         'Development Status :: 5 - Production/Stable',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.2',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Software Development :: Libraries',
         'Topic :: Software Development :: Libraries :: Python Modules',
         'Topic :: Utilities',
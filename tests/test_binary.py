@@ -0,0 +1,51 @@
+"""Testing dumps and loads of bytes, bytearray and memoryview objects."""
+
+import unittest
+
+import array
+import json
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class TestBinary(unittest.TestCase):
+    """Testing dumps and loads of bytes, bytearray and memoryview objects."""
+
+    def test_dumps_bytes(self):
+        """Testing dumps and loads of bytes and bytearray objects."""
+        for binary in ('base64', 'base85'):
+            for obj in (b'', bytes(range(256)), bytearray(b'\x00abc\xff')):
+                json_str = morejson.dumps({'data': obj}, binary=binary)
+                self.assertEqual(
+                    binary, json.loads(json_str)['data']['encoding'])
+                res = morejson.loads(json_str)
+                self.assertEqual(obj, res['data'])
+                self.assertIs(type(obj), type(res['data']))
+
+    def test_dumps_memoryview(self):
+        """Testing dumps and loads of memoryview objects."""
+        views = [
+            memoryview(b'abcdef'),
+            memoryview(b'abcdef')[::2],
+            memoryview(array.array('i', [1, 2, 3, 4])).cast('B').cast(
+                'i', [2, 2]),
+        ]
+        for view in views:
+            res = morejson.loads(morejson.dumps(view))
+            self.assertIsInstance(res, memoryview)
+            self.assertEqual(view.format, res.format)
+            self.assertEqual(view.shape, res.shape)
+            self.assertEqual(view.tolist(), res.tolist())
+            self.assertTrue(res.readonly)
+
+    def test_bytes_refs(self):
+        """Testing repeated equal bytes with shared references."""
+        obj = [b'blob', bytes(b'blob')]
+        res = morejson.loads(morejson.dumps(obj, refs=True))
+        self.assertEqual(obj, res)
+        self.assertIs(res[0], res[1])
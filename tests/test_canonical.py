@@ -0,0 +1,77 @@
+"""Testing canonical, byte-stable encoding."""
+
+import unittest
+
+import datetime
+import os
+import subprocess
+import sys
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+_SCRIPT = """
+import datetime
+import morejson
+obj = {
+    'words': {'pear', 'apple', 'fig', 'kiwi', 'plum', 'lime'},
+    'numbers': frozenset([3, 1.5, -2, 10 ** 20]),
+    'mixed': {'a', 1, None, (1, 2), frozenset(['x', 'y'])},
+    'nested': {frozenset(['b', 'c']), frozenset(['a'])},
+    'dates': {datetime.date(2017, 1, d) for d in range(1, 8)},
+    'zone': datetime.timezone(datetime.timedelta(hours=2)),
+    'z': 1, 'a': 2,
+}
+print(morejson.dumps(obj, canonical=True))
+"""
+
+
+class TestCanonical(unittest.TestCase):
+    """Testing canonical, byte-stable encoding."""
+
+    def test_stable_across_hash_seeds(self):
+        """Testing that the output doesn't depend on hash randomization."""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        outputs = set()
+        for seed in ('0', '1', '2', '12345'):
+            env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=root)
+            outputs.add(subprocess.check_output(
+                [sys.executable, '-c', _SCRIPT], env=env))
+        self.assertEqual(1, len(outputs))
+
+    def test_canonical_form(self):
+        """Testing sorted members and keys and compact separators."""
+        obj = {'b': {'y', 'x'}, 'a': frozenset([2, 1.5, float('nan')])}
+        self.assertEqual(
+            '{"a":{"__type__":"frozenset","members":[1.5,2,NaN]},'
+            '"b":{"__type__":"set","members":["x","y"]}}',
+            morejson.dumps(obj, canonical=True))
+        self.assertEqual(
+            morejson.dumps({'x': {'b', 'a'}}, canonical=True),
+            morejson.dumps({'x': {'a', 'b'}}, canonical=True))
+
+    def test_canonical_roundtrip(self):
+        """Testing that canonical output decodes as usual."""
+        obj = {'set': {1, 'a', None, frozenset([2])},
+               'when': datetime.datetime(2017, 1, 1, 12)}
+        self.assertEqual(
+            obj, morejson.loads(morejson.dumps(obj, canonical=True)))
+
+    def test_canonical_columnar(self):
+        """Testing canonical columnar encoding of records in any key order."""
+        day = datetime.date(2017, 1, 2)
+        first = [{'x': i, 'y': day} for i in range(3)]
+        second = [{'y': day, 'x': i} for i in range(3)]
+        self.assertEqual(
+            morejson.dumps(first, canonical=True, columnar=True),
+            morejson.dumps(second, canonical=True, columnar=True))
+        self.assertEqual(
+            morejson.fingerprint(first, columnar=True),
+            morejson.fingerprint(second, columnar=True))
+        self.assertEqual(second, morejson.loads(
+            morejson.dumps(second, canonical=True, columnar=True)))
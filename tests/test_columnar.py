@@ -0,0 +1,76 @@
+"""Testing the columnar encoding of lists of records."""
+
+import unittest
+
+import datetime
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+def _records(size):
+    start = datetime.datetime(2017, 1, 1, 12)
+    return [
+        {
+            'id': i,
+            'name': 'record-{}'.format(i),
+            'created': start + datetime.timedelta(minutes=i),
+            'day': datetime.date(2017, 1, 1 + i % 28),
+            'tags': set([i, i + 1]),
+        }
+        for i in range(size)
+    ]
+
+
+class TestColumnar(unittest.TestCase):
+    """Testing the columnar encoding of lists of records."""
+
+    def test_columnar_roundtrip(self):
+        """Testing dumps and loads of records in columnar mode."""
+        dicti = {'records': _records(20), 'array': [1, 2, 3], 'empty': []}
+        json_str = morejson.dumps(dicti, columnar=True)
+        self.assertEqual(1, json_str.count('"created"'))
+        self.assertEqual(1, json_str.count('"datetime.datetime"'))
+        self.assertLess(len(json_str), len(morejson.dumps(dicti)))
+        self.assertEqual(dicti, morejson.loads(json_str))
+
+    def test_columnar_as_columns(self):
+        """Testing loads of columnar records as a dict of columns."""
+        records = _records(5)
+        json_str = morejson.dumps(records, columnar=True)
+        columns = morejson.loads(json_str, as_columns=True)
+        self.assertEqual(sorted(records[0]), sorted(columns))
+        for key, column in columns.items():
+            self.assertEqual([record[key] for record in records], column)
+
+    def test_columnar_skips_other_lists(self):
+        """Testing that lists which aren't uniform records are left as is."""
+        dicti = {
+            'mixed_keys': [{'a': 1}, {'b': 2}],
+            'single': [{'a': 1}],
+            'mixed_types': [{'a': 1}, 2],
+            'int_keys': {'nested': [{1: 'a'}, {1: 'b'}]},
+        }
+        self.assertEqual(
+            morejson.dumps(dicti), morejson.dumps(dicti, columnar=True))
+
+    def test_columnar_keeps_unpackable_datetimes(self):
+        """Testing that aware datetimes are not packed into ISO strings."""
+        plus_one = datetime.timezone(datetime.timedelta(hours=1), 'CET')
+        records = [
+            {'when': datetime.datetime(2017, 1, 1, i, tzinfo=plus_one)}
+            for i in range(3)]
+        actual = morejson.loads(morejson.dumps(records, columnar=True))
+        self.assertEqual(records, actual)
+        self.assertEqual('CET', actual[0]['when'].tzname())
+
+    def test_columnar_circular_reference(self):
+        """Testing columnar mode with circular references."""
+        circular = []
+        circular.append(circular)
+        with self.assertRaises(ValueError):
+            morejson.dumps(circular, columnar=True)
@@ -0,0 +1,80 @@
+"""Testing encoders compiled for payloads of a fixed shape."""
+
+import unittest
+
+import datetime
+import uuid
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+def _records(size):
+    return [
+        {
+            'id': i,
+            'name': 'record-{}'.format(i),
+            'score': i / 3,
+            'created': datetime.datetime(2017, 1, 1, 12, i % 60),
+            'day': datetime.date(2017, 1, 1 + i % 28),
+            'duration': datetime.timedelta(seconds=i),
+            'uid': uuid.UUID(int=i),
+            'active': i % 2 == 0,
+            'parent': None,
+            'tags': frozenset(['a']),
+            'meta': {'source': 'test', 'weights': [0.5, 1.5]},
+        }
+        for i in range(size)
+    ]
+
+
+class TestCompiler(unittest.TestCase):
+    """Testing encoders compiled for payloads of a fixed shape."""
+
+    def test_compile_from_sample(self):
+        """Testing an encoder compiled from a sample payload."""
+        records = _records(50)
+        encode = morejson.compile_encoder(records[:1])
+        self.assertEqual(morejson.dumps(records), encode(records))
+        self.assertEqual(records, morejson.loads(encode(records)))
+
+    def test_compile_from_schema(self):
+        """Testing an encoder compiled from a schema, with options."""
+        schema = {'id': int, 'when': datetime.datetime, 'name': str}
+        encode = morejson.compile_encoder(
+            schema, compact=True, ensure_ascii=False)
+        obj = {'id': 1, 'when': datetime.datetime(2017, 1, 1), 'name': 'é'}
+        self.assertEqual(
+            morejson.dumps(obj, compact=True, ensure_ascii=False),
+            encode(obj))
+
+    def test_mismatching_values(self):
+        """Testing values that don't match the compiled shape."""
+        records = _records(10)
+        encode = morejson.compile_encoder(records[:1])
+        records[1]['created'] = records[1]['created'].replace(
+            tzinfo=datetime.timezone.utc)
+        records[2]['score'] = float('nan')
+        records[3]['id'] = 'three'
+        records[4]['extra'] = 1
+        del records[5]['name']
+        records.append('not a record')
+        self.assertEqual(morejson.dumps(records), encode(records))
+        self.assertEqual(morejson.dumps({'a': 1}), encode({'a': 1}))
+
+    def test_raw_json(self):
+        """Testing raw JSON fragments encoded by a compiled encoder."""
+        encode = morejson.compile_encoder({'raw': object})
+        self.assertEqual(
+            '{"raw": [1,2]}', encode({'raw': morejson.RawJSON('[1,2]')}))
+
+    def test_unsupported_arguments(self):
+        """Testing compiling with unsupported arguments."""
+        with self.assertRaises(TypeError):
+            morejson.compile_encoder({}, indent=2)
+        with self.assertRaises(ValueError):
+            morejson.compile_encoder({}, refs=True)
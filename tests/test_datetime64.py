@@ -0,0 +1,148 @@
+"""Testing decoding arrays of datetimes into numpy datetime64 arrays."""
+
+import unittest
+
+import dataclasses
+import datetime
+
+import morejson
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+@dataclasses.dataclass
+class Schedule:
+    """A dataclass for testing."""
+    when: dict
+    slots: list
+
+
+morejson.register_class(Schedule, tag='tests.Schedule')
+
+
+def _datetimes(tzinfo=None):
+    start = datetime.datetime(1969, 12, 31, 23, 59, 58, 999999, tzinfo)
+    return [start + datetime.timedelta(days=i, microseconds=i)
+            for i in range(5)]
+
+
+@unittest.skipIf(numpy is None, "numpy not available in this test run")
+class TestDatetime64(unittest.TestCase):
+    """Testing decoding arrays of datetimes into numpy datetime64 arrays."""
+
+    def _check_array(self, expected, res):
+        self.assertEqual(numpy.dtype('datetime64[us]'), res.dtype)
+        self.assertEqual(
+            expected, [value.item() for value in res])
+
+    def test_naive_datetimes(self):
+        """Testing an array of naive datetimes."""
+        dts = _datetimes()
+        res = morejson.loads(morejson.dumps({'dts': dts}), datetime64=True)
+        self._check_array(dts, res['dts'])
+
+    def test_fixed_offset_datetimes(self):
+        """Testing an array of datetimes with fixed offsets, in UTC."""
+        tzinfo = datetime.timezone(datetime.timedelta(hours=-5, minutes=-30))
+        dts = _datetimes(tzinfo)
+        dts[1] = dts[1].astimezone(datetime.timezone.utc)
+        res = morejson.loads(morejson.dumps(dts), datetime64=True)
+        self._check_array(
+            [dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+             for dt in dts],
+            res)
+
+    def test_other_values(self):
+        """Testing datetimes which are not decoded into arrays."""
+        dts = _datetimes()
+        obj = {
+            'single': dts[0],
+            'mixed': [dts[0], 1],
+            'naive_and_aware': [dts[0], dts[1].replace(
+                tzinfo=datetime.timezone.utc)],
+            'set': set(dts),
+            'nested': [[dts[0]], {'dt': dts[1]}],
+        }
+        res = morejson.loads(morejson.dumps(obj), datetime64=True)
+        self.assertEqual(obj, res)
+
+    def test_shared_references(self):
+        """Testing arrays of datetimes encoded with references."""
+        dts = _datetimes() * 2
+        json_str = morejson.dumps({'dts': dts, 'first': dts[0]}, refs=True)
+        res = morejson.loads(json_str, datetime64=True)
+        self._check_array(dts, res['dts'])
+        self.assertEqual(dts[0], res['first'])
+
+    def test_packed_columns(self):
+        """Testing packed datetime columns of columnar records."""
+        for tzinfo in (None, datetime.timezone.utc):
+            dts = _datetimes(tzinfo)
+            records = [{'dt': dt, 'i': i} for i, dt in enumerate(dts)]
+            json_str = morejson.dumps(records, columnar=True)
+            res = morejson.loads(json_str, datetime64=True, as_columns=True)
+            self._check_array(
+                [dt.replace(tzinfo=None) for dt in dts], res['dt'])
+            self.assertEqual([0, 1, 2, 3, 4], res['i'])
+
+    def test_packed_columns_as_rows(self):
+        """Testing packed datetime columns decoded back into rows."""
+        dts = _datetimes()
+        records = [{'dt': dt, 'i': i} for i, dt in enumerate(dts)]
+        json_str = morejson.dumps(records, columnar=True)
+        res = morejson.loads(json_str, datetime64=True)
+        self.assertEqual(records, res)
+        self.assertIs(datetime.datetime, type(res[0]['dt']))
+
+    def test_mixed_packed_column(self):
+        """Testing a packed column of both naive and UTC datetimes."""
+        dts = _datetimes()
+        dts[0] = dts[0].replace(tzinfo=datetime.timezone.utc)
+        json_str = morejson.dumps([{'dt': dt} for dt in dts], columnar=True)
+        res = morejson.loads(json_str, datetime64=True, as_columns=True)
+        self.assertEqual(dts, res['dt'])
+
+    def test_incompatible_options(self):
+        """Testing combining datetime64 with lazy or records."""
+        with self.assertRaises(ValueError):
+            morejson.loads('[]', datetime64=True, lazy=True)
+        with self.assertRaises(ValueError):
+            morejson.loads('[]', datetime64=True, records='slots')
+
+    def test_nested_fields_of_extended_values(self):
+        """Testing datetimes nested in the fields of extended values."""
+        dts = _datetimes()
+        obj = Schedule({'start': dts[0]}, [[dts[1]], [{'end': dts[2]}]])
+        res = morejson.loads(morejson.dumps(obj), datetime64=True)
+        self.assertEqual(obj, res)
+
+    def test_custom_object_hook(self):
+        """Testing the values custom object hooks get."""
+        dts = _datetimes()
+        seen = []
+        def _hook(dict_obj):
+            seen.append(dict(dict_obj))
+            return dict_obj
+        obj = {'single': dts[0], 'nested': [[dts[1]]], 'dts': dts}
+        res = morejson.loads(
+            morejson.dumps(obj), datetime64=True, object_hook=_hook)
+        self.assertEqual(dts[0], seen[-1]['single'])
+        self.assertEqual([[dts[1]]], seen[-1]['nested'])
+        self._check_array(dts, seen[-1]['dts'])
+        self.assertEqual(dts[0], res['single'])
+        self._check_array(dts, res['dts'])
+
+    def test_profile_memory(self):
+        """Testing the result of profiling a datetime64 decoding."""
+        dts = _datetimes()
+        prof = morejson.profile_memory(
+            morejson.loads, morejson.dumps({'dts': dts}), datetime64=True)
+        self._check_array(dts, prof.result['dts'])
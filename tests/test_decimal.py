@@ -0,0 +1,43 @@
+"""Testing dumps and loads of decimal.Decimal objects."""
+
+import unittest
+
+import decimal
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class TestDecimal(unittest.TestCase):
+    """Testing dumps and loads of decimal.Decimal objects."""
+
+    def test_dumps_decimal(self):
+        """Testing that decimals keep their exact digits."""
+        values = ['0.1', '1234567890.123456789012345678901234567890',
+                  '1.2300', '-0', '1E+30', '-Infinity', 'NaN']
+        for value in values:
+            dec = decimal.Decimal(value)
+            res = morejson.loads(morejson.dumps({'dec': dec}))['dec']
+            self.assertIsInstance(res, decimal.Decimal)
+            self.assertEqual(str(dec), str(res))
+
+    def test_floats_untouched(self):
+        """Testing that plain floats are still decoded as floats."""
+        obj = {'dec': decimal.Decimal('2.50'), 'float': 2.5}
+        res = morejson.loads(morejson.dumps(obj))
+        self.assertIs(float, type(res['float']))
+        self.assertEqual(obj, res)
+
+    def test_decimal_refs(self):
+        """Testing equal decimals of different precision with references."""
+        obj = [decimal.Decimal('1.0'), decimal.Decimal('1.00'),
+               decimal.Decimal('1.0')]
+        json_str = morejson.dumps(obj, refs=True)
+        res = morejson.loads(json_str)
+        self.assertEqual(['1.0', '1.00', '1.0'], [str(dec) for dec in res])
+        self.assertIs(res[0], res[2])
+        self.assertEqual(3, json_str.count('morejson.ref'))
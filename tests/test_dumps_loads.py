@@ -2,6 +2,7 @@
 
 import unittest
 
+import collections
 import sys
 import datetime
 import json
@@ -286,3 +287,79 @@ class TestDumps(unittest.TestCase):
         self.assertEqual(dicti, morejson.loads(
             morejson.dumps(dicti, default=TestDumps._monkey_default_encoder),
             object_hook=TestDumps._monkey_object_hook))
+
+    def test_custom_hook_dict_subclass(self):
+        """Testing dict subclasses returned by custom object hooks."""
+        res = morejson.loads(
+            '{"a": {"b": 1}}', object_hook=collections.OrderedDict)
+        self.assertIs(type(res), collections.OrderedDict)
+        self.assertIs(type(res['a']), collections.OrderedDict)
+        dicti = {"now": datetime.datetime.now()}
+        res = morejson.loads(
+            morejson.dumps(dicti), object_hook=collections.OrderedDict)
+        self.assertIs(type(res), collections.OrderedDict)
+        self.assertEqual(dicti, res)
+
+    def test_dumps_named_zones_without_pickle(self):
+        """Testing exact roundtrips of named zones without pickle."""
+        try:
+            import pytz
+        except ImportError:
+            raise unittest.SkipTest(
+                "pytz not available in this test run; skipping named-zone"
+                " tests.")
+        self.assertFalse(morejson.allow_pickle())
+        pytz_est = pytz.timezone("US/Eastern")
+        summer = pytz_est.localize(datetime.datetime(2017, 7, 1, 12))
+        winter = pytz_est.localize(datetime.datetime(2017, 1, 1, 12))
+        dicti = {
+            'summer': summer,
+            'winter': winter,
+            'utc': datetime.datetime(2017, 1, 1, tzinfo=pytz.utc),
+            'fixed': datetime.datetime(
+                2017, 1, 1, tzinfo=pytz.FixedOffset(-120)),
+            'eastern-tzone': pytz_est,
+            'static-tzone': pytz.timezone("EST"),
+        }
+        out_str = morejson.dumps(dicti, named_zones=True)
+        self.assertNotIn('__pickle__', out_str)
+        actual_obj = morejson.loads(out_str)
+        self.assertEqual(dicti, actual_obj)
+        for key in dicti:
+            expected_tz = getattr(dicti[key], 'tzinfo', dicti[key])
+            actual_tz = getattr(actual_obj[key], 'tzinfo', actual_obj[key])
+            self.assertIs(expected_tz, actual_tz)
+
+    def test_dumps_named_zones_as_timezones(self):
+        """Testing that named zones are encoded as timezones by default."""
+        try:
+            import pytz
+        except ImportError:
+            raise unittest.SkipTest(
+                "pytz not available in this test run; skipping named-zone"
+                " tests.")
+        summer = pytz.timezone("US/Eastern").localize(
+            datetime.datetime(2017, 7, 1, 12))
+        encoded = json.loads(morejson.dumps(summer))['tzinfo']
+        self.assertEqual('datetime.timezone', encoded.pop('__type__'))
+        self.assertEqual({'offset', 'name'}, set(encoded))
+        actual = morejson.loads(morejson.dumps(summer))
+        self.assertEqual(summer, actual)
+        self.assertIs(datetime.timezone, type(actual.tzinfo))
+
+    @unittest.skipIf(sys.version_info < (3, 9), "zoneinfo is Python 3.9+")
+    def test_dumps_zoneinfo(self):
+        """Testing exact roundtrips of zoneinfo zones without pickle."""
+        import zoneinfo
+        try:
+            zone = zoneinfo.ZoneInfo("Europe/Paris")
+        except zoneinfo.ZoneInfoNotFoundError:
+            raise unittest.SkipTest("no IANA timezone database available.")
+        dicti = {
+            'datetime': datetime.datetime(2017, 7, 1, 12, tzinfo=zone),
+            'zone': zone,
+        }
+        actual_obj = morejson.loads(morejson.dumps(dicti, named_zones=True))
+        self.assertEqual(dicti, actual_obj)
+        self.assertIs(zone, actual_obj['zone'])
+        self.assertIs(zone, actual_obj['datetime'].tzinfo)
@@ -0,0 +1,84 @@
+"""Testing streaming fingerprints of canonical encodings."""
+
+import unittest
+
+import datetime
+import hashlib
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+def _rows(count):
+    return [
+        {'i': i, 'tags': {'a', 'b', str(i)}, 'day': datetime.date(2017, 1, 2)}
+        for i in range(count)
+    ]
+
+
+def _canonical_digest(obj, algo='sha256', **kwargs):
+    json_str = morejson.dumps(obj, canonical=True, **kwargs)
+    return hashlib.new(algo, json_str.encode('utf-8')).hexdigest()
+
+
+class TestFingerprint(unittest.TestCase):
+    """Testing streaming fingerprints of canonical encodings."""
+
+    def test_equal_to_canonical_digest(self):
+        """Testing the digest equals that of the canonical encoding."""
+        objs = [
+            [], {}, 1, 'é', [[]], {'a': {'b': {}}},
+            {'rows': _rows(3000), 'big': {str(i): i for i in range(3000)}},
+            [[1, [2, {'x': [3]}]], {'z': [], 'y': {}}] * 100,
+            {'raw': [morejson.RawJSON('[1, 2]')] * 100},
+        ]
+        for obj in objs:
+            self.assertEqual(_canonical_digest(obj), morejson.fingerprint(obj))
+        obj = {'rows': _rows(100)}
+        self.assertEqual(
+            _canonical_digest(obj, refs=True),
+            morejson.fingerprint(obj, refs=True))
+        for indent in (2, '\t'):
+            self.assertEqual(
+                _canonical_digest(obj, indent=indent),
+                morejson.fingerprint(obj, indent=indent))
+
+    def test_set_order(self):
+        """Testing sets built in different orders get equal digests."""
+        first = {'set': set(str(i) for i in range(100))}
+        second = {'set': set(str(i) for i in reversed(range(100)))}
+        self.assertEqual(
+            morejson.fingerprint(first), morejson.fingerprint(second))
+        self.assertNotEqual(
+            morejson.fingerprint(first), morejson.fingerprint({'set': set()}))
+
+    def test_algo(self):
+        """Testing other hash algorithms."""
+        obj = {'rows': _rows(10)}
+        for algo in ('md5', 'blake2b'):
+            self.assertEqual(
+                _canonical_digest(obj, algo), morejson.fingerprint(obj, algo))
+        with self.assertRaises(ValueError):
+            morejson.fingerprint(obj, 'no-such-algo')
+
+    def test_circular_reference(self):
+        """Testing circular references are detected."""
+        obj = [[1] * 100]
+        obj.append(obj)
+        with self.assertRaises(ValueError):
+            morejson.fingerprint(obj)
+
+    def test_bounded_memory(self):
+        """Testing the peak memory doesn't grow with the encoding."""
+        small = morejson.profile_memory(
+            morejson.fingerprint, {'rows': _rows(5000)})
+        large_obj = {'rows': _rows(40000)}
+        large = morejson.profile_memory(morejson.fingerprint, large_obj)
+        encoded = morejson.profile_memory(
+            morejson.dumps, large_obj, canonical=True)
+        self.assertLess(large.peak, small.peak * 1.5)
+        self.assertLess(large.peak * 4, encoded.peak)
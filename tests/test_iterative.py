@@ -0,0 +1,137 @@
+"""Testing iterative encoding and decoding of deeply nested data."""
+
+import unittest
+
+import datetime
+import io
+import json
+import sys
+from collections import OrderedDict
+from decimal import Decimal
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+def _tree(depth):
+    tree = {'leaf': datetime.date(2017, 1, 2), 'set': {1}}
+    for i in range(depth):
+        tree = {'child': tree, 'items': [i, [], {}]}
+    return tree
+
+
+def _leaf(tree):
+    while 'child' in tree:
+        tree = tree['child']
+    return tree
+
+
+_OBJ = {
+    'str': 'é\n"', 'int': 3, 'float': 1.5, 'nan': float('nan'),
+    'consts': [None, True, False], 'tuple': (1, 2), 'empty': [[], {}],
+    'keys': {3: 'a', 2.5: 'b', False: 'c'},
+    'nested': [{'a': [{'b': datetime.timedelta(1)}]}],
+    'extended': [datetime.datetime(2017, 1, 2, 3), frozenset([1]),
+                 complex(1, 2), morejson.RawJSON('[1, 2]')],
+}
+
+
+class _ReprEncoder(json.JSONEncoder):
+    """An encoder encoding unknown objects by their repr."""
+
+    def default(self, o):  # pylint: disable=E0202
+        if isinstance(o, Decimal):
+            return repr(o)
+        return json.JSONEncoder.default(self, o)
+
+
+class TestIterative(unittest.TestCase):
+    """Testing iterative encoding and decoding of deeply nested data."""
+
+    def test_same_output(self):
+        """Testing output equals the output of recursive encoding."""
+        for kwargs in ({}, {'indent': 2}, {'indent': '\t', 'sort_keys': True},
+                       {'separators': (',', ':')}, {'ensure_ascii': False},
+                       {'refs': True}, {'canonical': True},
+                       {'skipkeys': True}):
+            obj = dict(_OBJ, skipped={object(): 1}) if kwargs.get(
+                'skipkeys') else _OBJ
+            expected = morejson.dumps(obj, **kwargs)
+            self.assertEqual(
+                expected, morejson.dumps(obj, iterative=True, **kwargs))
+            buffer = io.StringIO()
+            morejson.dump(obj, buffer, iterative=True, **kwargs)
+            self.assertEqual(expected, buffer.getvalue())
+
+    def test_same_values(self):
+        """Testing decoded values equal those of recursive decoding."""
+        json_str = morejson.dumps(_OBJ, indent=1)
+        for kwargs in ({}, {'parse_float': Decimal, 'parse_int': str},
+                       {'object_pairs_hook': OrderedDict},
+                       {'object_hook': lambda obj: sorted(obj)},
+                       {'lazy': True}, {'records': 'namedtuple'}):
+            self.assertEqual(
+                repr(morejson.loads(json_str, **kwargs)),
+                repr(morejson.loads(json_str, iterative=True, **kwargs)))
+        self.assertEqual(
+            morejson.loads(json_str.encode('utf-16')),
+            morejson.loads(json_str.encode('utf-16'), iterative=True))
+        self.assertEqual(
+            morejson.loads(json_str, pointer='/nested/0/a'),
+            morejson.loads(json_str, pointer='/nested/0/a', iterative=True))
+        self.assertEqual(
+            repr(morejson.load(io.StringIO(json_str))),
+            repr(morejson.load(io.StringIO(json_str), iterative=True)))
+
+    def test_custom_default(self):
+        """Testing default functions and encoder classes."""
+        obj = {'decimal': Decimal('1.5'), 'date': datetime.date(2017, 1, 2)}
+        self.assertEqual(
+            morejson.dumps(obj, cls=_ReprEncoder),
+            morejson.dumps(obj, cls=_ReprEncoder, iterative=True))
+        self.assertEqual(
+            morejson.dumps(obj, default=str),
+            morejson.dumps(obj, default=str, iterative=True))
+
+    def test_deep(self):
+        """Testing data nested far deeper than the recursion limit."""
+        depth = 10 * sys.getrecursionlimit()
+        tree = _tree(depth)
+        with self.assertRaises(RecursionError):
+            morejson.dumps(tree)
+        json_str = morejson.dumps(tree, iterative=True, indent=1)
+        with self.assertRaises(RecursionError):
+            morejson.loads(json_str)
+        res = morejson.loads(json_str, iterative=True)
+        self.assertEqual(_leaf(tree), _leaf(res))
+        buffer = io.StringIO()
+        morejson.dump(tree, buffer, iterative=True, indent=1)
+        self.assertEqual(json_str, buffer.getvalue())
+        self.assertEqual(
+            morejson.fingerprint(_tree(100)),
+            morejson.fingerprint(_tree(100), iterative=True))
+
+    def test_errors(self):
+        """Testing encoding and decoding errors."""
+        circular = [[1]]
+        circular[0].append(circular)
+        with self.assertRaises(ValueError):
+            morejson.dumps(circular, iterative=True)
+        with self.assertRaises(ValueError):
+            morejson.dumps(float('inf'), allow_nan=False, iterative=True)
+        with self.assertRaises(TypeError):
+            morejson.dumps({(1, 2): 1}, iterative=True)
+        with self.assertRaises(TypeError):
+            morejson.dumps(object(), iterative=True)
+        for doc in ('[1,]', '{"a" 1}', '{"a":1,}', '[1 2]', '1 2', '',
+                    '{1:2}', 'nul', '[', '"abc', '\ufeff[]'):
+            with self.assertRaises(json.JSONDecodeError) as recursive:
+                morejson.loads(doc)
+            with self.assertRaises(json.JSONDecodeError) as iterative:
+                morejson.loads(doc, iterative=True)
+            self.assertEqual(
+                str(recursive.exception), str(iterative.exception))
@@ -0,0 +1,79 @@
+"""Testing encoding generators and other iterators as JSON arrays."""
+
+import unittest
+
+import datetime
+import io
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+def _rows(count):
+    for i in range(count):
+        yield {'i': i, 'day': datetime.date(2017, 1, 1 + i % 28), 'set': {i}}
+
+
+class _RecordingWriter(object):
+    """A file-like object recording the number of writes made to it."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+class TestIterators(unittest.TestCase):
+    """Testing encoding generators and other iterators as JSON arrays."""
+
+    def test_dumps(self):
+        """Testing dumps of iterators."""
+        obj = {'rows': _rows(5), 'empty': iter([]), 'map': map(str, range(3)),
+               'nested': (_rows(2) for _ in range(2))}
+        expected = {'rows': list(_rows(5)), 'empty': [],
+                    'map': ['0', '1', '2'],
+                    'nested': [list(_rows(2)) for _ in range(2)]}
+        json_str = morejson.dumps(obj)
+        self.assertEqual(morejson.dumps(expected), json_str)
+        self.assertEqual(expected, morejson.loads(json_str))
+
+    def test_dump(self):
+        """Testing dump of iterators, with and without indentation."""
+        for kwargs in ({}, {'indent': 2}, {'refs': True}, {'tagless': True}):
+            buffer = io.StringIO()
+            morejson.dump(
+                {'rows': _rows(5), 'empty': iter([]), 'one': iter([1])},
+                buffer, **kwargs)
+            self.assertEqual(
+                morejson.dumps({'rows': list(_rows(5)), 'empty': [],
+                                'one': [1]}, **kwargs),
+                buffer.getvalue())
+
+    def test_dump_streams(self):
+        """Testing dump writes items before the iterator is exhausted."""
+        writer = _RecordingWriter()
+        written = []
+        def _items():
+            for i in range(10):
+                written.append(len(writer.chunks))
+                yield datetime.timedelta(i)
+        morejson.dump(_items(), writer)
+        self.assertLess(written[1], written[-1])
+
+    def test_dump_memory(self):
+        """Testing dump memory doesn't grow with the number of items."""
+        writer = _RecordingWriter()
+        writer.write = lambda chunk: None
+        small = morejson.profile_memory(morejson.dump, _rows(100), writer)
+        large = morejson.profile_memory(morejson.dump, _rows(5000), writer)
+        self.assertLess(large.peak, small.peak * 2)
+
+    def test_not_iterable(self):
+        """Testing other objects are still not encodable."""
+        with self.assertRaises(TypeError):
+            morejson.dumps(object())
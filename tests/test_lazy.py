@@ -0,0 +1,83 @@
+"""Testing lazy decoding of extended values."""
+
+import unittest
+
+import datetime
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+_UTC = datetime.timezone.utc
+
+_DICTI = {
+    'datetimes': [
+        datetime.datetime(2017, 1, 1, 12, tzinfo=_UTC),
+        datetime.datetime(2017, 1, 2, 12),
+    ],
+    'meta': {'date': datetime.date(2017, 1, 1), 'name': 'trololo'},
+    'frozenset': frozenset([datetime.date(2017, 1, 1)]),
+    'set': set([1, 2]),
+    'complex': complex(1, 2),
+    'array': [[1, 2], [datetime.timedelta(days=2)]],
+}
+
+
+class TestLazy(unittest.TestCase):
+    """Testing lazy decoding of extended values."""
+
+    def test_lazy_placeholders(self):
+        """Testing that extended values are only decoded on access."""
+        res = morejson.loads(morejson.dumps(_DICTI), lazy=True)
+        self.assertIsInstance(res, morejson.LazyDict)
+        raw = dict.__getitem__(res, 'complex')
+        self.assertIsInstance(raw, morejson.LazyValue)
+        self.assertEqual('complex', raw.type)
+        self.assertEqual(complex(1, 2), res['complex'])
+        # accessing a value swaps it into its container
+        self.assertEqual(complex(1, 2), dict.__getitem__(res, 'complex'))
+        meta = res['meta']
+        self.assertEqual('trololo', meta['name'])
+        self.assertIsInstance(
+            dict.__getitem__(meta, 'date'), morejson.LazyValue)
+        self.assertEqual(datetime.date(2017, 1, 1), meta.get('date'))
+        self.assertEqual(_DICTI['datetimes'][0], res['datetimes'][0])
+        self.assertEqual(
+            datetime.timedelta(days=2), res['array'][1][0])
+
+    def test_lazy_equality(self):
+        """Testing comparison of lazily decoded objects."""
+        self.assertEqual(
+            _DICTI, morejson.loads(morejson.dumps(_DICTI), lazy=True))
+
+    def test_force(self):
+        """Testing forcing the decoding of all placeholders."""
+        res = morejson.force(
+            morejson.loads(morejson.dumps(_DICTI), lazy=True))
+        self.assertEqual(_DICTI, res)
+        for value in dict.values(res):
+            self.assertNotIsInstance(value, morejson.LazyValue)
+        self.assertEqual(
+            datetime.timedelta(days=2),
+            list.__getitem__(list.__getitem__(res['array'], 1), 0))
+
+    def test_lazy_with_refs_and_columns(self):
+        """Testing lazy decoding of references and columnar records."""
+        tags = frozenset(['a'])
+        records = [
+            {'tags': tags, 'when': datetime.date(2017, 1, i)}
+            for i in range(1, 5)]
+        for kwargs in ({'refs': True}, {'columnar': True}):
+            res = morejson.loads(
+                morejson.dumps(records, **kwargs), lazy=True)
+            self.assertEqual(records, res)
+            self.assertEqual(tags, res[3]['tags'])
+
+    def test_lazy_with_records(self):
+        """Testing that lazy and records modes can't be combined."""
+        with self.assertRaises(ValueError):
+            morejson.loads('{}', lazy=True, records='slots')
@@ -0,0 +1,121 @@
+"""Testing memoization of encoded immutable values."""
+
+import unittest
+
+import datetime
+import io
+import threading
+import uuid
+
+import morejson
+from morejson import core
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+def _values():
+    tzinfo = datetime.timezone(datetime.timedelta(hours=-3), 'X')
+    renamed = datetime.timezone(datetime.timedelta(hours=-3), 'Y')
+    naive = datetime.datetime(2017, 1, 2, 3, 4, 5)
+    return [
+        naive.replace(tzinfo=renamed),
+        datetime.time(1, 2, tzinfo=renamed),
+        datetime.date(2017, 1, 2),
+        naive,
+        naive.replace(fold=1),
+        naive.replace(tzinfo=tzinfo),
+        naive.replace(tzinfo=datetime.timezone.utc),
+        datetime.time(1, 2, tzinfo=tzinfo),
+        datetime.timedelta(days=1, seconds=2),
+        uuid.UUID(int=7),
+        b'\x00blob',
+        frozenset([1, 2]),
+        frozenset([1.0, 2]),
+        frozenset([datetime.date(2017, 1, 3), b'x']),
+        complex(0.0, 1),
+        complex(-0.0, 1),
+        {'set': {1, 2}, 'raw': morejson.RawJSON('[1,2]')},
+    ]
+
+
+class TestMemo(unittest.TestCase):
+    """Testing memoization of encoded immutable values."""
+
+    def setUp(self):
+        morejson.clear_memo()
+
+    def _check_same_output(self, obj, **kwargs):
+        expected = morejson.dumps(obj, **kwargs)
+        for maxsize in (1, 3, 1000):
+            for shared in (False, True, True):
+                self.assertEqual(expected, morejson.dumps(
+                    obj, memo=maxsize, shared_memo=shared, **kwargs))
+
+    def test_same_output(self):
+        """Testing memoized output equals the output without a memo."""
+        obj = {'values': _values() * 3, 'nested': [_values()] * 2}
+        self._check_same_output(obj)
+        self._check_same_output(obj, indent=2)
+        self._check_same_output(obj, separators=(',', ':'), sort_keys=True)
+        self._check_same_output(obj, ensure_ascii=False)
+        self._check_same_output(obj, short_tags=True, tag_key='$t')
+        self._check_same_output(obj, canonical=True)
+        self._check_same_output(obj, refs=True)
+
+    def test_options_across_calls(self):
+        """Testing shared memos aren't reused with other options."""
+        obj = _values() * 2
+        for kwargs in ({}, {'short_tags': True}, {'separators': (',', ':')},
+                       {'tagless': True}, {'indent': 1}, {}):
+            self.assertEqual(
+                morejson.dumps(obj, **kwargs),
+                morejson.dumps(obj, memo=100, shared_memo=True, **kwargs))
+
+    def test_custom_default(self):
+        """Testing custom defaults keep priority over memoized values."""
+        def _default(obj):
+            if isinstance(obj, datetime.date):
+                return obj.isoformat()
+            raise TypeError()
+        obj = _values() * 2
+        for shared in (False, True):
+            self.assertEqual(
+                morejson.dumps(obj, default=_default),
+                morejson.dumps(obj, default=_default, memo=100,
+                               shared_memo=shared))
+
+    def test_dump(self):
+        """Testing memoized values dumped to a file."""
+        obj = _values() * 2
+        buffer = io.StringIO()
+        morejson.dump(obj, buffer, memo=100)
+        self.assertEqual(morejson.dumps(obj), buffer.getvalue())
+
+    def test_bounded_shared_memo(self):
+        """Testing shared memos hold at most memo values."""
+        days = [datetime.date(2017, 1, 1) + datetime.timedelta(i)
+                for i in range(100)]
+        morejson.dumps(days * 2, memo=10, shared_memo=True)
+        memos = core._SHARED_MEMOS  # pylint: disable=W0212
+        self.assertEqual(1, len(memos))
+        self.assertEqual(10, len(list(memos.values())[0]))
+        morejson.clear_memo()
+        self.assertEqual(0, len(memos))
+
+    def test_threads(self):
+        """Testing a shared memo used by several threads at once."""
+        obj = _values() * 50
+        expected = morejson.dumps(obj)
+        results = []
+        def _encode():
+            for _ in range(20):
+                results.append(morejson.dumps(obj, memo=5, shared_memo=True))
+        threads = [threading.Thread(target=_encode) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([expected] * 80, results)
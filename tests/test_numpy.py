@@ -0,0 +1,60 @@
+"""Testing dumps and loads of numpy arrays."""
+
+import unittest
+
+import morejson
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+@unittest.skipIf(numpy is None, "numpy not available in this test run")
+class TestNumpy(unittest.TestCase):
+    """Testing dumps and loads of numpy arrays."""
+
+    def _check_roundtrip(self, array, **kwargs):
+        res = morejson.loads(morejson.dumps({'array': array}, **kwargs))
+        self.assertEqual(array.dtype, res['array'].dtype)
+        self.assertEqual(array.shape, res['array'].shape)
+        self.assertTrue(numpy.array_equal(array, res['array']))
+
+    def test_dumps_ndarray(self):
+        """Testing dumps and loads of numpy arrays of various dtypes."""
+        self._check_roundtrip(numpy.arange(24, dtype='<f8').reshape(2, 3, 4))
+        self._check_roundtrip(numpy.arange(10, dtype='>i2'))
+        self._check_roundtrip(numpy.array([True, False]))
+        self._check_roundtrip(numpy.array(3.5))
+        self._check_roundtrip(numpy.zeros((0, 3), dtype='u1'))
+        self._check_roundtrip(numpy.array(
+            [(1, 2.5)], dtype=[('a', '<i4'), ('b', '<f8')]))
+
+    def test_dumps_ndarray_base85(self):
+        """Testing dumps and loads of numpy arrays encoded as base85."""
+        array = numpy.linspace(0, 1, 1000)
+        self._check_roundtrip(array, binary='base85')
+        self.assertLess(
+            len(morejson.dumps(array, binary='base85')),
+            len(morejson.dumps(array)))
+
+    def test_dumps_non_contiguous_ndarray(self):
+        """Testing dumps and loads of non-contiguous numpy arrays."""
+        array = numpy.arange(20).reshape(4, 5)
+        self._check_roundtrip(array.T)
+        self._check_roundtrip(array[::2, 1::2])
+
+    def test_dumps_object_ndarray(self):
+        """Testing dumps of numpy arrays of Python objects."""
+        with self.assertRaises(TypeError):
+            morejson.dumps(numpy.array([{}, 1], dtype=object))
+
+    def test_dumps_unknown_binary_encoding(self):
+        """Testing dumps with an unknown binary encoding."""
+        with self.assertRaises(ValueError):
+            morejson.dumps(numpy.arange(3), binary='base32')
@@ -0,0 +1,121 @@
+"""Testing context-local morejson options."""
+
+import unittest
+
+import threading
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class TestOptions(unittest.TestCase):
+    """Testing context-local morejson options."""
+
+    def test_options_context(self):
+        """Testing options set for a block of code."""
+        dicti = {'set': set([1])}
+        self.assertFalse(morejson.allow_pickle())
+        with morejson.options(allow_pickle=True, compact=True):
+            self.assertTrue(morejson.allow_pickle())
+            self.assertEqual(
+                '{"set":{"__type__":"set","members":[1]}}',
+                morejson.dumps(dicti))
+        self.assertFalse(morejson.allow_pickle())
+        self.assertEqual(
+            '{"set": {"__type__": "set", "members": [1]}}',
+            morejson.dumps(dicti))
+
+    def test_nested_options(self):
+        """Testing nested option contexts."""
+        with morejson.options(allow_pickle=True):
+            with morejson.options(compact=True):
+                self.assertTrue(morejson.allow_pickle())
+                self.assertEqual('[1,2]', morejson.dumps([1, 2]))
+            self.assertEqual('[1, 2]', morejson.dumps([1, 2]))
+            self.assertTrue(morejson.allow_pickle())
+
+    def test_per_call_options(self):
+        """Testing options given to a single call."""
+        self.assertEqual('[1,2]', morejson.dumps([1, 2], compact=True))
+        with morejson.options(compact=True):
+            self.assertEqual('[1, 2]', morejson.dumps([1, 2], compact=False))
+            self.assertEqual(
+                '[1, 2]', morejson.dumps([1, 2], separators=(', ', ': ')))
+
+    def test_unknown_option(self):
+        """Testing setting an unknown option."""
+        with self.assertRaises(TypeError):
+            with morejson.options(no_such_option=True):
+                pass
+
+    def test_options_are_thread_local(self):
+        """Testing that options set in one thread don't leak to others."""
+        seen = []
+        entered = threading.Event()
+        checked = threading.Event()
+
+        def _other_thread():
+            entered.wait()
+            seen.append(morejson.dumps([1, 2]))
+            checked.set()
+
+        thread = threading.Thread(target=_other_thread)
+        thread.start()
+        with morejson.options(compact=True):
+            entered.set()
+            checked.wait()
+            self.assertEqual('[1,2]', morejson.dumps([1, 2]))
+        thread.join()
+        self.assertEqual(['[1, 2]'], seen)
+
+    def test_cached_default_options(self):
+        """Testing calls without options, which reuse cached options."""
+        dicti = {'set': set([1])}
+        self.assertEqual(dicti, morejson.loads(morejson.dumps(dicti)))
+        morejson.CONFIG['compact'] = True
+        try:
+            self.assertEqual(
+                '{"set":{"__type__":"set","members":[1]}}',
+                morejson.dumps(dicti))
+        finally:
+            morejson.CONFIG['compact'] = False
+        self.assertEqual(
+            '{"set": {"__type__": "set", "members": [1]}}',
+            morejson.dumps(dicti))
+        # references are resolved per call
+        json_str = morejson.dumps([dicti['set'], dicti['set']], refs=True)
+        first = morejson.loads(json_str)
+        second = morejson.loads(json_str)
+        self.assertIs(first[0], first[1])
+        self.assertIsNot(first[0], second[0])
+
+    def test_cached_options_with_refs_config(self):
+        """Testing consecutive calls with refs set through CONFIG."""
+        day = frozenset([1])
+        morejson.CONFIG['refs'] = True
+        try:
+            morejson.dumps([day, day])
+            json_str = morejson.dumps([day])
+        finally:
+            morejson.CONFIG['refs'] = False
+        self.assertEqual([day], morejson.loads(json_str))
+
+    def test_cached_calls_follow_config(self):
+        """Testing calls without options after CONFIG changes."""
+        dicti = {'set': set([1])}
+        morejson.dumps(dicti)
+        morejson.CONFIG.update(short_tags=True)
+        try:
+            json_str = morejson.dumps(dicti)
+            self.assertIn('"__type__": "set"', morejson.dumps(
+                dicti, short_tags=False))
+            self.assertNotIn('"__type__": "set"', json_str)
+        finally:
+            morejson.CONFIG.update(short_tags=False)
+        self.assertIn('"__type__": "set"', morejson.dumps(dicti))
+        self.assertEqual(dicti, morejson.loads(json_str))
+        self.assertEqual(dicti, morejson.loads(json_str.encode('utf-8')))
@@ -0,0 +1,84 @@
+"""Testing packed binary encoding of number lists and array.array."""
+
+import unittest
+
+import array
+import json
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class TestPackedNumbers(unittest.TestCase):
+    """Testing packed binary encoding of number lists and array.array."""
+
+    def test_dumps_array(self):
+        """Testing dumps and loads of array.array objects."""
+        for typecode in 'bBhHiIlLqQfd':
+            arr = array.array(typecode, [0, 1, 2, 100])
+            res = morejson.loads(morejson.dumps({'arr': arr}))
+            self.assertEqual(arr, res['arr'])
+            self.assertEqual(typecode, res['arr'].typecode)
+        arr = array.array('d', [0.1, float('inf'), -0.0])
+        res = morejson.loads(morejson.dumps(arr, binary='base85'))
+        self.assertEqual(arr, res)
+
+    def test_pack_numbers(self):
+        """Testing lists of numbers packed as binary buffers."""
+        obj = {
+            'floats': [0.1 * i for i in range(100)],
+            'bytes': list(range(-128, 128)),
+            'longs': [2 ** 62, -2 ** 63, 0],
+        }
+        json_str = morejson.dumps(obj, pack_numbers=3)
+        for key in obj:
+            self.assertEqual(
+                'morejson.packed', json.loads(json_str)[key]['__type__'])
+        res = morejson.loads(json_str)
+        self.assertEqual(obj, res)
+        self.assertIsInstance(res['floats'], list)
+        self.assertEqual(1, json.loads(json_str)['bytes']['itemsize'])
+
+    def test_unpacked_lists(self):
+        """Testing lists which are not packed."""
+        obj = {
+            'short': [1, 2],
+            'mixed': [1, 2.5, 3],
+            'bools': [True, False, True],
+            'huge': [2 ** 63, 1, 2],
+            'nested': [[1.5, 2.5, 3.5]],
+        }
+        json_str = morejson.dumps(obj, pack_numbers=3)
+        plain = json.loads(json_str)
+        self.assertEqual(obj['mixed'], plain['mixed'])
+        self.assertEqual(obj['huge'], plain['huge'])
+        self.assertEqual('morejson.packed', plain['nested'][0]['__type__'])
+        self.assertEqual(obj, morejson.loads(json_str))
+        self.assertEqual(obj, json.loads(morejson.dumps(obj)))
+
+    def test_packed_columns(self):
+        """Testing numeric columns of columnar records."""
+        records = [{'i': i, 'x': i / 2} for i in range(10)]
+        json_str = morejson.dumps(records, columnar=True, pack_numbers=5)
+        columns = json.loads(json_str)['columns']
+        self.assertEqual(['morejson.packed'] * 2,
+                         [column['__type__'] for column in columns])
+        self.assertEqual(records, morejson.loads(json_str))
+
+    def test_non_finite_floats(self):
+        """Testing packing float lists with NaN or infinities."""
+        floats = [1.5, float('inf'), -float('inf')]
+        json_str = morejson.dumps(floats, pack_numbers=2)
+        self.assertEqual(floats, morejson.loads(json_str))
+        self.assertNotIn('Infinity', json_str)
+        with self.assertRaises(ValueError):
+            morejson.dumps(floats, pack_numbers=2, allow_nan=False)
+        with self.assertRaises(ValueError):
+            morejson.dumps([{'x': x} for x in floats], pack_numbers=2,
+                           columnar=True, allow_nan=False)
+        self.assertEqual([1.5, 2.5], morejson.loads(morejson.dumps(
+            [1.5, 2.5], pack_numbers=2, allow_nan=False)))
@@ -0,0 +1,90 @@
+"""Testing decoding of values selected by JSON Pointer."""
+
+import unittest
+
+import os
+import datetime
+import tempfile
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+_DICTI = {
+    'data': [
+        {'id': i, 'set': set([i]), 'note': 'a "quoted" ]} string'}
+        for i in range(20)
+    ],
+    'meta': {
+        'generated_at': datetime.datetime(2017, 1, 1, 12),
+        'a/b': {'~c': 1},
+    },
+}
+
+
+class TestPointer(unittest.TestCase):
+    """Testing decoding of values selected by JSON Pointer."""
+
+    def test_loads_pointer(self):
+        """Testing loads of values selected by JSON Pointer."""
+        json_str = morejson.dumps(_DICTI)
+        cases = {
+            '': _DICTI,
+            '/meta/generated_at': _DICTI['meta']['generated_at'],
+            '/meta/a~1b/~0c': 1,
+            '/data/7': _DICTI['data'][7],
+            '/data/19/set': set([19]),
+            '/data/0/note': _DICTI['data'][0]['note'],
+        }
+        for pointer, expected in cases.items():
+            self.assertEqual(
+                expected, morejson.loads(json_str, pointer=pointer))
+            self.assertEqual(
+                expected,
+                morejson.loads(json_str.encode('utf-8'), pointer=pointer))
+
+    def test_loads_missing_pointer(self):
+        """Testing loads of JSON Pointers to missing values."""
+        json_str = morejson.dumps(_DICTI)
+        with self.assertRaises(KeyError):
+            morejson.loads(json_str, pointer='/nope')
+        with self.assertRaises(KeyError):
+            morejson.loads(json_str, pointer='/data/0/id/x')
+        with self.assertRaises(IndexError):
+            morejson.loads(json_str, pointer='/data/20')
+        with self.assertRaises(IndexError):
+            morejson.loads(json_str, pointer='/data/-')
+        with self.assertRaises(ValueError):
+            morejson.loads(json_str, pointer='meta')
+
+    def test_load_path(self):
+        """Testing load_path with and without a JSON Pointer."""
+        fd, path = tempfile.mkstemp(suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as fileobj:
+                morejson.dump(_DICTI, fileobj)
+            self.assertEqual(_DICTI, morejson.load_path(path))
+            self.assertEqual(
+                _DICTI['meta']['generated_at'],
+                morejson.load_path(path, pointer='/meta/generated_at'))
+            with open(path, 'r') as fileobj:
+                self.assertEqual(
+                    set([3]), morejson.load(fileobj, pointer='/data/3/set'))
+        finally:
+            os.remove(path)
+
+    def test_pointer_into_shared_references(self):
+        """Testing pointers into documents encoded with references."""
+        day = datetime.date(2017, 1, 2)
+        json_str = morejson.dumps(
+            {'first': day, 'rows': [{'day': day}]}, refs=True)
+        self.assertEqual(day, morejson.loads(json_str, pointer='/first'))
+        for pointer in ('/rows/0/day', '/rows'):
+            with self.assertRaises(ValueError):
+                morejson.loads(json_str, pointer=pointer)
+        with self.assertRaises(ValueError):
+            morejson.loads(json_str, pointer='/rows', lazy=True)
@@ -0,0 +1,63 @@
+"""Testing the memory profiling functionality."""
+
+import unittest
+
+import io
+import datetime
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class TestProfileMemory(unittest.TestCase):
+    """Testing the memory profiling functionality."""
+
+    def test_profile_loads(self):
+        """Testing memory profiling of loads, phase by phase."""
+        dicti = {
+            'dates': [datetime.date(2017, 1, i) for i in range(1, 29)],
+            'set': set([1, 2, 3]),
+        }
+        json_str = morejson.dumps(dicti)
+        prof = morejson.profile_memory(morejson.loads, json_str)
+        self.assertEqual(dicti, prof.result)
+        self.assertEqual(
+            ['parse', 'hook', 'construct'], list(prof.phases))
+        for stats in prof.phases.values():
+            self.assertGreaterEqual(stats.peak, stats.retained)
+        self.assertGreater(prof.peak, 0)
+
+    def test_profile_load(self):
+        """Testing memory profiling of load, including the read phase."""
+        dicti = {'now': datetime.datetime.now(), 'array': [1, 2, 3]}
+        fileobj = io.StringIO(morejson.dumps(dicti))
+        prof = morejson.profile_memory(morejson.load, fileobj)
+        self.assertEqual(dicti, prof.result)
+        self.assertEqual(
+            ['read', 'parse', 'hook', 'construct'], list(prof.phases))
+
+    def test_profile_loads_arguments(self):
+        """Testing memory profiling of loads with its own arguments."""
+        dicti = {'meta': {'day': datetime.date(2017, 1, 2)}, 'n': 1}
+        json_str = morejson.dumps(dicti, tagless=True)
+        kwargs_list = [
+            {'schema': {'meta': {'day': datetime.date}}},
+            {'pointer': '/meta', 'schema': {'day': datetime.date}},
+            {'iterative': True, 'schema': {'meta': {'day': datetime.date}}},
+        ]
+        for kwargs in kwargs_list:
+            prof = morejson.profile_memory(morejson.loads, json_str, **kwargs)
+            self.assertEqual(morejson.loads(json_str, **kwargs), prof.result)
+        self.assertEqual(dicti['meta'], prof.result['meta'])
+
+    def test_profile_other_callable(self):
+        """Testing memory profiling of a callable other than load(s)."""
+        dicti = {'complex': complex(1, 2)}
+        prof = morejson.profile_memory(morejson.dumps, dicti)
+        self.assertEqual(morejson.dumps(dicti), prof.result)
+        self.assertEqual(['call'], list(prof.phases))
+        self.assertEqual(prof.phases['call'].peak, prof.peak)
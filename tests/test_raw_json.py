@@ -0,0 +1,56 @@
+"""Testing verbatim encoding of pre-encoded JSON fragments."""
+
+import unittest
+
+import io
+import datetime
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class TestRawJSON(unittest.TestCase):
+    """Testing verbatim encoding of pre-encoded JSON fragments."""
+
+    def test_dumps_raw_json(self):
+        """Testing dumps of raw JSON fragments."""
+        fragment = '{"name":"blob",  "sizes":[1,2,3]}'
+        dicti = {
+            'cached': morejson.RawJSON(fragment),
+            'cached_bytes': morejson.RawJSON(fragment.encode('utf-8')),
+            'array': [morejson.RawJSON('1.50'), datetime.date(2017, 1, 1)],
+        }
+        json_str = morejson.dumps(dicti, sort_keys=True)
+        self.assertEqual(2, json_str.count(fragment))
+        self.assertIn('[1.50, ', json_str)
+        self.assertEqual({
+            'cached': {'name': 'blob', 'sizes': [1, 2, 3]},
+            'cached_bytes': {'name': 'blob', 'sizes': [1, 2, 3]},
+            'array': [1.5, datetime.date(2017, 1, 1)],
+        }, morejson.loads(json_str))
+
+    def test_dump_raw_json(self):
+        """Testing dump of raw JSON fragments."""
+        fileobj = io.StringIO()
+        morejson.dump(
+            [morejson.RawJSON('{"a": 1}')] * 3, fileobj, indent=2)
+        self.assertEqual([{'a': 1}] * 3, morejson.loads(fileobj.getvalue()))
+        self.assertEqual(3, fileobj.getvalue().count('{"a": 1}'))
+
+    def test_raw_json_lookalike_strings(self):
+        """Testing that strings looking like placeholders are left as is."""
+        lookalike = '\x00morejson-raw:0000000000000000:0\x00'
+        dicti = {'string': lookalike, 'raw': morejson.RawJSON('true')}
+        self.assertEqual(
+            {'string': lookalike, 'raw': True},
+            morejson.loads(morejson.dumps(dicti)))
+
+    def test_raw_json_with_refs(self):
+        """Testing that raw JSON fragments are not turned into references."""
+        raw = morejson.RawJSON('[1, 2]')
+        self.assertEqual(
+            '[[1, 2], [1, 2]]', morejson.dumps([raw, raw], refs=True))
@@ -0,0 +1,91 @@
+"""Testing decoding of objects into record classes."""
+
+import unittest
+
+import copy
+import datetime
+import pickle
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+_RECORDS = [
+    {
+        'id': i,
+        'created': datetime.datetime(2017, 1, 1, i),
+        'tags': set(['a']),
+        'nested': {'x': i, 'y': -i},
+    }
+    for i in range(10)
+]
+
+
+class TestRecords(unittest.TestCase):
+    """Testing decoding of objects into record classes."""
+
+    def _check_records(self, records):
+        self.assertEqual(len(_RECORDS), len(records))
+        self.assertIs(type(records[0]), type(records[-1]))
+        self.assertIs(type(records[0].nested), type(records[-1].nested))
+        for expected, actual in zip(_RECORDS, records):
+            self.assertEqual(expected['id'], actual.id)
+            self.assertEqual(expected['created'], actual.created)
+            self.assertEqual(expected['tags'], actual.tags)
+            self.assertEqual(expected['nested'], actual.nested._asdict())
+
+    def test_namedtuple_records(self):
+        """Testing loads of objects into namedtuples."""
+        records = morejson.loads(
+            morejson.dumps(_RECORDS), records='namedtuple')
+        self._check_records(records)
+        self.assertIsInstance(records[0], tuple)
+
+    def test_slots_records(self):
+        """Testing loads of objects into __slots__ classes."""
+        records = morejson.loads(morejson.dumps(_RECORDS), records='slots')
+        self._check_records(records)
+        self.assertFalse(hasattr(records[0], '__dict__'))
+
+    def test_columnar_records(self):
+        """Testing loads of columnar encoded objects into records."""
+        records = morejson.loads(
+            morejson.dumps(_RECORDS, columnar=True), records='namedtuple')
+        self._check_records(records)
+
+    def test_records_fallback_to_dicts(self):
+        """Testing that objects with non-identifier keys stay dicts."""
+        dicti = {'not an identifier': 1, 'class': 2}
+        self.assertEqual(
+            [dicti, {'_private': 3}],
+            morejson.loads(
+                morejson.dumps([dicti, {'_private': 3}]), records='slots'))
+
+    def test_records_with_custom_hook(self):
+        """Testing records mode together with a custom object hook."""
+        def _hook(dict_obj):
+            if 'skip' in dict_obj:
+                return 'skipped'
+            return dict_obj
+        res = morejson.loads(
+            '[{"skip": 1}, {"a": 1}]', records='namedtuple', object_hook=_hook)
+        self.assertEqual('skipped', res[0])
+        self.assertEqual(1, res[1].a)
+
+    def test_unknown_records_kind(self):
+        """Testing loads with an unknown kind of records."""
+        with self.assertRaises(ValueError):
+            morejson.loads('{}', records='no-such-kind')
+
+    def test_pickle_records(self):
+        """Testing pickling and copying records."""
+        for kind in ('namedtuple', 'slots'):
+            records = morejson.loads(morejson.dumps(_RECORDS), records=kind)
+            for unpickled in (pickle.loads(pickle.dumps(records)),
+                              copy.deepcopy(records)):
+                self._check_records(unpickled)
+                self.assertIs(type(records[0]), type(unpickled[0]))
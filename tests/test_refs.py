@@ -0,0 +1,71 @@
+"""Testing the shared-references mode."""
+
+import unittest
+
+import datetime
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class TestRefs(unittest.TestCase):
+    """Testing the shared-references mode."""
+
+    def test_refs_roundtrip(self):
+        """Testing dumps and loads of repeated values in references mode."""
+        tags = frozenset(['a', 'b'])
+        members = set([1, 2])
+        records = [
+            {
+                'tags': tags,
+                'members': members,
+                'created': datetime.datetime(2017, 1, 1, 12),
+                'point': complex(1, -1),
+                'id': i,
+            }
+            for i in range(50)
+        ]
+        json_str = morejson.dumps(records, refs=True)
+        self.assertLess(len(json_str), len(morejson.dumps(records)))
+        self.assertEqual(1, json_str.count('"frozenset"'))
+        self.assertEqual(1, json_str.count('"datetime.datetime"'))
+        actual = morejson.loads(json_str)
+        self.assertEqual(records, actual)
+        self.assertIs(actual[0]['tags'], actual[-1]['tags'])
+        self.assertIs(actual[0]['members'], actual[-1]['members'])
+        self.assertIs(actual[0]['created'], actual[-1]['created'])
+
+    def test_refs_keep_distinct_values(self):
+        """Testing that equal but differently encoded values aren't merged."""
+        utc = datetime.timezone.utc
+        plus_one = datetime.timezone(datetime.timedelta(hours=1))
+        moment = datetime.datetime(2017, 1, 1, 12, tzinfo=utc)
+        dicti = {
+            'utc': moment,
+            'plus_one': moment.astimezone(plus_one),
+            'zero': complex(0.0, 0.0),
+            'negative_zero': complex(0.0, -0.0),
+        }
+        actual = morejson.loads(morejson.dumps(dicti, refs=True))
+        self.assertEqual(dicti, actual)
+        self.assertIs(plus_one.__class__, actual['plus_one'].tzinfo.__class__)
+        self.assertEqual(
+            datetime.timedelta(hours=1), actual['plus_one'].utcoffset())
+        self.assertEqual('-0.0', repr(actual['negative_zero'].imag))
+        zero = datetime.timedelta(0)
+        named = [
+            datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone(zero, name))
+            for name in ('A', 'B')]
+        actual = morejson.loads(morejson.dumps(named, refs=True))
+        self.assertEqual(['A', 'B'], [value.tzname() for value in actual])
+
+    def test_unresolved_ref(self):
+        """Testing loads of a reference to an unknown id."""
+        json_str = '{"a": {"__type__": "morejson.ref", "id": 7}}'
+        self.assertEqual(
+            {'a': {'__type__': 'morejson.ref', 'id': 7}},
+            morejson.loads(json_str))
@@ -0,0 +1,118 @@
+"""Testing dumps and loads of instances of registered classes."""
+
+import unittest
+
+import dataclasses
+import datetime
+import json
+import sys
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+@dataclasses.dataclass
+class Event:
+    """A dataclass for testing."""
+    name: str
+    when: datetime.datetime
+    tags: frozenset = frozenset()
+    seen: int = dataclasses.field(default=0, init=False)
+
+
+class Point(object):
+    """A __slots__ class for testing."""
+
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __eq__(self, other):
+        return (self.x, self.y) == (other.x, other.y)
+
+
+class Unregistered(object):
+    """A __slots__ class which is never registered."""
+
+    __slots__ = ('x',)
+
+    def __init__(self, x):
+        self.x = x
+
+
+morejson.register_class(Event)
+morejson.register_class(Point, tag='test.Point')
+
+if sys.version_info >= (3, 10):
+    @dataclasses.dataclass(kw_only=True)
+    class Span:
+        """A dataclass with keyword-only fields for testing."""
+        start: datetime.date
+        end: datetime.date = None
+
+    @dataclasses.dataclass
+    class Job:
+        """A dataclass with a KW_ONLY marker for testing."""
+        name: str
+        _: dataclasses.KW_ONLY
+        retries: int = 0
+
+    morejson.register_class(Span)
+    morejson.register_class(Job)
+
+
+class TestRegisterClass(unittest.TestCase):
+    """Testing dumps and loads of instances of registered classes."""
+
+    def test_dumps_dataclass(self):
+        """Testing dumps and loads of dataclass instances."""
+        event = Event('launch', datetime.datetime(2017, 1, 1), frozenset('a'))
+        json_str = morejson.dumps([event])
+        self.assertEqual(
+            __name__ + '.Event', json.loads(json_str)[0]['__type__'])
+        self.assertNotIn('seen', json.loads(json_str)[0])
+        self.assertEqual([event], morejson.loads(json_str))
+
+    def test_dumps_slots(self):
+        """Testing dumps and loads of __slots__ class instances."""
+        points = {'a': Point(1, 2), 'b': Point(Point(0, 0), 1.5)}
+        json_str = morejson.dumps(points)
+        self.assertEqual(
+            {'__type__': 'test.Point', 'x': 1, 'y': 2},
+            json.loads(json_str)['a'])
+        self.assertEqual(points, morejson.loads(json_str))
+
+    def test_unregistered_class(self):
+        """Testing that unregistered classes are neither encoded nor
+        constructed."""
+        with self.assertRaises(TypeError):
+            morejson.dumps(Unregistered(1))
+        json_str = '{"__type__": "%s.Unregistered", "x": 1}' % __name__
+        self.assertEqual(
+            json.loads(json_str), morejson.loads(json_str))
+
+    def test_invalid_registration(self):
+        """Testing registering classes that can't be registered."""
+        with self.assertRaises(ValueError):
+            morejson.register_class(Unregistered, tag='datetime.datetime')
+        with self.assertRaises(TypeError):
+            morejson.register_class(object)
+        with self.assertRaises(ValueError):
+            morejson.register_class(Unregistered, fields=[])
+
+    @unittest.skipIf(sys.version_info < (3, 10), "kw_only is Python 3.10+")
+    def test_keyword_only_fields(self):
+        """Testing dataclasses with keyword-only fields."""
+        objs = [Span(start=datetime.date(2017, 1, 1)), Job('build', retries=2)]
+        self.assertEqual(objs, morejson.loads(morejson.dumps(objs)))
+
+    def test_field_named_like_tag_key(self):
+        """Testing encoding with a tag key that is a field name."""
+        with self.assertRaises(ValueError):
+            morejson.dumps(Point(1, 2), tag_key='x')
@@ -0,0 +1,172 @@
+"""Testing tagless encoding and decoding with a schema."""
+
+import unittest
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import sys
+import typing
+import uuid
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class Level(enum.Enum):
+    """An enum for testing."""
+    LOW = 'low'
+    HIGH = 'high'
+
+
+@dataclasses.dataclass
+class Reading:
+    """A dataclass for testing."""
+    when: datetime.datetime
+    value: decimal.Decimal
+    level: Level
+    note: typing.Optional[str] = None
+
+
+class Batch(typing.TypedDict):
+    """A TypedDict for testing."""
+    id: uuid.UUID
+    day: datetime.date
+    readings: typing.List[Reading]
+    labels: typing.Set[str]
+
+
+@dataclasses.dataclass
+class Node:
+    """A self-referential dataclass for testing."""
+    when: datetime.date
+    children: typing.List['Node']
+    parent: typing.Optional['Node'] = None
+
+
+class Tree(typing.TypedDict):
+    """A self-referential TypedDict for testing."""
+    span: datetime.timedelta
+    subtrees: typing.List['Tree']
+
+
+morejson.register_class(Reading)
+morejson.register_class(Node)
+
+
+class TestSchema(unittest.TestCase):
+    """Testing tagless encoding and decoding with a schema."""
+
+    def test_tagless_encoding(self):
+        """Testing the plain JSON forms of extended values."""
+        obj = {
+            'datetime': datetime.datetime(2017, 1, 2, 3, 4, 5, 6),
+            'time': datetime.time(1, 2),
+            'timedelta': datetime.timedelta(1, 2, 3),
+            'set': {1},
+            'complex': complex(1, -2),
+            'uuid': uuid.UUID(int=1),
+            'bytes': b'\x00',
+            'level': Level.LOW,
+        }
+        self.assertEqual({
+            'datetime': '2017-01-02T03:04:05.000006',
+            'time': '01:02:00',
+            'timedelta': 86402000003,
+            'set': [1],
+            'complex': [1.0, -2.0],
+            'uuid': '00000000000000000000000000000001',
+            'bytes': 'AA==',
+            'level': 'low',
+        }, json.loads(morejson.dumps(obj, tagless=True)))
+
+    def test_schema_decoding(self):
+        """Testing decoding tagless JSON with a TypedDict schema."""
+        batch = {
+            'id': uuid.UUID(int=7),
+            'day': datetime.date(2017, 1, 2),
+            'readings': [
+                Reading(datetime.datetime(2017, 1, 2, 3, tzinfo=tz),
+                        decimal.Decimal('1.50'), level, note)
+                for tz, level, note in (
+                    (None, Level.LOW, None),
+                    (datetime.timezone.utc, Level.HIGH, 'late'))
+            ],
+            'labels': {'a', 'b'},
+        }
+        json_str = morejson.dumps(batch, tagless=True)
+        self.assertNotIn('__type__', json_str)
+        self.assertEqual(batch, morejson.loads(json_str, schema=Batch))
+
+    def test_dict_schema(self):
+        """Testing decoding with dict and list schemas."""
+        records = [{'when': datetime.datetime(2017, 1, 1), 'n': i,
+                    'span': datetime.timedelta(seconds=i)} for i in range(3)]
+        json_str = morejson.dumps(records, tagless=True)
+        schema = [{'when': datetime.datetime, 'span': datetime.timedelta}]
+        self.assertEqual(records, morejson.loads(json_str, schema=schema))
+        self.assertEqual(
+            records, morejson.loads(morejson.dumps(records), schema=schema))
+
+    def test_invalid_combinations(self):
+        """Testing options that can't be combined with tagless or a schema."""
+        with self.assertRaises(ValueError):
+            morejson.dumps([], tagless=True, refs=True)
+        with self.assertRaises(ValueError):
+            morejson.loads('[]', schema=[int], lazy=True)
+
+    @unittest.skipIf(sys.version_info < (3, 10), "X | Y is Python 3.10+")
+    def test_union_type(self):
+        """Testing X | None schemas."""
+        schema = eval('{"day": datetime.date | None}')  # pylint: disable=W0123
+        obj = {'day': datetime.date(2017, 1, 2)}
+        json_str = morejson.dumps(obj, tagless=True)
+        self.assertEqual(obj, morejson.loads(json_str, schema=schema))
+        self.assertEqual(
+            {'day': None}, morejson.loads('{"day": null}', schema=schema))
+
+    def test_recursive_schemas(self):
+        """Testing self-referential dataclass and TypedDict schemas."""
+        day = datetime.date(2017, 1, 2)
+        node = Node(day, [Node(day, []), Node(day, [Node(day, [])])])
+        json_str = morejson.dumps(node, tagless=True)
+        self.assertEqual(node, morejson.loads(json_str, schema=Node))
+        tree = {'span': datetime.timedelta(1), 'subtrees': [
+            {'span': datetime.timedelta(2), 'subtrees': []}]}
+        json_str = morejson.dumps(tree, tagless=True)
+        self.assertEqual(tree, morejson.loads(json_str, schema=Tree))
+
+    def test_tuple_schemas(self):
+        """Testing fixed and variable length tuple schemas."""
+        day = datetime.date(2017, 1, 2)
+        obj = {'pair': (day, uuid.UUID(int=1)), 'days': (day, day)}
+        json_str = morejson.dumps(obj, tagless=True)
+        schema = {'pair': typing.Tuple[datetime.date, uuid.UUID],
+                  'days': typing.Tuple[datetime.date, ...]}
+        self.assertEqual(obj, morejson.loads(json_str, schema=schema))
+        self.assertEqual(
+            {'t': (1, 'a')}, morejson.loads('{"t": [1, "a"]}', schema={
+                't': tuple}))
+        with self.assertRaises(ValueError):
+            morejson.loads('{"pair": ["2017-01-02"]}', schema=schema)
+
+    def test_tagged_fallbacks(self):
+        """Testing tagless encoding of types without a tagless form."""
+        zone = datetime.timezone(datetime.timedelta(hours=2))
+        json_str = morejson.dumps({'zone': zone}, tagless=True)
+        self.assertEqual({'zone': zone}, morejson.loads(json_str))
+
+    def test_unexpected_keys(self):
+        """Testing dataclass payloads with keys that aren't fields."""
+        json_str = morejson.dumps(Node(datetime.date(2017, 1, 2), []),
+                                  tagless=True)
+        payload = json.loads(json_str)
+        payload['extra'] = 1
+        with self.assertRaisesRegex(ValueError, 'extra'):
+            morejson.loads(json.dumps(payload), schema=Node)
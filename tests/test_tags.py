@@ -0,0 +1,60 @@
+"""Testing configurable tag keys and short type tags."""
+
+import unittest
+
+import datetime
+import json
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+_RECORDS = [
+    {
+        'created': datetime.datetime(
+            2017, 1, 1, i, tzinfo=datetime.timezone.utc),
+        'duration': datetime.timedelta(seconds=i),
+        'tags': frozenset(['a']),
+    }
+    for i in range(3)
+]
+
+
+class TestTags(unittest.TestCase):
+    """Testing configurable tag keys and short type tags."""
+
+    def test_short_tags(self):
+        """Testing encoding with a short tag key and short tags."""
+        json_str = morejson.dumps(_RECORDS, tag_key='$t', short_tags=True)
+        self.assertEqual(
+            {'$t': 'td', 'days': 0, 'seconds': 1, 'microseconds': 0},
+            json.loads(json_str)[1]['duration'])
+        self.assertEqual('tz', json.loads(json_str)[0]['created']['tzinfo']['$t'])
+        self.assertLess(len(json_str), len(morejson.dumps(_RECORDS)))
+        self.assertEqual(_RECORDS, morejson.loads(json_str, tag_key='$t'))
+
+    def test_decoding_both_forms(self):
+        """Testing that both tag forms are decoded under either tag key."""
+        long_form = morejson.dumps(_RECORDS)
+        short_form = morejson.dumps(_RECORDS, short_tags=True)
+        for json_str in (long_form, short_form):
+            self.assertEqual(_RECORDS, morejson.loads(json_str))
+            self.assertEqual(_RECORDS, morejson.loads(json_str, tag_key='$t'))
+        with morejson.options(tag_key='$t'):
+            json_str = morejson.dumps(_RECORDS)
+            self.assertEqual(_RECORDS, morejson.loads(json_str))
+        self.assertNotEqual(_RECORDS, morejson.loads(json_str))
+
+    def test_short_tags_with_other_options(self):
+        """Testing short tags with references, lazy decoding and records."""
+        json_str = morejson.dumps(
+            _RECORDS, tag_key='$t', short_tags=True, refs=True)
+        self.assertEqual(_RECORDS, morejson.loads(json_str, tag_key='$t'))
+        self.assertEqual(
+            _RECORDS, morejson.loads(json_str, tag_key='$t', lazy=True))
+        res = morejson.loads(json_str, tag_key='$t', records='namedtuple')
+        self.assertEqual(_RECORDS[2]['tags'], res[2].tags)
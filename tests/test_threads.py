@@ -0,0 +1,62 @@
+"""Testing concurrent use of morejson from many threads."""
+
+import unittest
+
+import datetime
+import threading
+
+import morejson
+from morejson import core as morejson_core
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class TestThreads(unittest.TestCase):
+    """Testing concurrent use of morejson from many threads."""
+
+    def test_concurrent_roundtrips(self):
+        """Testing concurrent dumps and loads with per-thread options."""
+        dicti = {
+            'datetime': datetime.datetime(2017, 3, 4, 5, 6, 7),
+            'timedelta': datetime.timedelta(hours=3),
+            'set': set([1, 2, 3]),
+            'frozenset': frozenset(['a', 'b']),
+            'complex': complex(3, -4),
+            'array': [datetime.date(2017, 1, i) for i in range(1, 20)],
+        }
+        expected = {
+            True: morejson.dumps(dicti, compact=True),
+            False: morejson.dumps(dicti, compact=False),
+        }
+        errors = []
+
+        def _work(compact):
+            try:
+                with morejson.options(compact=compact):
+                    for _ in range(200):
+                        json_str = morejson.dumps(dicti)
+                        if json_str != expected[compact]:
+                            errors.append(('dumps', compact, json_str))
+                        if morejson.loads(json_str) != dicti:
+                            errors.append(('loads', compact, json_str))
+            except Exception as exc:  # pylint: disable=W0703
+                errors.append(exc)
+
+        threads = [
+            threading.Thread(target=_work, args=(i % 2 == 0,))
+            for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+
+    def test_dispatch_snapshots_are_read_only(self):
+        """Testing that the dispatch snapshots can't be mutated."""
+        with self.assertRaises(TypeError):
+            morejson_core._ENCODERS[object] = None  # pylint: disable=W0212
+        with self.assertRaises(TypeError):
+            morejson_core._DECODERS['x'] = None  # pylint: disable=W0212
@@ -0,0 +1,64 @@
+"""Testing dumps and loads of uuid.UUID and enum.Enum objects."""
+
+import unittest
+
+import enum
+import json
+import uuid
+
+import morejson
+
+
+__author__ = "Shay Palachy"
+__copyright__ = "Shay Palachy"
+__license__ = "MIT"
+
+
+class Color(enum.Enum):
+    """An enum for testing."""
+    RED = 1
+    GREEN = 'green'
+    BLUE = (0, 0, 255)
+    CRIMSON = 1  # an alias of RED
+
+
+class Flags(enum.Flag):
+    """A flag enum for testing."""
+    READ = 1
+    WRITE = 2
+
+
+class Priority(enum.IntEnum):
+    """An IntEnum for testing."""
+    LOW = 1
+
+
+class TestUUIDEnum(unittest.TestCase):
+    """Testing dumps and loads of uuid.UUID and enum.Enum objects."""
+
+    def test_dumps_uuid(self):
+        """Testing dumps and loads of UUIDs."""
+        uid = uuid.UUID('12345678-1234-5678-1234-567812345678')
+        json_str = morejson.dumps({'id': uid})
+        self.assertEqual(uid.hex, json.loads(json_str)['id']['hex'])
+        self.assertEqual({'id': uid}, morejson.loads(json_str))
+
+    def test_dumps_enum(self):
+        """Testing dumps and loads of Enum members."""
+        members = [Color.RED, Color.GREEN, Color.BLUE, Color.CRIMSON,
+                   Flags.READ | Flags.WRITE]
+        res = morejson.loads(morejson.dumps(members))
+        for member, decoded in zip(members, res):
+            self.assertIs(member, decoded)
+
+    def test_int_enum(self):
+        """Testing that IntEnum members are encoded as plain values."""
+        self.assertEqual('[1]', morejson.dumps([Priority.LOW]))
+
+    def test_unknown_enum(self):
+        """Testing decoding an Enum whose module is not imported."""
+        json_str = morejson.dumps(Color.RED).replace(
+            __name__, 'no_such_module')
+        res = morejson.loads(json_str)
+        self.assertEqual('enum.Enum', res['__type__'])
+        self.assertEqual('no_such_module', res['module'])